@@ -2,54 +2,82 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
 import sys
+import argparse
 import time
-import json
-import yaml
+import re
 import shutil
 import subprocess
+import signal
 import threading
 import atexit
-from queue import Queue
 from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
 from pathlib import Path
 from collections import deque
 from extract_announcements_from_kickertool import (
-    ensure_dirs, load_state, save_state, fetch_courts,
-    extract_match_info_from_court, safe_slug, output_dir, BASE_DIR
+    ensure_dirs, load_state, save_state, flush_state, fetch_court_infos,
+    safe_slug, output_dir, BASE_DIR, set_api_token,
 )
-from text_to_speech import prepare_tts_playback, set_tts_muted
+from text_to_speech import (
+    prepare_tts_playback, set_tts_muted, pronunciation_lexicon_size, set_audio_cache_dir, audio_cache_enabled,
+    provider as tts_provider,
+    apply_tts_config, prepared_audio_job, release_audio, temp_audio_locations, CancelToken, device_play_command,
+)
+from history_store import AnnouncementHistory
+from announcement_writer import AnnouncementWriter
+from pending_store import PendingQueueStore, PENDING_FILE_NAME
+from preload_cache import PreloadCache
+from recall_scheduler import RecallScheduler
+from resource_governor import UI_NICE, PlaybackGate, set_thread_priority
+from zones import Zone, ZoneRouter, table_matcher
+from log_pipeline import LOG_DIR_NAME, LOG_FILE_NAME, LogPipeline
+import court_archive
+from config import DEFAULT_RECALL_TEMPLATE, DEFAULT_SPEECH_TEMPLATE, AppConfig, ConfigWatcher, changed_keys, require_config
+from speech_templates import CompiledTemplate, MatchContext, compile_template
+from console_ui import TerminalRenderer
+from dashboard import DashboardHub, DashboardServer
+import latency_trace
+import metrics
+import profiling
 
 # ==== CONFIG LADEN ====
-CONFIG_PATH = Path("config.yaml")
-if not CONFIG_PATH.exists():
-    raise FileNotFoundError("config.yaml fehlt! Bitte anlegen.")
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    CONFIG = yaml.safe_load(f) or {}
-
-poll_interval = CONFIG.get("poll_interval", 1)
-write_announcement_files = CONFIG.get("files", {}).get("write_announcement_files", False)
-announcement_cfg = CONFIG.get("announcement") or {}
-default_template = "Tisch {TABLE}: {PLAYER1_FULL} gegen {PLAYER2_FULL}"
-speech_template = (announcement_cfg.get("speech_template") or default_template).strip()
-speech_template_doubles = (announcement_cfg.get("speech_template_doubles") or "").strip()
-notify_sound_raw = (announcement_cfg.get("notify_sound") or "").strip()
-notify_sound = notify_sound_raw or None
-resume_after_raw = announcement_cfg.get("notify_resume_after_seconds")
-if resume_after_raw is None:
-    resume_after_raw = announcement_cfg.get("notify_cooldown_seconds")
-notify_resume_after_seconds = float(resume_after_raw or 0)
-announcements_enabled = bool(announcement_cfg.get("enabled", True))
-mute_enabled = bool(announcement_cfg.get("mute", False))
-notify_sound_path = None
-if notify_sound:
-    p = Path(notify_sound)
-    if not p.is_absolute():
-        p = (CONFIG_PATH.parent / p).resolve()
-    notify_sound_path = p
-notify_sound_name = notify_sound_path.name if notify_sound_path else (Path(notify_sound).name if notify_sound else "")
+CONFIG = require_config()
+
+poll_interval = CONFIG.poll_interval
+files_cfg = CONFIG.files
+write_announcement_files = files_cfg.write_announcement_files
+announcement_file_format = files_cfg.announcement_format.lower()
+announcement_queue_size = files_cfg.announcement_queue_size
+announcement_fsync_interval = files_cfg.announcement_fsync_interval
+announcement_cfg = CONFIG.announcement
+speech_template = announcement_cfg.speech_template
+speech_template_doubles = announcement_cfg.speech_template_doubles
+notify_sound = announcement_cfg.notify_sound or None
+notify_resume_after_seconds = announcement_cfg.notify_resume_after_seconds
+announcements_enabled = announcement_cfg.enabled
+mute_enabled = announcement_cfg.mute
+recall_enabled = CONFIG.recall.enabled
+recall_template = CONFIG.recall.template
+notify_sound_path = CONFIG.resolve_path(notify_sound) if notify_sound else None
+notify_sound_name = notify_sound_path.name if notify_sound_path else ""
+latency_trace_enabled = CONFIG.diagnostics.latency_trace
+ui_max_fps = CONFIG.ui.max_fps
+dashboard_cfg = CONFIG.dashboard
+dashboard_enabled = dashboard_cfg.enabled
+dashboard_host = dashboard_cfg.host or "127.0.0.1"
+dashboard_port = dashboard_cfg.port
+dashboard_token = dashboard_cfg.token
+metrics_cfg = CONFIG.metrics
+metrics_enabled = metrics_cfg.enabled
+metrics_host = metrics_cfg.host or "127.0.0.1"
+metrics_port = metrics_cfg.port
+archive_enabled = CONFIG.archive.enabled
+archive_flush_seconds = CONFIG.archive.flush_seconds
+runtime_mode = CONFIG.runtime.mode.lower()
+playback_first = CONFIG.runtime.playback_first
+synthesis_nice = CONFIG.runtime.synthesis_nice
+synthesis_processes = CONFIG.runtime.synthesis_processes
 
 # ==== ASCII-LOGO ====
 ASCII_LOGO = r"""
@@ -64,33 +92,44 @@ ASCII_LOGO = r"""
 
 _UI_TTY = sys.stdout.isatty()
 _console_lock = threading.Lock()
-_announcements_state_lock = threading.Lock()
+_announcements_state = threading.Condition()  # Pause/Play weckt den Player sofort
+_stop_event = threading.Event()                # Beenden: alle Schleifen wachen auf
+_poll_wakeup = threading.Event()               # Poll-Schleife vorzeitig neu planen
+_STOP = object()
 _mute_state_lock = threading.Lock()
-_tts_preload_lock = threading.Lock()
-_tts_preload_executor = ThreadPoolExecutor(max_workers=max(2, ((os.cpu_count() or 2) // 2) or 1))
-_tts_preloaded_jobs: dict[str, Future] = {}
-_announcement_queue: "Queue[tuple[str, str]]" = Queue()
+_tts_preload_executor: ThreadPoolExecutor | None = None  # erst in start()
+_playback_gate = PlaybackGate(CONFIG.runtime.preloads_while_playing, enabled=playback_first)
+_zone_router = ZoneRouter.from_config(CONFIG.zones)  # je Zone eigene Queue + Player-Thread
+_voice_routes = [(voice.name, table_matcher(voice.tables)) for voice in CONFIG.voices if voice.tables]
 _announcement_meta: dict[str, dict] = {}
 _announcement_order: deque[str] = deque()
-_current_announcement_key: str | None = None
-_notify_skip_logged = False
 _log_history: deque[str] = deque(maxlen=15)
-_announcement_history: deque[tuple[str, str]] = deque(maxlen=20)  # (cache_key, text)
 _show_logs_panel = False
-history_file = BASE_DIR / "announcement_history.json"
+_compiled_templates: tuple[CompiledTemplate, CompiledTemplate | None, CompiledTemplate] | None = None
+_compiled_recall_template: CompiledTemplate | None = None
+history_file = BASE_DIR / "announcement_history.jsonl"
+legacy_history_file = BASE_DIR / "announcement_history.json"
+_history = AnnouncementHistory(history_file, on_error=lambda message: ui_log(message, level="WARN"))
+HISTORY_UI_ENTRIES = 20
+profiles_dir = BASE_DIR / "profiles"
+_announcement_writer: AnnouncementWriter | None = None
+_court_archive: court_archive.CourtArchive | None = None
+_pending_store = PendingQueueStore(BASE_DIR / PENDING_FILE_NAME)
+_pending_restore: list[dict] | None = None  # wird nach dem ersten erfolgreichen Poll geprüft
+_profiler = profiling.SamplingProfiler()
+_stage_pipeline = None  # process_stages.ProcessPipeline, nur mit runtime.mode: processes
 set_tts_muted(mute_enabled)
-
-def clear_screen():
-    try:
-        os.system("cls" if os.name == "nt" else "clear")
-    except Exception:
-        pass
+latency_trace.configure(BASE_DIR / latency_trace.TRACE_FILE_NAME, latency_trace_enabled)
+metrics.define_gauge(
+    "kickertool_announcement_queue_depth",
+    "Wartende Durchsagen in den Wiedergabe-Queues (alle Zonen).",
+    lambda: sum(zone.queue.qsize() for zone in _zone_router),
+)
 
 def show_banner():
     if _UI_TTY:
         render_ui()
     else:
-        clear_screen()
         print(_logo_art())
         print(" " * 36 + "Kickertool TTS\n")
         print("-" * 100)
@@ -98,16 +137,17 @@ def show_banner():
 
 
 def _is_announcements_enabled() -> bool:
-    with _announcements_state_lock:
+    with _announcements_state:
         return announcements_enabled
 
 
 def _set_announcements_enabled(value: bool, source: str = "Config"):
     global announcements_enabled
     value = bool(value)
-    with _announcements_state_lock:
+    with _announcements_state:
         previous = announcements_enabled
         announcements_enabled = value
+        _announcements_state.notify_all()
     if previous != value:
         state = "AKTIV" if value else "PAUSIERT"
         ui_log(f"Ansagen {state} (Quelle: {source}).")
@@ -117,70 +157,140 @@ def _toggle_announcements(source: str = "Konsole"):
     _set_announcements_enabled(not _is_announcements_enabled(), source=source)
 
 
-def render_ui():
-    if not _UI_TTY:
-        return
+def _snapshot_ui_state() -> dict:
+    """Gemeinsamer Zustand für Konsole und Dashboard (nur kurz gesperrt, danach Kopie)."""
     with _console_lock:
-        clear_screen()
-        width = shutil.get_terminal_size((120, 30)).columns
-        width = max(60, width)
-        print(_logo_art())
-        print("Kickertool TTS".center(width))
-        print("-" * width)
-        status = "AKTIV" if _is_announcements_enabled() else "PAUSIERT"
-        notify_state = "bereit" if notify_sound_path else "aus"
-        mute_state = "stumm" if _is_muted() else "an"
-        print(f"Ansagen: {status} | Ton: {mute_state} | Hinweiston: {notify_state} | Queue: {len(_announcement_order)}")
-        pause_label = "[P]lay" if not _is_announcements_enabled() else "[P]ause"
-        print(f"Befehle: {pause_label}, [M]ute, [R]eplay, [L]ogs")
-        print("-" * width)
-        print("Anstehende Durchsagen:")
-        if not _announcement_order:
-            print("  (keine)")
-        else:
-            for key in list(_announcement_order):
-                meta = _announcement_meta.get(key)
-                if not meta:
-                    continue
-                status_marker = ">" if meta.get("status") == "playing" else "\u2022"
-                lines = meta["text"].splitlines() or [meta["text"]]
-                if meta.get("status") == "playing" and _UI_TTY:
-                    lines = [f"\x1b[32m{line}\x1b[0m" for line in lines]
-                print(f"  {status_marker} {lines[0]}")
-                for extra in lines[1:]:
-                    print(f"    {extra}")
-        print("-" * width)
-        print("Letzte Durchsagen:")
-        if not _announcement_history:
-            print("  (keine)")
-        else:
-            for idx, (_, text) in enumerate(list(_announcement_history)[:5], start=1):
-                lines = text.splitlines()
-                primary = lines[0]
-                if len(primary) > width - 6:
-                    primary = primary[: width - 9] + "..."
-                print(f"  {idx:>2}. {primary}")
-        print("-" * width)
-        if _show_logs_panel:
-            print("Logs:")
-            if not _log_history:
-                print("  (keine)")
-            else:
-                for entry in _log_history:
-                    print(f"  {entry}")
+        queue = [
+            {"text": meta["text"], "status": meta.get("status"), "zone": meta.get("zone")}
+            for meta in (_announcement_meta.get(key) for key in _announcement_order)
+            if meta
+        ]
+        history = [entry.text for entry in _history.recent(HISTORY_UI_ENTRIES)]
+        logs = list(_log_history)
+        show_logs = _show_logs_panel
+    return {
+        "enabled": _is_announcements_enabled(),
+        "muted": _is_muted(),
+        "notify_sound": bool(notify_sound_path),
+        "queue": queue,
+        "zones": [
+            {"name": zone.name, "paused": zone.paused, "muted": zone.muted, "device": zone.device}
+            for zone in _zone_router
+        ],
+        "history": history,
+        "logs": logs,
+        "show_logs": show_logs,
+    }
+
+
+def _build_ui_frame(width: int) -> list[str]:
+    state = _snapshot_ui_state()
+    multi_zone = len(state["zones"]) > 1
+    queued = [
+        (f"[{item['zone']}] {item['text']}" if multi_zone and item.get("zone") else item["text"], item["status"])
+        for item in state["queue"]
+    ]
+    history = state["history"][:5]
+    logs = state["logs"] if state["show_logs"] else None
+    enabled = state["enabled"]
+    width = max(60, width)
+    out = _logo_art().split("\n")
+    out.append("Kickertool TTS".center(width))
+    out.append("-" * width)
+    status = "AKTIV" if enabled else "PAUSIERT"
+    notify_state = "bereit" if notify_sound_path else "aus"
+    mute_state = "stumm" if state["muted"] else "an"
+    out.append(f"Ansagen: {status} | Ton: {mute_state} | Hinweiston: {notify_state} | Queue: {len(queued)}")
+    if multi_zone:
+        zone_labels = []
+        for idx, zone in enumerate(state["zones"], start=1):
+            flags = [flag for flag, on in (("pausiert", zone["paused"]), ("stumm", zone["muted"])) if on]
+            zone_labels.append(f"{idx}:{zone['name']}" + (f" ({', '.join(flags)})" if flags else ""))
+        out.append("Zonen: " + " | ".join(zone_labels))
+    pause_label = "[P]lay" if not enabled else "[P]ause"
+    out.append(f"Befehle: {pause_label}, [M]ute, [R]eplay, [L]ogs" + (", p/mute <Zone>, [Z]ones" if multi_zone else ""))
+    out.append("-" * width)
+    out.append("Anstehende Durchsagen:")
+    if not queued:
+        out.append("  (keine)")
+    else:
+        for text, state in queued:
+            status_marker = ">" if state == "playing" else "\u2022"
+            lines = text.splitlines() or [text]
+            if state == "playing":
+                lines = [f"\x1b[32m{line}\x1b[0m" for line in lines]
+            out.append(f"  {status_marker} {lines[0]}")
+            out.extend(f"    {extra}" for extra in lines[1:])
+    out.append("-" * width)
+    out.append("Letzte Durchsagen:")
+    if not history:
+        out.append("  (keine)")
+    else:
+        for idx, text in enumerate(history, start=1):
+            primary = text.splitlines()[0]
+            if len(primary) > width - 6:
+                primary = primary[: width - 9] + "..."
+            out.append(f"  {idx:>2}. {primary}")
+    out.append("-" * width)
+    if logs is not None:
+        out.append("Logs:")
+        if not logs:
+            out.append("  (keine)")
         else:
-            print("Logs verborgen – 'logs' eingeben zum Anzeigen.")
-        print("-" * width)
+            out.extend(f"  {entry}" for entry in logs)
+    else:
+        out.append("Logs verborgen – 'logs' eingeben zum Anzeigen.")
+    out.append("-" * width)
+    return out
+
+
+_renderer = TerminalRenderer(_build_ui_frame, max_fps=ui_max_fps)
+_dashboard_hub = DashboardHub(_snapshot_ui_state)
+_dashboard_server: DashboardServer | None = None
+
+
+def render_ui():
+    """Fordert eine Neuzeichnung an; gezeichnet wird im Renderer-Thread (max. ``ui.max_fps``)."""
+    if _UI_TTY:
+        _renderer.request()
+    _dashboard_hub.publish()
+
 
+def ui_log(message: str, level: str = "INFO", *, stage: str = "", match_id: str | None = None):
+    """Nicht blockierend: Konsole und Logdatei bedient der ``log-writer``-Thread."""
+    _log_pipeline.log(level, message, stage=stage, match_id=match_id)
 
-def ui_log(message: str, level: str = "INFO"):
-    entry = f"[{level}] {message}"
+
+def _show_log_entry(entry: str):
     with _console_lock:
         _log_history.append(entry)
     if not _UI_TTY:
         print(entry)
-    else:
-        render_ui()
+    render_ui()
+
+
+_log_pipeline = LogPipeline(_show_log_entry)
+
+
+def _match_id_for(cache_key: str) -> str | None:
+    with _console_lock:
+        meta = _announcement_meta.get(cache_key)
+    return (meta.get("info") or {}).get("match_id") if meta else None
+
+
+def _voice_for(table: str | None) -> str:
+    """Stimme aus ``voices``, deren ``tables`` passen; ``""`` = Standardstimme."""
+    if table:
+        for name, matches in _voice_routes:
+            if matches(table):
+                return name
+    return ""
+
+
+def _voice_for_key(cache_key: str) -> str:
+    with _console_lock:
+        meta = _announcement_meta.get(cache_key)
+    return _voice_for((meta.get("info") or {}).get("table")) if meta and _voice_routes else ""
 
 
 def _normalize_cache_key(cache_key: str | None, text: str) -> str:
@@ -193,47 +303,142 @@ def _normalize_cache_key(cache_key: str | None, text: str) -> str:
     return f"anon-{time.time_ns()}"
 
 
-def _preload_tts_job(cache_key: str, text: str):
+def _prepare_traced(cache_key: str, text: str, cancel: CancelToken | None = None, voice: str = ""):
+    latency_trace.mark(cache_key, "synth_started")
+    try:
+        if _stage_pipeline is not None:
+            from process_stages import StageError
+            try:
+                return _stage_pipeline.prepare(text, cancel, voice)
+            except StageError as exc:
+                ui_log(f"Synthese-Prozess: {exc} – synthetisiere im Hauptprozess.", level="WARN", stage="synthesis")
+        return prepare_tts_playback(text, cancel, voice)
+    finally:
+        latency_trace.mark(cache_key, "synth_finished")
+
+
+def _prepare_preload(cache_key: str, text: str, cancel: CancelToken | None = None, voice: str = ""):
+    """Vorab-Synthese: wartet, solange Audio läuft und schon genug synthetisiert wird."""
+    with _playback_gate.preload(cache_key, cancel):
+        return _prepare_traced(cache_key, text, cancel, voice)
+
+
+def _release_prepared_job(job):
+    release = getattr(job, "release", None)
+    if release is not None:
+        release()  # Mehrprozess-Betrieb: Audio wurde noch keinem Player übergeben
+    else:
+        release_audio(getattr(job, "wav_path", None))
+
+
+def _prepared_from_file(wav_path: str | None):
+    if _stage_pipeline is not None:
+        return _stage_pipeline.file_job(wav_path)
+    return prepared_audio_job(wav_path)
+
+
+def _is_waiting(cache_key: str) -> bool:
+    with _console_lock:
+        return cache_key in _announcement_meta
+
+
+def _referenced_audio() -> set[str]:
+    """WAVs, die wartende oder gesicherte Durchsagen noch brauchen (nicht vom Sweeper löschen)."""
+    with _console_lock:
+        paths = {meta["audio"] for meta in _announcement_meta.values() if meta.get("audio")}
+    paths.update(entry["audio"] for entry in (_pending_restore or ()) if entry.get("audio"))
+    return paths
+
+
+_preload_cache = PreloadCache(
+    _prepare_preload, _release_prepared_job,
+    max_items=CONFIG.tts.preload_max_items,
+    max_bytes=int(CONFIG.tts.preload_max_mb * 1024 * 1024),
+    ttl=CONFIG.tts.preload_ttl_seconds,
+    pinned=_is_waiting,
+    orphan_locations=temp_audio_locations,
+    referenced=_referenced_audio,
+)
+
+
+def _preload_tts_job(cache_key: str, text: str, voice: str | None = None):
     spoken = (text or "").strip()
     if not spoken:
         return
     key = _normalize_cache_key(cache_key, spoken)
-    with _tts_preload_lock:
-        future = _tts_preloaded_jobs.get(key)
-        if future and not future.done():
+    if _tts_preload_executor is None or _preload_cache.is_pending(key):
+        return
+    latency_trace.mark(cache_key, "synth_queued")
+    future = _preload_cache.submit(key, cache_key, spoken, _voice_for_key(cache_key) if voice is None else voice)
+    if future is None:
+        return
+    future.add_done_callback(lambda done: _remember_prepared_audio(cache_key, done))
+
+
+def _remember_prepared_audio(cache_key: str, future: Future):
+    """Merkt sich die fertige WAV zur wartenden Durchsage, damit sie einen Neustart übersteht."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    wav_path = getattr(future.result(), "wav_path", None)
+    if not wav_path:
+        return
+    with _console_lock:
+        meta = _announcement_meta.get(cache_key)
+        if meta is None:
             return
-        _tts_preloaded_jobs[key] = _tts_preload_executor.submit(prepare_tts_playback, spoken)
+        meta["audio"] = wav_path
+    _persist_pending()
 
 
 def _take_prepared_job(cache_key: str, text: str):
     key = _normalize_cache_key(cache_key, text)
-    future: Future | None = None
-    with _tts_preload_lock:
-        future = _tts_preloaded_jobs.pop(key, None)
+    future = _preload_cache.take(key)
     job = None
     if future is not None:
+        preload_result = "hit" if future.done() else "pending"
+        latency_trace.annotate(cache_key, preload=preload_result)
+        metrics.inc("kickertool_preload_total", result=preload_result)
         try:
-            job = future.result()
+            with _playback_gate.expedite(cache_key):
+                job = future.result()
         except Exception as exc:
-            ui_log(f"Vorbereiten der TTS fehlgeschlagen: {exc}", level="WARN")
+            ui_log(f"Vorbereiten der TTS fehlgeschlagen: {exc}", level="WARN",
+                   stage="synthesis", match_id=_match_id_for(cache_key))
+    else:
+        latency_trace.annotate(cache_key, preload="miss")
+        metrics.inc("kickertool_preload_total", result="miss")
     if job is None:
-        job = prepare_tts_playback(text)
+        job = _prepare_traced(cache_key, text, voice=_voice_for_key(cache_key))
     return job
 
 
-def _queue_announcement(cache_key: str, text: str, *, record_history: bool = True):
+def _queue_announcement(cache_key: str, text: str, *, record_history: bool = True, info: dict | None = None,
+                        prepared=None):
     spoken = (text or "").strip()
     if not spoken:
+        latency_trace.discard(cache_key)
         return
-    _preload_tts_job(cache_key, spoken)
-    _announcement_queue.put((cache_key, spoken))
+    latency_trace.begin(cache_key, kind="announcement" if record_history else "replay")
+    zone = _zone_router.zone_for((info or {}).get("table"))
     with _console_lock:
         _announcement_meta[cache_key] = {
             "text": spoken,
             "status": "queued",
             "record_history": record_history,
+            "info": info or {},
+            "queued": time.time(),
+            "zone": zone.name,
         }
         _announcement_order.append(cache_key)
+    if prepared is not None:
+        # schon synthetisiert (wiederhergestellte Warteschlange)
+        _preload_cache.put_ready(_normalize_cache_key(cache_key, spoken), prepared)
+        with _console_lock:
+            _announcement_meta[cache_key]["audio"] = getattr(prepared, "wav_path", None)
+    else:
+        _preload_tts_job(cache_key, spoken)
+    zone.queue.put((cache_key, spoken))
+    _persist_pending()
     if not _is_announcements_enabled():
         ui_log("Ansagen pausiert – Durchsage wartet.")
     else:
@@ -251,152 +456,45 @@ def _make_announcement_key(tischname: str | None, match_id: str | None, team_a:
     return "|".join(parts)
 
 
-def _split_player_name(name: str) -> dict:
-    name = (name or "").strip()
-    if not name:
-        return {"full": "", "first": "", "last": ""}
-
-    if "," in name:
-        last, first = [part.strip() for part in name.split(",", 1)]
-    else:
-        parts = name.split()
-        if len(parts) == 1:
-            first, last = parts[0], parts[0]
-        else:
-            first = parts[0]
-            last = parts[-1]
-
-    first = first or name
-    last = last or name
-    return {"full": name, "first": first, "last": last}
-
-
-TEAM_DELIMITER_PATTERN = re.compile(r"\s*(?:/|&|\+|\bund\b)\s*", re.IGNORECASE)
-
-
-def _split_team_members(name: str) -> list:
-    if not (name or "").strip():
-        return []
-    raw = name.strip()
-    if TEAM_DELIMITER_PATTERN.search(raw):
-        return [part.strip() for part in TEAM_DELIMITER_PATTERN.split(raw) if part.strip()]
-    return [raw]
-
-
-TEMPLATE_PATTERN = re.compile(r"{([^{}]+)}")
-
-
-def _normalize_placeholder_key(raw: str) -> str:
-    cleaned = re.sub(r"[^A-Za-z0-9]+", "_", raw.strip())
-    return cleaned.upper().strip("_")
-
-
-def _add_aliases(context: dict) -> dict:
-    enriched = {}
-    for key, value in context.items():
-        if not key:
-            continue
-        variants = {
-            key,
-            key.upper(),
-            key.lower(),
-            _normalize_placeholder_key(key),
-        }
-        for variant in variants:
-            if variant:
-                enriched[variant] = value
-    return enriched
-
-
-def _add_member_placeholders(context: dict, prefix: str, members: list):
-    prefix = prefix.upper()
-    count = min(len(members), 2)
-    for idx in range(count):
-        info = _split_player_name(members[idx])
-        slot = f"{prefix}_PLAYER{idx + 1}"
-        context[f"{slot}_FULL"] = info["full"]
-        context[f"{slot}_FULLNAME"] = info["full"]
-        context[f"{slot}_FIRST"] = info["first"]
-        context[f"{slot}_FIRSTNAME"] = info["first"]
-        context[f"{slot}_NAME"] = info["first"]
-        context[f"{slot}_SURNAME"] = info["last"]
-        context[f"{slot}_LASTNAME"] = info["last"]
-    for idx in range(count, 2):
-        slot = f"{prefix}_PLAYER{idx + 1}"
-        context[f"{slot}_FULL"] = ""
-        context[f"{slot}_FULLNAME"] = ""
-        context[f"{slot}_FIRST"] = ""
-        context[f"{slot}_FIRSTNAME"] = ""
-        context[f"{slot}_NAME"] = ""
-        context[f"{slot}_SURNAME"] = ""
-        context[f"{slot}_LASTNAME"] = ""
-
-
-def _build_template_context(table: str, player_a: str, player_b: str) -> dict:
-    team_a_members = _split_team_members(player_a)
-    team_b_members = _split_team_members(player_b)
-    primary_a = team_a_members[0] if team_a_members else (player_a or "")
-    primary_b = team_b_members[0] if team_b_members else (player_b or "")
-    p1 = _split_player_name(primary_a)
-    p2 = _split_player_name(primary_b)
-    is_doubles = max(len(team_a_members), len(team_b_members)) > 1
-    context = {
-        "TABLE": table or "",
-        "TABLE_NAME": table or "",
-        "PLAYER1_FULL": p1["full"],
-        "PLAYER1_FULLNAME": p1["full"],
-        "PLAYER1_FIRST": p1["first"],
-        "PLAYER1_FIRSTNAME": p1["first"],
-        "PLAYER1_NAME": p1["first"],
-        "PLAYER1_SURNAME": p1["last"],
-        "PLAYER1_LASTNAME": p1["last"],
-        "PLAYER2_FULL": p2["full"],
-        "PLAYER2_FULLNAME": p2["full"],
-        "PLAYER2_FIRST": p2["first"],
-        "PLAYER2_FIRSTNAME": p2["first"],
-        "PLAYER2_NAME": p2["first"],
-        "PLAYER2_SURNAME": p2["last"],
-        "PLAYER2_LASTNAME": p2["last"],
-        "TEAM_A": player_a or "",
-        "TEAM_B": player_b or "",
+def _compile_speech_templates():
+    """Kompiliert die Vorlagen aus der Config; unbekannte Platzhalter werden sofort gemeldet."""
+    global _compiled_templates, _compiled_recall_template
+    constants = {
         "NOTIFY_SOUND": notify_sound_name or "",
         "NOTIFY_SOUND_NAME": notify_sound_name or "",
         "NOTIFY_SOUND_PATH": str(notify_sound_path) if notify_sound_path else (notify_sound or ""),
-        "TEAM_A_MEMBER_COUNT": len(team_a_members),
-        "TEAM_B_MEMBER_COUNT": len(team_b_members),
-        "IS_DOUBLES": is_doubles,
-        "IS_SINGLES": not is_doubles,
     }
-    _add_member_placeholders(context, "TEAM_A", team_a_members)
-    _add_member_placeholders(context, "TEAM_B", team_b_members)
-    return _add_aliases(context)
+    compiled_singles = compile_template(speech_template or DEFAULT_SPEECH_TEMPLATE, constants)
+    compiled_doubles = compile_template(speech_template_doubles, constants) if speech_template_doubles else None
+    compiled_default = compile_template(DEFAULT_SPEECH_TEMPLATE, constants)
+    compiled_recall = compile_template(recall_template or DEFAULT_RECALL_TEMPLATE, constants)
+    for name, compiled in (("speech_template", compiled_singles), ("speech_template_doubles", compiled_doubles),
+                           ("recall.template", compiled_recall)):
+        if compiled is not None and compiled.unknown:
+            ui_log(f"Unbekannte Platzhalter in {name}: {', '.join(compiled.unknown)}", level="WARN")
+    # Als Tupel tauschen, damit parallele Aufrufe nie eine halb aktualisierte Kombination sehen
+    _compiled_templates = (compiled_singles, compiled_doubles, compiled_default)
+    _compiled_recall_template = compiled_recall
 
 
-def _render_template(template: str, context: dict) -> str:
-    def replacer(match):
-        raw_key = match.group(1)
-        key = _normalize_placeholder_key(raw_key)
-        if not key:
-            return match.group(0)
-        return str(context.get(key, match.group(0)))
-
-    return TEMPLATE_PATTERN.sub(replacer, template)
+def format_spoken_text(table: str, player_a: str, player_b: str) -> str:
+    singles, doubles, fallback_template = _compiled_templates
+    ctx = MatchContext(table, player_a, player_b)
+    template = doubles if doubles is not None and ctx.is_doubles else singles
+    text = template.render(ctx).strip()
+    if text:
+        return text
+    fallback = fallback_template.render(ctx).strip()
+    return fallback or DEFAULT_SPEECH_TEMPLATE
 
 
-def _select_template(context: dict) -> str:
-    if context.get("IS_DOUBLES") and speech_template_doubles:
-        return speech_template_doubles
-    return speech_template or default_template
+def format_recall_text(table: str, player_a: str, player_b: str) -> str:
+    """Kürzere Vorlage für den erneuten Aufruf; leer gerendert gilt die normale Durchsage."""
+    text = _compiled_recall_template.render(MatchContext(table, player_a, player_b)).strip()
+    return text or format_spoken_text(table, player_a, player_b)
 
 
-def format_spoken_text(table: str, player_a: str, player_b: str) -> str:
-    context = _build_template_context(table, player_a, player_b)
-    template = _select_template(context)
-    text = _render_template(template, context).strip()
-    if text:
-        return text
-    fallback = _render_template(default_template, context).strip()
-    return fallback or default_template
+_compile_speech_templates()
 
 
 def _escape_for_powershell(value: str) -> str:
@@ -432,7 +530,12 @@ def _play_with_wmplayer(audio_path: Path) -> bool:
         return False
 
 
-def _play_with_system_player(audio_path: Path) -> bool:
+def _play_with_system_player(audio_path: Path, device: str = "", player: str = "") -> bool:
+    if device:
+        cmd = device_play_command(str(audio_path), device, player)
+        if cmd is not None:
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            return True
     commands = [
         ["ffplay", "-autoexit", "-nodisp", "-loglevel", "quiet", str(audio_path)],
         ["afplay", str(audio_path)],
@@ -494,84 +597,128 @@ def _play_with_presentation_core(audio_path: Path) -> bool:
         return False
 
 
-_last_speech_finished = 0.0
-
-
-def play_notification_sound():
-    global _last_speech_finished, _notify_skip_logged
-    if _is_muted():
-        return
+def play_notification_sound(zone: Zone | None = None) -> bool:
+    """Hinweiston vor einer Durchsage; Pause-Erkennung und Ausgabegerät gelten pro Zone."""
+    zone = zone or _zone_router.default
+    if _is_muted() or zone.muted:
+        metrics.inc("kickertool_notify_sound_total", result="muted")
+        return False
     if not notify_sound_path:
-        return
+        return False
     now = time.monotonic()
     since_last = None
-    if _last_speech_finished:
-        since_last = now - _last_speech_finished
+    if zone.last_speech_finished:
+        since_last = now - zone.last_speech_finished
     if notify_resume_after_seconds > 0 and since_last is not None:
         if since_last < notify_resume_after_seconds:
-            if not _notify_skip_logged:
+            if not zone.notify_skip_logged:
                 remaining = max(0.0, notify_resume_after_seconds - since_last)
                 ui_log(f"Hinweiston wartet noch {remaining:.1f}s.")
-                _notify_skip_logged = True
-            return
-        elif _notify_skip_logged:
+                zone.notify_skip_logged = True
+            metrics.inc("kickertool_notify_sound_total", result="skipped")
+            return False
+        elif zone.notify_skip_logged:
             ui_log("Hinweiston wieder aktiv.")
-            _notify_skip_logged = False
+            zone.notify_skip_logged = False
     if not notify_sound_path.is_file():
         ui_log(f"Hinweiston nicht gefunden: {notify_sound_path}", level="WARN")
-        return
+        metrics.inc("kickertool_notify_sound_total", result="failed")
+        return False
     try:
         if os.name == "nt":
             played = _play_audio_windows(notify_sound_path)
         else:
-            played = _play_with_system_player(notify_sound_path)
+            played = _play_with_system_player(notify_sound_path, zone.device, zone.player)
         if not played:
             ui_log(f"Konnte Hinweiston {notify_sound_path} nicht abspielen.", level="WARN")
-            return
-        _notify_skip_logged = False
+            metrics.inc("kickertool_notify_sound_total", result="failed")
+            return False
+        metrics.inc("kickertool_notify_sound_total", result="played")
+        zone.notify_skip_logged = False
         if since_last is None:
             ui_log("Hinweiston abgespielt (erste Ansage).")
         else:
             ui_log(f"Hinweiston abgespielt (Pause {since_last:.1f}s).")
+        return True
     except Exception as exc:
         ui_log(f"Hinweiston-Fehler: {exc}", level="WARN")
+        metrics.inc("kickertool_notify_sound_total", result="failed")
+        return False
 
 
-def _announce_text(cache_key: str, text: str):
-    global _last_speech_finished
+def _announce_text(cache_key: str, text: str, zone: Zone | None = None):
+    zone = zone or _zone_router.default
     spoken = (text or "").strip()
     if not spoken:
+        latency_trace.discard(cache_key)
         return
     job = _take_prepared_job(cache_key, spoken)
     if job is None:
-        ui_log("Konnte TTS nicht vorbereiten – Hinweiston übersprungen.", level="WARN")
+        ui_log("Konnte TTS nicht vorbereiten – Hinweiston übersprungen.", level="WARN",
+               match_id=_match_id_for(cache_key))
+        latency_trace.finish(cache_key, status="failed")
         return
-    play_notification_sound()
-    job()
-    _last_speech_finished = time.monotonic()
+    with _playback_gate.playback():
+        notified = play_notification_sound(zone)
+        latency_trace.mark(cache_key, "notify_played")
+        latency_trace.annotate(cache_key, notify=notified)
+        latency_trace.mark(cache_key, "speech_start")
+        if zone.muted:
+            _release_prepared_job(job)
+        else:
+            job(device=zone.device, player=zone.player)
+        zone.last_speech_finished = time.monotonic()
+    latency_trace.mark(cache_key, "speech_end", zone.last_speech_finished)
+    latency_trace.finish(cache_key)
     with _console_lock:
         meta = _announcement_meta.get(cache_key, {})
-        if meta.get("record_history", True):
-            _announcement_history.appendleft((cache_key, text))
-    _persist_history()
+    ui_log(f"Durchsage beendet (Zone {zone.name}).", level="DEBUG",
+           match_id=(meta.get("info") or {}).get("match_id"))
+    if meta.get("record_history", True):
+        info = meta.get("info") or {}
+        _record_history(cache_key, text, info)
+        if _court_archive is not None:
+            _court_archive.record_announcement(time.time(), info.get("table"), info.get("match_id"))
+
+
+def _wait_until_enabled(zone: Zone) -> bool:
+    """Blockiert, solange Ansagen (global oder in der Zone) pausiert sind. ``False`` beim Beenden."""
+    with _announcements_state:
+        _announcements_state.wait_for(
+            lambda: (announcements_enabled and not zone.paused) or _stop_event.is_set()
+        )
+    return not _stop_event.is_set()
 
 
-def _announcement_worker():
-    global _current_announcement_key
+def _announcement_worker(zone: Zone):
     while True:
-        cache_key, text = _announcement_queue.get()
+        item = zone.queue.get()
+        if item is _STOP or _stop_event.is_set():
+            # Rest bleibt in der gesicherten Warteschlange für den nächsten Start
+            zone.queue.task_done()
+            return
+        cache_key, text = item
+        if not _wait_until_enabled(zone):
+            zone.queue.task_done()
+            return
         try:
-            while not _is_announcements_enabled():
-                time.sleep(0.25)
+            latency_trace.mark(cache_key, "dequeued")
             with _console_lock:
                 meta = _announcement_meta.get(cache_key)
-                if meta:
+                cancelled = bool(meta and meta.get("cancelled"))
+                if meta and not cancelled:
                     meta["status"] = "playing"
-                _current_announcement_key = cache_key
+                    zone.current_key = cache_key
+            if cancelled:
+                # erneuter Aufruf, dessen Match inzwischen begonnen hat
+                _preload_cache.discard(_normalize_cache_key(cache_key, text))
+                latency_trace.discard(cache_key)  # nie gesprochen – keine Latenz
+                continue
             render_ui()
-            _announce_text(cache_key, text)
+            _announce_text(cache_key, text, zone)
         except Exception as exc:
-            ui_log(f"TTS-Worker-Fehler: {exc}", level="WARN")
+            ui_log(f"TTS-Worker-Fehler: {exc}", level="WARN", match_id=_match_id_for(cache_key))
+            latency_trace.finish(cache_key, status="error")
         finally:
             with _console_lock:
                 _announcement_meta.pop(cache_key, None)
@@ -579,14 +726,11 @@ def _announcement_worker():
                     _announcement_order.remove(cache_key)
                 except ValueError:
                     pass
-                if _current_announcement_key == cache_key:
-                    _current_announcement_key = None
+                if zone.current_key == cache_key:
+                    zone.current_key = None
+            _persist_pending()
             render_ui()
-            _announcement_queue.task_done()
-
-
-_announcement_thread = threading.Thread(target=_announcement_worker, daemon=True, name="announcement-player")
-_announcement_thread.start()
+            zone.queue.task_done()
 
 
 def _command_listener():
@@ -596,8 +740,7 @@ def _command_listener():
         except Exception:
             break
         if raw == "":
-            time.sleep(0.25)
-            continue
+            break  # stdin geschlossen (Dienst, Pipe) – es kommen keine Befehle mehr
         raw_cmd = raw.strip()
         if not raw_cmd:
             continue
@@ -605,20 +748,64 @@ def _command_listener():
         base = parts[0].lower()
         arg = parts[1] if len(parts) > 1 else ""
         if base in ("pause", "p"):
-            _set_announcements_enabled(not _is_announcements_enabled(), "Konsole")
+            if arg:
+                _toggle_zone(arg, "paused", "Konsole")
+            else:
+                _set_announcements_enabled(not _is_announcements_enabled(), "Konsole")
         elif base in ("mute", "m"):
-            _toggle_mute("Konsole")
+            if arg:
+                _toggle_zone(arg, "muted", "Konsole")
+            else:
+                _toggle_mute("Konsole")
+        elif base in ("zones", "z"):
+            _print_zones()
         elif base in ("logs", "l"):
             _toggle_logs_panel()
         elif base in ("replay", "r"):
             cmd_for_replay = f"replay {arg}".strip() if arg else "replay"
-            _handle_replay_command(cmd_for_replay.lower())
+            _handle_replay_command(cmd_for_replay)
+        elif base in ("trace", "t"):
+            ui_log("Latenz pro Stufe:\n" + latency_trace.report())
+        elif base in ("prof", "profile"):
+            _handle_profile_command(arg.lower())
+        elif base == "mem":
+            _handle_memory_command(arg.lower())
+        else:
+            ui_log(f"Unbekannter Befehl '{raw_cmd}'. Verfügbar: p, mute, zones, replay, logs, trace, prof, mem.")
+
+
+def _set_zone_flag(zone: Zone, flag: str, value: bool, source: str):
+    with _announcements_state:
+        previous = getattr(zone, flag)
+        setattr(zone, flag, value)
+        _announcements_state.notify_all()
+    if previous != value:
+        if flag == "paused":
+            state = "PAUSIERT" if value else "AKTIV"
         else:
-            ui_log(f"Unbekannter Befehl '{raw_cmd}'. Verfügbar: p, mute, replay, logs.")
+            state = "STUMM" if value else "AN"
+        ui_log(f"Zone {zone.name}: {state} (Quelle: {source}).")
+    render_ui()
+
+
+def _toggle_zone(query: str, flag: str, source: str) -> str | None:
+    """``p <zone>`` / ``mute <zone>``: Zone per Nummer oder Name umschalten."""
+    zone = _zone_router.find(query)
+    if zone is None:
+        message = f"Zone '{query}' nicht gefunden – 'zones' listet alle Zonen."
+        ui_log(message, level="WARN")
+        return message
+    _set_zone_flag(zone, flag, not getattr(zone, flag), source)
+    return None
 
 
-_command_thread = threading.Thread(target=_command_listener, daemon=True, name="command-listener")
-_command_thread.start()
+def _print_zones():
+    lines = []
+    for idx, zone in enumerate(_zone_router, start=1):
+        tables = ", ".join(zone.patterns) if zone.patterns else "alle übrigen Tische"
+        device = zone.device or "Standardgerät"
+        lines.append(f"  {idx}. {zone.label()} – Tische: {tables} – Ausgabe: {device} – Queue: {zone.queue.qsize()}")
+    ui_log("Zonen:\n" + "\n".join(lines))
 
 
 def _handle_replay_command(cmd: str):
@@ -627,51 +814,162 @@ def _handle_replay_command(cmd: str):
         _print_replay_list()
         return
     selection = args[1]
-    if "-" in selection:
+    recent = _history.recent(HISTORY_UI_ENTRIES)
+    if re.fullmatch(r"\d+-\d+", selection):
         start_str, end_str = selection.split("-", 1)
-        try:
-            start = int(start_str)
-            end = int(end_str)
-        except ValueError:
-            ui_log("Ungültiger Bereich. Beispiel: replay 1-3", level="WARN")
-            return
+        start = int(start_str)
+        end = int(end_str)
         if start < 1 or end < start:
             ui_log("Bereich außerhalb der verfügbaren Einträge.", level="WARN")
             return
-        entries = list(_announcement_history)
-        to_replay = entries[start - 1 : end]
-    else:
-        try:
-            index = int(selection)
-        except ValueError:
-            ui_log("Ungültige Auswahl. Beispiel: replay 2 oder replay 1-3", level="WARN")
-            return
-        if index < 1 or index > len(_announcement_history):
+        to_replay = recent[start - 1 : end]
+    elif selection.isdigit() and len(args) == 2:
+        index = int(selection)
+        if index < 1 or index > len(recent):
             ui_log("Auswahl außerhalb der letzten Einträge.", level="WARN")
             return
-        entries = list(_announcement_history)
-        to_replay = [entries[index - 1]]
+        to_replay = [recent[index - 1]]
+    else:
+        to_replay = _search_history(" ".join(args[1:]))
+        if to_replay is None:
+            return
 
-    for _, text in reversed(to_replay):
+    for entry in reversed(to_replay):
         replay_key = _make_announcement_key("replay", None, "", "")
-        _queue_announcement(replay_key, text, record_history=False)
+        _queue_announcement(replay_key, entry.text, record_history=False, info={"table": entry.table})
     ui_log(f"{len(to_replay)} Durchsage(n) erneut eingereiht.")
 
 
+def _search_history(query: str) -> list | None:
+    """``tisch 5``, ``match <id>``, ``um 14:05`` oder ein Spielername – jeweils die neueste Durchsage."""
+    words = query.split()
+    head = words[0].lower()
+    rest = " ".join(words[1:])
+    if head in ("tisch", "table") and rest:
+        matches = _history.by_table(rest)
+        label = f"Tisch {rest}"
+    elif head == "match" and rest:
+        matches = _history.by_match(rest)
+        label = f"Match {rest}"
+    elif head == "um" and rest:
+        try:
+            clock = datetime.strptime(rest, "%H:%M").time()
+        except ValueError:
+            ui_log("Ungültige Uhrzeit. Beispiel: replay um 14:05", level="WARN")
+            return None
+        entry = _history.at(datetime.combine(datetime.now().date(), clock).timestamp())
+        matches = [entry] if entry else []
+        label = f"um {rest}"
+    else:
+        matches = _history.by_player(query)
+        label = f"'{query}'"
+    if not matches:
+        ui_log(f"Keine Durchsage zu {label} gefunden.", level="WARN")
+        return None
+    if len(matches) > 1:
+        ui_log(f"{len(matches)} Durchsagen zu {label} – spiele die neueste.")
+    return matches[:1]
+
+
 def _print_replay_list():
-    if not _announcement_history:
+    if not len(_history):
         ui_log("Noch keine vergangenen Durchsagen vorhanden.", level="INFO")
         return
     lines = ["Letzte Durchsagen:"]
-    entries = list(_announcement_history)[:10]
-    for idx, (_, text) in enumerate(entries, start=1):
-        snippet = text.replace("\n", " ")
+    for idx, entry in enumerate(_history.recent(10), start=1):
+        snippet = entry.text.replace("\n", " ")
         if len(snippet) > 90:
             snippet = snippet[:87] + "..."
         lines.append(f"{idx:>2}: {snippet}")
     ui_log("\n".join(lines))
 
 
+def _handle_profile_command(arg: str):
+    if arg in ("start", ""):
+        if _profiler.running:
+            ui_log(_profiler.status())
+            return
+        _profiler.start()
+        ui_log(f"Profiler gestartet (alle Threads, Intervall {_profiler.interval * 1000:.0f} ms).")
+    elif arg == "stop":
+        if not _profiler.running:
+            ui_log("Profiler läuft nicht.", level="WARN")
+            return
+        _profiler.stop()
+        _dump_profile()
+    elif arg == "status":
+        ui_log(_profiler.status())
+    else:
+        ui_log("Verwendung: prof start | prof stop | prof status", level="WARN")
+
+
+def _dump_profile():
+    try:
+        path = _profiler.dump(profiles_dir)
+        ui_log(f"{_profiler.status()} Profil gespeichert: {path}")
+    except Exception as exc:
+        ui_log(f"Konnte Profil nicht speichern: {exc}", level="WARN")
+
+
+def _handle_memory_command(arg: str):
+    if arg == "stop":
+        profiling.stop_memory_tracing()
+        ui_log("Speicher-Tracing beendet.")
+        return
+    # Auswertung großer Snapshots dauert Sekunden – nicht im Konsolen-Thread
+    threading.Thread(target=_write_memory_snapshot, daemon=True, name="memory-snapshot").start()
+
+
+def _write_memory_snapshot():
+    try:
+        path = profiling.take_memory_snapshot(profiles_dir)
+    except Exception as exc:
+        ui_log(f"Speicher-Snapshot fehlgeschlagen: {exc}", level="WARN")
+        return
+    if path is None:
+        ui_log("Speicher-Tracing gestartet – 'mem' erneut eingeben für einen Snapshot.")
+    else:
+        ui_log(f"Speicher-Snapshot gespeichert: {path}")
+
+
+def _dashboard_replay(body: dict) -> str | None:
+    query = str(body.get("query") or "").strip()
+    if query:
+        _handle_replay_command(f"replay {query}")
+        return None
+    try:
+        index = int(body.get("index"))
+    except (TypeError, ValueError):
+        return "index oder query fehlt"
+    if index < 1 or index > min(len(_history), HISTORY_UI_ENTRIES):
+        return "Auswahl außerhalb der letzten Einträge"
+    _handle_replay_command(f"replay {index}")
+    return None
+
+
+_DASHBOARD_ACTIONS = {
+    "pause": lambda body: _toggle_zone(str(body["zone"]), "paused", "Dashboard") if body.get("zone")
+    else _toggle_announcements("Dashboard"),
+    "mute": lambda body: _toggle_zone(str(body["zone"]), "muted", "Dashboard") if body.get("zone")
+    else _toggle_mute("Dashboard"),
+    "replay": _dashboard_replay,
+}
+
+
+def _start_dashboard():
+    global _dashboard_server
+    try:
+        _dashboard_server = DashboardServer(
+            _dashboard_hub, _DASHBOARD_ACTIONS,
+            host=dashboard_host, port=dashboard_port, token=dashboard_token,
+        )
+        _dashboard_server.start()
+        host, port = _dashboard_server.address
+        ui_log(f"Dashboard unter http://{host}:{port}/")
+    except (OSError, ValueError) as exc:
+        ui_log(f"Dashboard konnte nicht starten: {exc}", level="WARN")
+
+
 def _toggle_logs_panel():
     global _show_logs_panel
     with _console_lock:
@@ -709,56 +1007,374 @@ def _toggle_mute(source: str = "Konsole"):
 
 
 def _load_persisted_history():
-    if not history_file.exists():
-        return
     try:
-        data = json.loads(history_file.read_text(encoding="utf-8"))
-        if isinstance(data, list):
-            for entry in data[:20]:
-                key = entry.get("id") or f"history-{len(_announcement_history)+1}"
-                text = entry.get("text") or ""
-                if text:
-                    _announcement_history.append((key, text))
+        _history.load(legacy_path=legacy_history_file)
     except Exception as exc:
         ui_log(f"Konnte History nicht laden: {exc}", level="WARN")
 
 
-def _persist_history():
+def _record_history(cache_key: str, text: str, info: dict):
     try:
-        history_file.parent.mkdir(parents=True, exist_ok=True)
-        payload = [{"id": key, "text": text} for key, text in list(_announcement_history)]
-        history_file.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        _history.append(cache_key, text, **info)
     except Exception as exc:
         ui_log(f"Konnte History nicht speichern: {exc}", level="WARN")
 
 
-_load_persisted_history()
-
-
 # ==== ANKÜNDIGUNGSSYSTEM ====
-def write_announcement_file(tischname: str, team_a: str, team_b: str, match_id: str):
+def write_announcement_file(tischname: str, team_a: str, team_b: str, match_id: str,
+                            poll_received: float | None = None, change_detected: float | None = None,
+                            recall: bool = True):
     spoken_text = format_spoken_text(tischname, team_a, team_b)
     announcement_key = _make_announcement_key(tischname, match_id, team_a, team_b)
-    if not write_announcement_files:
-        ui_log(spoken_text)
-        _queue_announcement(announcement_key, spoken_text)
+    latency_trace.begin(announcement_key, kind="announcement", table=tischname, match_id=match_id)
+    latency_trace.mark(announcement_key, "poll_received", poll_received)
+    latency_trace.mark(announcement_key, "change_detected", change_detected)
+    latency_trace.mark(announcement_key, "template_rendered")
+    info = {"table": tischname, "match_id": match_id, "team_a": team_a, "team_b": team_b}
+    if recall_enabled and recall:
+        _recall_scheduler.schedule(tischname, {
+            "key": announcement_key, "last_key": announcement_key, "info": info,
+            "text": format_recall_text(tischname, team_a, team_b),
+        })
+    if not write_announcement_files or _announcement_writer is None:
+        ui_log(spoken_text, match_id=match_id)
+        _queue_announcement(announcement_key, spoken_text, info=info)
         return
 
-    try:
+    record = {"table": tischname, "match_id": match_id, "team_a": team_a, "team_b": team_b, "text": spoken_text}
+    if _announcement_writer.format == "files":
         ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-        fname = f"tisch_{safe_slug(tischname)}_{ts}_{safe_slug(match_id)}.txt"
-        path = output_dir / fname
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(spoken_text + "\n")
-        ui_log(f"Neues Spiel auf Tisch {tischname} – Datei: {path}")
-        ui_log(f"   {spoken_text}")
-    except Exception as e:
-        ui_log(f"Konnte Ankündigungsdatei nicht schreiben: {e}", level="ERROR")
-    finally:
-        _queue_announcement(announcement_key, spoken_text)
+        record["file_name"] = f"tisch_{safe_slug(tischname)}_{ts}_{safe_slug(match_id)}.txt"
+    _announcement_writer.submit(record)
+    ui_log(f"Neues Spiel auf Tisch {tischname}", match_id=match_id)
+    ui_log(f"   {spoken_text}", match_id=match_id)
+    _queue_announcement(announcement_key, spoken_text, info=info)
+
+
+# ==== ERNEUTER AUFRUF ====
+def _recall_key(payload: dict, step: int) -> str:
+    return f"{payload['key']}|recall{step + 1}"
+
+
+def _prepare_recall(table: str, payload: dict, step: int):
+    """Kurz vor der Frist synthetisieren; mit Audio-Cache ist ab dem zweiten Aufruf nichts mehr zu tun."""
+    _preload_tts_job(_recall_key(payload, step), payload["text"], _voice_for(table))
+
+
+def _fire_recall(table: str, payload: dict, step: int) -> bool:
+    key = _recall_key(payload, step)
+    if not _is_announcements_enabled() or _is_waiting(payload["last_key"]):
+        # pausiert bzw. der vorige Aufruf wartet noch – nicht stapeln
+        _preload_cache.discard(_normalize_cache_key(key, payload["text"]))
+        return False
+    info = dict(payload["info"], recall=step + 1)
+    payload["last_key"] = key
+    ui_log(f"Erneuter Aufruf Tisch {table}", match_id=info.get("match_id"))
+    _queue_announcement(key, payload["text"], record_history=False, info=info)
+    return True
+
+
+def _cancel_recall(table: str, payload: dict, step: int):
+    """Match begonnen oder gewechselt: Vorbereitetes freigeben, wartenden Aufruf verwerfen."""
+    _preload_cache.discard(_normalize_cache_key(_recall_key(payload, step), payload["text"]))
+    with _console_lock:
+        meta = _announcement_meta.get(payload["last_key"])
+        if meta is not None and meta["info"].get("recall") and meta["status"] == "queued":
+            meta["cancelled"] = True
+
+
+_recall_scheduler = RecallScheduler(
+    CONFIG.recall.intervals, on_fire=_fire_recall, on_prepare=_prepare_recall, on_cancel=_cancel_recall,
+    on_error=lambda message: ui_log(message, level="WARN", stage="recall"),
+)
+
+
+def _start_court_archive():
+    global _court_archive
+    if not court_archive.available():
+        ui_log("Court-Archiv deaktiviert: NumPy ist nicht installiert.", level="WARN")
+        return
+    try:
+        _court_archive = court_archive.CourtArchive(
+            BASE_DIR / court_archive.ARCHIVE_DIR_NAME, flush_seconds=archive_flush_seconds,
+        )
+    except Exception as exc:
+        ui_log(f"Court-Archiv konnte nicht geöffnet werden: {exc}", level="WARN")
+
+
+def _start_announcement_writer():
+    global _announcement_writer
+    try:
+        _announcement_writer = AnnouncementWriter(
+            output_dir, announcement_file_format,
+            max_queue=announcement_queue_size, fsync_interval=announcement_fsync_interval,
+            on_warning=lambda message: ui_log(message, level="WARN"),
+        )
+    except ValueError as exc:
+        ui_log(f"{exc} – schreibe eine Datei pro Match.", level="WARN")
+        _announcement_writer = AnnouncementWriter(
+            output_dir, "files",
+            max_queue=announcement_queue_size, fsync_interval=announcement_fsync_interval,
+            on_warning=lambda message: ui_log(message, level="WARN"),
+        )
+    _announcement_writer.start()
+
+
+_started = False
+_config_watcher: ConfigWatcher | None = None
+CONFIG_WATCH_INTERVAL = 2.0
+# Diese Einstellungen werden im laufenden Betrieb übernommen, alles andere erst nach einem Neustart
+HOT_RELOAD_KEYS = {"poll_interval", "api_token", "ui.max_fps", "files.save_audio", "files.audio_cache_max_mb"}
+HOT_RELOAD_SECTIONS = ("announcement.", "tts.", "recall.")
+
+
+def _persist_pending():
+    """Sichert die wartenden Ansagen (Replays nicht) – auch die gerade laufende."""
+    entries = []
+    with _console_lock:
+        for key in _announcement_order:
+            meta = _announcement_meta.get(key)
+            if not meta or not meta.get("record_history"):
+                continue
+            entry = {"key": key, "text": meta["text"], "info": meta.get("info") or {}, "queued": meta.get("queued")}
+            if meta.get("audio"):
+                entry["audio"] = meta["audio"]
+            entries.append(entry)
+    _pending_store.save(entries)
+
+
+def _load_pending_queue():
+    global _pending_restore
+    try:
+        entries = _pending_store.load()
+    except Exception as exc:
+        ui_log(f"Gesicherte Warteschlange nicht lesbar: {exc}", level="WARN")
+        return
+    if entries:
+        _pending_restore = entries
+        ui_log(f"{len(entries)} offene Durchsage(n) vom letzten Lauf gefunden – prüfe gegen aktuelle Tische.")
+
+
+def _restore_pending_queue(courts: list):
+    """Reiht offene Durchsagen vom letzten Lauf wieder ein, sofern das Match noch auf dem Tisch steht."""
+    global _pending_restore
+    entries, _pending_restore = _pending_restore or [], None
+    current = {}
+    for court in courts:
+        if court.table and court.has_full:
+            current[court.table] = (court.match_id, court.team_a, court.team_b)
+    restored = dropped = 0
+    for entry in entries:
+        info = entry.get("info") or {}
+        if current.get(info.get("table")) != (info.get("match_id"), info.get("team_a"), info.get("team_b")):
+            release_audio(entry.get("audio"))
+            dropped += 1
+            continue
+        _queue_announcement(entry["key"], entry["text"], info=info, prepared=_prepared_from_file(entry.get("audio")))
+        restored += 1
+    if restored or dropped:
+        ui_log(f"Warteschlange wiederhergestellt: {restored} Durchsage(n), {dropped} veraltet verworfen.",
+               stage="restore")
+    if not restored:
+        _persist_pending()
+
+
+def _apply_config(old: AppConfig, new: AppConfig):
+    """Tauscht geänderte Einstellungen aus; verworfen wird nur, was davon abhängt."""
+    global CONFIG, poll_interval, speech_template, speech_template_doubles
+    global notify_sound, notify_sound_path, notify_sound_name, notify_resume_after_seconds
+    global recall_enabled, recall_template
+    changed = changed_keys(old, new)
+    if not changed:
+        return
+    CONFIG = new
+    poll_interval = new.poll_interval
+    if "poll_interval" in changed:
+        _poll_wakeup.set()
+    if "api_token" in changed:
+        set_api_token(new.api_token)
+    ann = new.announcement
+    if changed & {"announcement.speech_template", "announcement.speech_template_doubles", "announcement.notify_sound",
+                  "recall.template"}:
+        speech_template = ann.speech_template
+        speech_template_doubles = ann.speech_template_doubles
+        recall_template = new.recall.template
+        notify_sound = ann.notify_sound or None
+        notify_sound_path = new.resolve_path(notify_sound) if notify_sound else None
+        notify_sound_name = notify_sound_path.name if notify_sound_path else ""
+        _compile_speech_templates()
+    notify_resume_after_seconds = ann.notify_resume_after_seconds
+    recall_enabled = new.recall.enabled
+    _recall_scheduler.set_intervals(new.recall.intervals)
+    if not recall_enabled:
+        _recall_scheduler.cancel_all()
+    if "announcement.enabled" in changed:
+        _set_announcements_enabled(ann.enabled, "config.yaml")
+    if "announcement.mute" in changed:
+        _set_muted(ann.mute, "config.yaml")
+    if "ui.max_fps" in changed:
+        _renderer.set_max_fps(new.ui.max_fps)
+    _preload_cache.max_items = max(1, new.tts.preload_max_items)
+    _preload_cache.max_bytes = int(new.tts.preload_max_mb * 1024 * 1024)
+    _preload_cache.ttl = new.tts.preload_ttl_seconds
+    if any(key.startswith("tts.") or key.startswith("files.") for key in changed) and apply_tts_config(new):
+        # vorbereitete Audios stammen von der alten Stimme
+        _preload_cache.clear("reload")
+        if _stage_pipeline is not None:
+            _stage_pipeline.restart_synthesis()  # liest config.yaml beim Start neu
+    restart = sorted(key for key in changed
+                     if key not in HOT_RELOAD_KEYS and not key.startswith(HOT_RELOAD_SECTIONS))
+    applied = sorted(changed.difference(restart))
+    if applied:
+        ui_log(f"config.yaml neu geladen: {', '.join(applied)}")
+    if restart:
+        ui_log(f"Wirkt erst nach Neustart: {', '.join(restart)}", level="WARN")
+    render_ui()
+
+
+def start():
+    """
+    Startet Worker-Threads, Renderer und lädt die History. Beim Import passiert
+    nichts davon, damit Tools und Benchmarks das Modul ohne Nebenwirkungen laden.
+    """
+    global _started, _tts_preload_executor
+    if _started:
+        return
+    _started = True
+    _start_log_pipeline()
+    _tts_preload_executor = ThreadPoolExecutor(max_workers=max(2, ((os.cpu_count() or 2) // 2) or 1),
+                                               thread_name_prefix="tts-preload",
+                                               initializer=_lower_preload_thread)
+    _preload_cache.start(_tts_preload_executor)
+    _start_stage_pipeline()
+    _recall_scheduler.start()
+    for idx, zone in enumerate(_zone_router, start=1):
+        zone.thread = threading.Thread(target=_announcement_worker, args=(zone,), daemon=True,
+                                       name="announcement-player" if len(_zone_router) == 1 else f"announcement-player-{idx}")
+        zone.thread.start()
+    if _UI_TTY:
+        _renderer.start()
+        if playback_first and _renderer.native_id is not None:
+            set_thread_priority(_renderer.native_id, UI_NICE)
+    threading.Thread(target=_command_listener, daemon=True, name="command-listener").start()
+    _load_persisted_history()
+    _load_pending_queue()
+    if audio_cache_enabled:
+        try:
+            set_audio_cache_dir(BASE_DIR / "audio_cache")
+        except OSError as exc:
+            ui_log(f"Audio-Cache deaktiviert: {exc}", level="WARN")
+    _start_config_watcher()
+
+
+def _lower_preload_thread():
+    # Piper-Kindprozesse und die Threads von onnxruntime erben den Wert (Linux)
+    if playback_first:
+        set_thread_priority(None, synthesis_nice)
+
+
+def _start_stage_pipeline():
+    global _stage_pipeline
+    if runtime_mode != "processes":
+        if runtime_mode != "threads":
+            ui_log(f"runtime.mode '{runtime_mode}' unbekannt – nutze 'threads'.", level="WARN")
+        return
+    if tts_provider != "piper":
+        ui_log("Mehrprozess-Betrieb braucht Piper (WAV-Übergabe) – nutze 'threads'.", level="WARN")
+        return
+    from process_stages import ProcessPipeline  # multiprocessing nur bei Bedarf laden
+    _stage_pipeline = ProcessPipeline(
+        BASE_DIR / "audio_cache" if audio_cache_enabled else None,
+        on_warning=lambda message: ui_log(message, level="WARN"),
+        synthesis_nice=synthesis_nice if playback_first else 0,
+        synthesis_processes=synthesis_processes or max(2, (os.cpu_count() or 2) // 2),
+        players=len(_zone_router),
+    )
+    _stage_pipeline.start()
+    ui_log(f"Mehrprozess-Betrieb: Abruf, {len(_stage_pipeline.synth_stages)} Synthese- und "
+           f"{len(_stage_pipeline.player_stages)} Player-Prozesse.")
+
+
+def _start_log_pipeline():
+    log_cfg = CONFIG.logging
+    if log_cfg.file:
+        try:
+            _log_pipeline.add_file(BASE_DIR / LOG_DIR_NAME / LOG_FILE_NAME,
+                                   max_bytes=int(log_cfg.max_mb * 1024 * 1024),
+                                   backup_count=log_cfg.backup_count, level=log_cfg.level)
+        except OSError as exc:
+            ui_log(f"Logdatei deaktiviert: {exc}", level="WARN")
+    _log_pipeline.start()
+
+
+def _start_config_watcher():
+    global _config_watcher
+    if CONFIG.path is None:
+        return
+    _config_watcher = ConfigWatcher(
+        _apply_config, CONFIG.path, interval=CONFIG_WATCH_INTERVAL,
+        on_error=lambda message: ui_log(message, level="WARN"),
+    )
+    _config_watcher.start()
+
+
+def _wait_for_next_poll(poll_started: float):
+    """Wartet bis zum nächsten Poll; Config-Änderung oder Beenden wecken sofort."""
+    while not _stop_event.is_set():
+        remaining = poll_started + poll_interval - time.monotonic()
+        if remaining <= 0:
+            return
+        if _poll_wakeup.wait(remaining):
+            # neu rechnen (z. B. geändertes poll_interval) bzw. beenden
+            _poll_wakeup.clear()
+
+
+def stop(timeout: float = 30.0):
+    """
+    Beendet geordnet: Die laufende Durchsage wird zu Ende gesprochen, wartende
+    bleiben gesichert; danach werden State, Warteschlange, Writer und Archiv
+    geschrieben und geschlossen. Mehrfacher Aufruf ist unschädlich.
+    """
+    if _stop_event.is_set():
+        return
+    _stop_event.set()
+    _poll_wakeup.set()
+    _recall_scheduler.stop()
+    with _announcements_state:
+        _announcements_state.notify_all()
+    for zone in _zone_router:
+        zone.queue.put(_STOP)
+    deadline = time.monotonic() + timeout
+    for zone in _zone_router:
+        if zone.thread is not None:
+            zone.thread.join(timeout=max(0.0, deadline - time.monotonic()))
+    if _config_watcher is not None:
+        _config_watcher.stop()
+    _preload_cache.close()
+    if _stage_pipeline is not None:
+        _stage_pipeline.stop()
+    _persist_pending()
+    _pending_store.close()
+    flush_state()
+    if _announcement_writer is not None:
+        _announcement_writer.close()
+    latency_trace.close()
+    _history.close()
+    if _court_archive is not None:
+        _court_archive.close()
+    if _dashboard_server is not None:
+        _dashboard_server.stop()
+    metrics.stop_server()
+    _log_pipeline.stop()
+
+
+def _handle_sigterm(signum, frame):
+    # wie STRG+C: die Hauptschleife bricht ab, aufgeräumt wird in stop()
+    raise KeyboardInterrupt
+
 
 def main():
+    start()
     show_banner()  # Logo und CLS beim Start
     ensure_dirs()
     state = load_state()
@@ -766,17 +1382,35 @@ def main():
     ui_log(f"Starte Überwachung aller Tische. Polling alle {poll_interval}s.")
     ui_log(f"Schreibe Ankündigungen: {'JA' if write_announcement_files else 'NEIN'}")
     if write_announcement_files:
-        ui_log(f"Zielordner: {output_dir.resolve()}")
+        _start_announcement_writer()
+        ui_log(f"Ziel: {_announcement_writer.target.resolve()} (Format: {_announcement_writer.format})")
+    if pronunciation_lexicon_size():
+        ui_log(f"Aussprache-Lexikon: {pronunciation_lexicon_size()} Einträge.")
+    if archive_enabled:
+        _start_court_archive()
+    if dashboard_enabled:
+        _start_dashboard()
+    if metrics_enabled:
+        try:
+            metrics.start_server(metrics_host, metrics_port)
+            ui_log(f"Metriken unter http://{metrics_host}:{metrics_port}/metrics")
+        except OSError as exc:
+            ui_log(f"Metrik-Endpunkt konnte nicht starten: {exc}", level="WARN")
     ui_log("Beende mit STRG+C (CTRL+C).")
 
-    while True:
-        courts = fetch_courts()
-        if isinstance(courts, list):
-            for court in courts:
-                tischname, match_id, team_a, team_b, has_full = extract_match_info_from_court(court)
-
+    while not _stop_event.is_set():
+        poll_started = time.monotonic()
+        courts = _stage_pipeline.poll(CONFIG.api_token) if _stage_pipeline is not None else fetch_court_infos()
+        poll_received = time.monotonic()
+        if courts is not None:
+            if _pending_restore is not None:
+                _restore_pending_queue(courts)
+            snapshot = []
+            waiting_tables = set()  # Match steht an, hat aber noch nicht begonnen
+            for tischname, match_id, team_a, team_b, has_full, started in courts:
                 if not tischname:
                     continue
+                snapshot.append((tischname, match_id, team_a, team_b))
 
                 if not has_full:
                     if state.get(tischname) is not None:
@@ -787,21 +1421,55 @@ def main():
 
                 key = f"{match_id}|{team_a}|{team_b}"
                 last_key = state.get(tischname)
+                if not started:
+                    waiting_tables.add(tischname)
 
                 if last_key != key:
-                    write_announcement_file(tischname, team_a, team_b, match_id)
+                    write_announcement_file(
+                        tischname, team_a, team_b, match_id,
+                        poll_received=poll_received, change_detected=time.monotonic(), recall=not started,
+                    )
                     state[tischname] = key
                     save_state(state)
+            if len(_recall_scheduler):
+                _recall_scheduler.retain(waiting_tables)
+            if _court_archive is not None:
+                _court_archive.record_poll(time.time(), snapshot)
         else:
             ui_log("Konnte Court-Liste nicht laden oder Response-Format unerwartet.", level="WARN")
 
-        time.sleep(poll_interval)
+        _wait_for_next_poll(poll_started)
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Kickertool TTS – sagt neue Matches automatisch an.")
+    p.add_argument("--profile", action="store_true",
+                   help="Sampling-Profiler und Speicher-Tracing ab Start; Ausgabe beim Beenden in data/<tournament>/profiles")
+    p.add_argument("--profile-interval", type=float, default=profiling.DEFAULT_INTERVAL * 1000,
+                   help="Abtastintervall des Profilers in Millisekunden (Standard: 5)")
+    return p
 
 
 if __name__ == "__main__":
+    cli_args = _build_arg_parser().parse_args()
+    if cli_args.profile:
+        _profiler.interval = max(0.001, cli_args.profile_interval / 1000.0)
+        profiling.start_memory_tracing()
+        _profiler.start()
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     try:
         main()
     except KeyboardInterrupt:
         ui_log("Überwachung beendet.")
     except Exception as e:
         ui_log(f"FATAL: {e}", level="FATAL")
+    finally:
+        # Profil vor dem Herunterfahren sichern: das Aufräumen soll nicht mitgemessen
+        # werden, und die Meldungen brauchen die noch laufende Log-Pipeline.
+        if cli_args.profile:
+            _profiler.stop()
+            _dump_profile()
+            _write_memory_snapshot()
+        stop()
+        if _UI_TTY:
+            _renderer.stop()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Hintergrund-Writer für Ankündigungstexte.
+
+Der Polling-Thread reicht nur noch einen Datensatz in eine begrenzte Queue;
+geschrieben wird in einem eigenen Thread, der alle wartenden Einträge in
+einem Rutsch verarbeitet. Formate:
+
+- ``files``: eine Textdatei pro Match (bisheriges Verhalten)
+- ``log``:   eine fortlaufende Textdatei ``announcements.log`` (rotierend)
+- ``jsonl``: eine JSON-Zeile pro Ansage in ``announcements.jsonl`` (rotierend)
+
+Bei ``log``/``jsonl`` bleibt die Datei offen; fsync erfolgt gesammelt
+höchstens alle ``fsync_interval`` Sekunden. Läuft die Queue voll, weil das
+Ziel (USB-Stick, Netzlaufwerk) nicht hinterherkommt, wird das gemeldet und
+gezählt, statt den Polling-Thread zu blockieren.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from queue import Queue, Full, Empty
+from typing import Callable
+
+import metrics
+
+FORMATS = ("files", "log", "jsonl")
+MAX_BATCH = 256
+HIGH_WATER = 0.75
+DROP_WARNING_INTERVAL = 5.0
+
+metrics.define_counter("kickertool_announcement_writer_dropped_total",
+                       "Ankündigungstexte, die wegen voller Writer-Queue verworfen wurden.")
+metrics.define_histogram("kickertool_announcement_writer_batch_seconds",
+                         "Dauer eines Schreib-Batches des Ankündigungs-Writers.")
+
+_STOP = object()
+
+
+class AnnouncementWriter:
+    def __init__(self, directory: Path, fmt: str = "files", max_queue: int = 256,
+                 fsync_interval: float = 1.0, max_bytes: int = 10 * 1024 * 1024, backups: int = 3,
+                 on_warning: Callable[[str], None] | None = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unbekanntes Format '{fmt}' (erlaubt: {', '.join(FORMATS)})")
+        self.directory = Path(directory)
+        self.format = fmt
+        self.fsync_interval = float(fsync_interval)
+        self.max_bytes = int(max_bytes)
+        self.backups = int(backups)
+        self._queue: "Queue[object]" = Queue(maxsize=max(1, int(max_queue)))
+        self._warn = on_warning or (lambda message: print(f"[WARN] {message}"))
+        self._thread: threading.Thread | None = None
+        self._handle = None
+        self._dir_ready = False
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self._backpressure = False
+        self._last_drop_warning = 0.0
+        self.dropped = 0
+        self.written = 0
+        self.last_path: Path | None = None
+        metrics.define_gauge("kickertool_announcement_writer_queue_depth",
+                             "Wartende Einträge im Ankündigungs-Writer.", self._queue.qsize)
+
+    @property
+    def target(self) -> Path:
+        if self.format == "files":
+            return self.directory
+        return self.directory / ("announcements.log" if self.format == "log" else "announcements.jsonl")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="announcement-writer")
+            self._thread.start()
+
+    def submit(self, record: dict) -> bool:
+        """
+        Reiht einen Datensatz ein (blockiert nie). ``False``, wenn er verworfen wurde.
+        Im Format ``files`` muss ``record["file_name"]`` gesetzt sein.
+        """
+        record.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+            metrics.inc("kickertool_announcement_writer_dropped_total")
+            now = time.monotonic()
+            if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+                self._last_drop_warning = now
+                self._warn(f"Ankündigungs-Writer kommt nicht hinterher – Einträge verworfen ({self.dropped} insgesamt).")
+            return False
+        depth = self._queue.qsize()
+        if not self._backpressure and depth >= self._queue.maxsize * HIGH_WATER:
+            self._backpressure = True
+            self._warn(f"Ankündigungs-Writer staut sich ({depth}/{self._queue.maxsize}) – Ziel zu langsam?")
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Schreibt alle wartenden Einträge, synchronisiert und schließt die Datei."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ---- Writer-Thread ----
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval if self._unsynced else None)
+            except Empty:
+                self._sync()
+                continue
+            batch = [item]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            records = [entry for entry in batch if entry is not _STOP]
+            if records:
+                started = time.perf_counter()
+                try:
+                    self._write_batch(records)
+                    self.written += len(records)
+                except Exception as exc:
+                    self._dir_ready = False
+                    self._close_handle()
+                    self._warn(f"Konnte Ankündigungsdatei nicht schreiben: {exc}")
+                metrics.observe("kickertool_announcement_writer_batch_seconds", time.perf_counter() - started)
+            if self._backpressure and self._queue.qsize() < self._queue.maxsize * HIGH_WATER / 2:
+                self._backpressure = False
+                self._warn("Ankündigungs-Writer hat wieder aufgeholt.")
+            if stop or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+            if stop:
+                self._close_handle()
+                return
+
+    def _ensure_dir(self):
+        if not self._dir_ready:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+
+    def _write_batch(self, records: list[dict]):
+        self._ensure_dir()
+        if self.format == "files":
+            for record in records:
+                path = self.directory / record["file_name"]
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(record["text"] + "\n")
+                self.last_path = path
+            return
+        lines = []
+        for record in records:
+            if self.format == "jsonl":
+                lines.append(json.dumps(record, ensure_ascii=False))
+            else:
+                stamp = datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+                lines.append(f"{stamp}  Tisch {record.get('table') or '?'}  {record['text']}")
+        data = "\n".join(lines) + "\n"
+        handle = self._open_handle(len(data.encode("utf-8")))
+        handle.write(data)
+        handle.flush()
+        self._unsynced = True
+        self.last_path = self.target
+
+    def _open_handle(self, incoming: int):
+        path = self.target
+        if self._handle is not None and self.max_bytes > 0 and self._handle.tell() + incoming > self.max_bytes:
+            self._sync()
+            self._close_handle()
+            self._rotate(path)
+        if self._handle is None:
+            self._handle = open(path, "a", encoding="utf-8")
+        return self._handle
+
+    def _rotate(self, path: Path):
+        for idx in range(self.backups - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{idx}")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{idx + 1}"))
+        if self.backups > 0 and path.exists():
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        elif path.exists():
+            path.unlink()
+
+    def _sync(self):
+        self._last_fsync = time.monotonic()
+        if self._handle is None or not self._unsynced:
+            return
+        try:
+            os.fsync(self._handle.fileno())
+        except OSError as exc:
+            self._warn(f"fsync der Ankündigungsdatei fehlgeschlagen: {exc}")
+        self._unsynced = False
+
+    def _close_handle(self):
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
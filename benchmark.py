@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark-Suite für die Hot-Paths der Ansagen.
+
+Misst Court-Parsing, Textaufbereitung, State-/History-Persistenz sowie die
+Startlatenz von Synthese und Wiedergabe (mit einem Fake-Piper). Ergebnisse
+werden als JSON gespeichert und lassen sich mit ``--compare`` gegen einen
+früheren Lauf vergleichen; Verschlechterungen über ``--threshold`` werden
+markiert und führen zu Exit-Code 1.
+
+Benötigt eine gültige ``config.yaml`` im Arbeitsverzeichnis (auch für den Import-Benchmark).
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+RESULTS_DIR = Path("data") / "benchmarks"
+DEFAULT_THRESHOLD = 0.15
+
+FIRST_NAMES = ["Hans", "Anna", "Peter", "Eva", "Jürgen", "Özlem", "Lukas", "Sophie", "Björn", "Marie", "Kai", "Lea"]
+LAST_NAMES = ["Müller", "Schmidt", "Meier", "Braun", "Weiß", "Öztürk", "Schäfer", "Krüger", "Nguyen", "Wagner"]
+
+
+# =========================
+# Synthetische Daten
+# =========================
+def _player_name(rng: random.Random) -> str:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return f"{last}, {first}" if rng.random() < 0.3 else f"{first} {last}"
+
+
+def _synthetic_entry(rng: random.Random, kind: str):
+    if kind == "monsterdyp":
+        return [{"name": _player_name(rng), "id": rng.randrange(10**6)} for _ in range(2)]
+    if kind == "doubles":
+        return {"name": f"{_player_name(rng)} / {_player_name(rng)}", "id": rng.randrange(10**6)}
+    return {"name": _player_name(rng), "id": rng.randrange(10**6)}
+
+
+def synthetic_courts(count: int = 200, seed: int = 42) -> list[dict]:
+    """Erzeugt Court-Objekte im Format von ``includeMatchDetails=true``."""
+    rng = random.Random(seed)
+    courts = []
+    for idx in range(count):
+        court = {
+            "id": f"court-{idx}",
+            "name": f"{idx + 1}",
+            "position": idx,
+            "disabled": False,
+        }
+        roll = rng.random()
+        if roll < 0.1:
+            court["currentMatch"] = None
+        else:
+            kind = "monsterdyp" if roll < 0.4 else ("doubles" if roll < 0.6 else "singles")
+            court["currentMatch"] = {
+                "id": f"m{rng.randrange(10**9)}",
+                "state": "ready",
+                "round": rng.randrange(1, 12),
+                "discipline": {"id": "d1", "name": "Offenes Doppel", "sets": [{"points": 7}] * 3},
+                "entries": [_synthetic_entry(rng, kind), _synthetic_entry(rng, kind)],
+                "result": None,
+            }
+        courts.append(court)
+    return courts
+
+
+# =========================
+# Messung
+# =========================
+def _measure(fn: Callable[[], object], repeat: int = 7, min_time: float = 0.05) -> dict:
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops * 1e6)
+    return _stats(samples, loops)
+
+
+def _stats(samples_us: list[float], loops: int = 1) -> dict:
+    ordered = sorted(samples_us)
+    return {
+        "unit": "us",
+        "loops": loops,
+        "samples": len(ordered),
+        "min": round(ordered[0], 3),
+        "median": round(statistics.median(ordered), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+        "stdev": round(statistics.pstdev(ordered), 3),
+    }
+
+
+# =========================
+# Benchmarks
+# =========================
+def bench_extract_courts(quick: bool) -> dict:
+    from extract_announcements_from_kickertool import extract_match_info_from_court
+    courts = synthetic_courts(50 if quick else 500)
+
+    def run():
+        for court in courts:
+            extract_match_info_from_court(court)
+
+    return _measure(run)
+
+
+def _court_payloads(quick: bool) -> tuple[bytes, bytes]:
+    """Zwei Court-Antworten, die sich (wie bei einem Matchwechsel) in einem Tisch unterscheiden."""
+    courts = synthetic_courts(50 if quick else 500)
+    changed = json.loads(json.dumps(courts))
+    changed[len(changed) // 2]["currentMatch"] = {"id": "m-neu", "entries": [{"name": "Neu A"}, {"name": "Neu B"}]}
+    return json.dumps(courts).encode("utf-8"), json.dumps(changed).encode("utf-8")
+
+
+def bench_court_parse_dicts(quick: bool) -> dict:
+    """Bisheriger Weg pro Poll: komplette Antwort parsen, dann jeden Tisch auslesen."""
+    from extract_announcements_from_kickertool import extract_court_info
+    payload, _ = _court_payloads(quick)
+    return _measure(lambda: [extract_court_info(court) for court in json.loads(payload)])
+
+
+def bench_court_parse_snapshot(quick: bool) -> dict:
+    """``CourtSnapshotParser`` bei geänderter Antwort (abwechselnd zwei Stände)."""
+    from extract_announcements_from_kickertool import extract_court_info
+    from court_snapshot import CourtSnapshotParser
+    parser = CourtSnapshotParser(extract_court_info)
+    payloads = _court_payloads(quick)
+    counter = [0]
+
+    def run():
+        counter[0] += 1
+        parser.parse(payloads[counter[0] & 1])
+
+    return _measure(run)
+
+
+def bench_court_parse_unchanged(quick: bool) -> dict:
+    """``CourtSnapshotParser`` bei unveränderter Antwort (Normalfall zwischen zwei Matchwechseln)."""
+    from extract_announcements_from_kickertool import extract_court_info
+    from court_snapshot import CourtSnapshotParser
+    parser = CourtSnapshotParser(extract_court_info)
+    payload, _ = _court_payloads(quick)
+    parser.parse(payload)
+    fresh = bytes(bytearray(payload))  # neues Objekt wie bei jedem HTTP-Abruf
+    return _measure(lambda: parser.parse(fresh))
+
+
+def bench_entry_to_team_name(quick: bool) -> dict:
+    from extract_announcements_from_kickertool import _entry_to_team_name
+    rng = random.Random(7)
+    entries = [_synthetic_entry(rng, kind) for kind in ("singles", "doubles", "monsterdyp") for _ in range(100)]
+
+    def run():
+        for entry in entries:
+            _entry_to_team_name(entry)
+
+    return _measure(run)
+
+
+def bench_format_singles(quick: bool) -> dict:
+    from announcement_tts import format_spoken_text
+    return _measure(lambda: format_spoken_text("12", "Müller, Hans", "Anna Schmidt"))
+
+
+def bench_format_doubles(quick: bool) -> dict:
+    from announcement_tts import format_spoken_text
+    return _measure(lambda: format_spoken_text("12", "Hans Müller / Anna Schmidt", "Peter Meier & Eva Braun"))
+
+
+def bench_save_state(quick: bool) -> dict:
+    """Kosten im Poll-Thread: ein Tisch ändert sich, ``save_state`` übernimmt den Stand."""
+    import extract_announcements_from_kickertool as extract
+    from state_store import JournaledStateStore
+    tables = 50 if quick else 200
+    state = {f"{idx + 1}": f"m{idx}|Hans Müller / Anna Schmidt|Peter Meier / Eva Braun" for idx in range(tables)}
+    counter = [0]
+
+    def change_and_save():
+        counter[0] += 1
+        state["1"] = f"m{counter[0]}|Hans Müller / Anna Schmidt|Peter Meier / Eva Braun"
+        extract.save_state(state)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = extract._state_store
+        extract._state_store = JournaledStateStore(Path(tmp) / "seen_matches.json", flush_interval=60.0)
+        try:
+            extract._state_store.load()
+            return _measure(change_and_save, repeat=5)
+        finally:
+            extract._state_store.close()
+            extract._state_store = original
+
+
+def bench_state_flush(quick: bool) -> dict:
+    """Hintergrund-Flush: geänderte Tische ins Journal schreiben (inkl. fsync)."""
+    from state_store import JournaledStateStore
+    tables = 50 if quick else 200
+    state = {f"{idx + 1}": None for idx in range(tables)}
+    counter = [0]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JournaledStateStore(Path(tmp) / "seen_matches.json", flush_interval=60.0)
+        store.load()
+
+        def change_and_flush():
+            counter[0] += 1
+            for table in ("1", "2", "3"):
+                state[table] = f"m{counter[0]}|Team A|Team B"
+            store.save(state)
+            store.flush()
+
+        try:
+            return _measure(change_and_flush, repeat=5)
+        finally:
+            store.close()
+
+
+def _filled_history(path: Path, entries: int):
+    from history_store import AnnouncementHistory
+    history = AnnouncementHistory(path)
+    for idx in range(entries):
+        history.append(
+            f"m{idx}|tisch|a|b|{idx}",
+            f"Tisch {idx % 40 + 1}: Hans Müller{idx} und Anna Schmidt gegen Peter Meier{idx} und Eva Braun.",
+            table=str(idx % 40 + 1), match_id=f"m{idx}",
+            team_a=f"Hans Müller{idx} / Anna Schmidt", team_b=f"Peter Meier{idx} / Eva Braun",
+            ts=1_700_000_000.0 + idx * 60,
+        )
+    return history
+
+
+def bench_persist_history(quick: bool) -> dict:
+    """Eine Durchsage an eine History mit einem ganzen Turnier anhängen."""
+    import announcement_tts as ann
+    entries = 200 if quick else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        original = ann._history
+        ann._history = _filled_history(Path(tmp) / "announcement_history.jsonl", entries)
+        info = {"table": "12", "match_id": "m-new", "team_a": "Hans Müller / Anna Schmidt", "team_b": "Peter Meier"}
+        try:
+            return _measure(lambda: ann._record_history("m-new|12|a|b|1", "Tisch 12: Hans Müller gegen Peter Meier.", info), repeat=5)
+        finally:
+            ann._history.close()
+            ann._history = original
+
+
+def bench_history_search(quick: bool) -> dict:
+    """Replay-Suche: Tisch, Spieler-Präfix und Uhrzeit in einer Turnier-History."""
+    entries = 200 if quick else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        history = _filled_history(Path(tmp) / "announcement_history.jsonl", entries)
+
+        def search():
+            history.by_table("Tisch 7")
+            history.by_player("meier15")
+            history.at(1_700_000_000.0 + entries * 30)
+
+        try:
+            return _measure(search)
+        finally:
+            history.close()
+
+
+_FAKE_PIPER = '''#!{python}
+import sys, struct
+args = sys.argv[1:]
+out = args[args.index("--output_file") + 1]
+sys.stdin.read()
+frames = 2205
+with open(out, "wb") as f:
+    data = b"\\x00\\x00" * frames
+    f.write(b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE")
+    f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 22050, 44100, 2, 16))
+    f.write(b"data" + struct.pack("<I", len(data)) + data)
+'''
+
+
+def _write_fake_piper(directory: Path) -> Path:
+    script = directory / "fake_piper.py"
+    script.write_text(_FAKE_PIPER.format(python=sys.executable), encoding="utf-8")
+    if os.name == "nt":
+        launcher = directory / "fake_piper.cmd"
+        launcher.write_text(f'@"{sys.executable}" "{script}" %*\n', encoding="utf-8")
+        return launcher
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script
+
+
+def _fake_piper_start_latency(quick: bool, cached: bool) -> dict:
+    import text_to_speech as tts
+    iterations = 5 if quick else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        model = tmp_path / "fake.onnx"
+        model.write_bytes(b"\0")
+        Path(str(model) + ".json").write_text("{}", encoding="utf-8")
+        saved = {
+            name: getattr(tts, name)
+            for name in ("piper_executable", "piper_model_path", "_play_wav", "save_audio", "_tts_muted",
+                         "_audio_cache_dir", "provider", "piper_engine", "piper_precision")
+        }
+        play_started: list[float] = []
+        tts.piper_executable = str(_write_fake_piper(tmp_path))
+        tts.piper_model_path = str(model)
+        tts.save_audio = False
+        tts._tts_muted = False
+        tts._audio_cache_dir = None
+        tts.provider = "piper"
+        tts.piper_engine = "cli"  # Fake-Piper ist ein Programm, kein Modell
+        tts.piper_precision = "full"
+        tts._play_wav = lambda path, device="", player="": play_started.append(time.perf_counter())
+        samples = []
+        try:
+            if cached:
+                tts.set_audio_cache_dir(tmp_path / "audio_cache")
+            for idx in range(iterations):
+                text = f"Tisch {idx}: Hans Müller gegen Anna Schmidt"
+                if cached:
+                    tts.prepare_tts_playback(text)  # erste Ansage füllt den Cache
+                started = time.perf_counter()
+                job = tts.prepare_tts_playback(text)
+                if job is None:
+                    raise RuntimeError("Fake-Piper lieferte kein Audio")
+                job()
+                samples.append((play_started[-1] - started) * 1e6)
+        finally:
+            for name, value in saved.items():
+                setattr(tts, name, value)
+        return _stats(samples)
+
+
+def bench_tts_start_latency(quick: bool) -> dict:
+    """Zeit von ``prepare_tts_playback`` bis zum Start der Wiedergabe (Fake-Piper)."""
+    return _fake_piper_start_latency(quick, cached=False)
+
+
+def bench_tts_replay_cached(quick: bool) -> dict:
+    """Wie oben, aber für eine Wiederholung aus dem Audio-Cache."""
+    return _fake_piper_start_latency(quick, cached=True)
+
+
+def _simulate_tournament_day(archive, tables: int, hours: float, seed: int = 7):
+    """Schreibt einen Turniertag ins Archiv: Matches 8-20 min, Pausen 0-5 min, Ansage nach 1-10 s."""
+    rng = random.Random(seed)
+    start = 1_700_000_000.0
+    events = []
+    for table in range(1, tables + 1):
+        ts = start + rng.uniform(0, 300)
+        number = 0
+        while ts < start + hours * 3600:
+            number += 1
+            match_id = f"t{table}-m{number}"
+            events.append((ts, "state", str(table), match_id, f"Spieler {rng.randrange(400)}", f"Spieler {rng.randrange(400)}"))
+            events.append((ts + rng.uniform(1, 10), "call", str(table), match_id, None, None))
+            ts += rng.uniform(8, 20) * 60
+            events.append((ts, "state", str(table), None, None, None))
+            ts += rng.uniform(0, 5) * 60
+    events.sort(key=lambda event: event[0])
+    for ts, kind, table, match_id, team_a, team_b in events:
+        if kind == "state":
+            archive.record_poll(ts, [(table, match_id, team_a, team_b)])
+        else:
+            archive.record_announcement(ts, table, match_id)
+    return start + hours * 3600
+
+
+def bench_archive_record_poll(quick: bool) -> dict:
+    """Ein Poll mit unveränderten Tischen (Normalfall) gegen das Court-Archiv."""
+    import court_archive
+    tables = 40 if quick else 120
+    courts = [(str(idx), f"m{idx}", "Hans Müller / Anna Schmidt", "Peter Meier / Eva Braun") for idx in range(tables)]
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = court_archive.CourtArchive(Path(tmp), flush_seconds=3600)
+        archive.record_poll(time.time(), courts)
+        try:
+            return _measure(lambda: archive.record_poll(time.time(), courts))
+        finally:
+            archive.close()
+
+
+def bench_archive_analytics(quick: bool) -> dict:
+    """Laden + Auswerten eines ganzen Turniertags (Auslastung, Dauer, Leerlauf, Zeit bis Ansage)."""
+    import court_archive
+    tables = 20 if quick else 60
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = court_archive.CourtArchive(Path(tmp), flush_seconds=3600)
+        end = _simulate_tournament_day(archive, tables, hours=12)
+        archive.flush()
+
+        def run():
+            rows, strings, _ = court_archive.load_archive(Path(tmp))
+            court_archive.analyze(rows, strings, end_ts=end)
+
+        try:
+            return _measure(run, repeat=5)
+        finally:
+            archive.close()
+
+
+_IMPORT_PROBE = (
+    "import time; started = time.perf_counter(); import announcement_tts; "
+    "print((time.perf_counter() - started) * 1e6)"
+)
+
+
+_PROBE_CONFIG = """\
+api_token: "benchmark"
+tournament_id: "benchmark"
+"""
+
+
+def bench_startup_import(quick: bool) -> dict:
+    """``import announcement_tts`` in einem frischen Interpreter (Config laden, Module, keine Threads)."""
+    env = dict(os.environ)
+    repo_dir = str(Path(__file__).resolve().parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [repo_dir, env.get("PYTHONPATH")]))
+    samples = []
+    # eigenes Arbeitsverzeichnis mit Minimal-Config: unabhängig davon, wo der Benchmark gestartet wird
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "config.yaml").write_text(_PROBE_CONFIG, encoding="utf-8")
+        for _ in range(3 if quick else 7):
+            out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], capture_output=True, text=True,
+                                 env=env, cwd=tmp, stdin=subprocess.DEVNULL, timeout=60)
+            if out.returncode != 0:
+                raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "Import fehlgeschlagen")
+            samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return _stats(samples)
+
+
+BENCHMARKS: dict[str, Callable[[bool], dict]] = {
+    "extract_match_info_from_court": bench_extract_courts,
+    "court_parse_dicts": bench_court_parse_dicts,
+    "court_parse_snapshot": bench_court_parse_snapshot,
+    "court_parse_unchanged": bench_court_parse_unchanged,
+    "entry_to_team_name": bench_entry_to_team_name,
+    "format_spoken_text_singles": bench_format_singles,
+    "format_spoken_text_doubles": bench_format_doubles,
+    "save_state": bench_save_state,
+    "state_flush": bench_state_flush,
+    "persist_history": bench_persist_history,
+    "history_search": bench_history_search,
+    "tts_start_latency_fake_piper": bench_tts_start_latency,
+    "tts_replay_cached_fake_piper": bench_tts_replay_cached,
+    "archive_record_poll": bench_archive_record_poll,
+    "archive_analytics": bench_archive_analytics,
+    "startup_import": bench_startup_import,
+}
+
+
+# =========================
+# Ergebnisse & Vergleich
+# =========================
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmarks(selected: list[str] | None = None, quick: bool = False) -> dict:
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        print(f"[BENCH] {name} ...", flush=True)
+        try:
+            results[name] = bench(quick)
+        except Exception as exc:
+            print(f"[WARN] Benchmark {name} fehlgeschlagen: {exc}")
+            results[name] = {"error": str(exc)}
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "benchmarks": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[tuple[str, float, float, float, bool]]:
+    """Vergleicht den Bestwert (min) – robuster gegen Scheduler-Rauschen als der Median."""
+    rows = []
+    old_results = baseline.get("benchmarks") or {}
+    for name, new in (current.get("benchmarks") or {}).items():
+        old = old_results.get(name)
+        if not old or not old.get("min") or "min" not in new:
+            continue
+        ratio = new["min"] / old["min"]
+        rows.append((name, old["min"], new["min"], ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def _print_results(data: dict):
+    print(f"{'Benchmark':<32} {'median':>12} {'p95':>12} {'min':>12}")
+    for name, res in data["benchmarks"].items():
+        if "error" in res:
+            print(f"{name:<32} FEHLER: {res['error']}")
+            continue
+        print(f"{name:<32} {res['median']:>10.1f}us {res['p95']:>10.1f}us {res['min']:>10.1f}us")
+
+
+def _print_comparison(rows, threshold: float):
+    print()
+    print(f"Vergleich (Schwelle +{threshold * 100:.0f}%):")
+    print(f"{'Benchmark':<32} {'alt':>12} {'neu':>12} {'Faktor':>8}")
+    for name, old, new, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<32} {old:>10.1f}us {new:>10.1f}us {ratio:>7.2f}x{flag}")
+
+
+def _latest_result(exclude: Path | None = None) -> Path | None:
+    candidates = sorted(p for p in RESULTS_DIR.glob("benchmark-*.json") if p != exclude)
+    return candidates[-1] if candidates else None
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Benchmarks für die Ansage-Hot-Paths.")
+    p.add_argument("-o", "--output", help=f"Ergebnisdatei (Standard: {RESULTS_DIR}/benchmark-<zeit>.json)")
+    p.add_argument("-c", "--compare", help="Vergleich mit früherem Lauf (JSON-Datei oder 'latest')")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="Erlaubte Verschlechterung des Bestwerts (Standard: 0.15 = 15%%)")
+    p.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Nur diesen Benchmark ausführen")
+    p.add_argument("--quick", action="store_true", help="Kleinere Datenmengen für einen schnellen Lauf")
+    return p
+
+
+if __name__ == "__main__":
+    args = _build_arg_parser().parse_args()
+    baseline_path = None
+    if args.compare:
+        baseline_path = _latest_result() if args.compare == "latest" else Path(args.compare)
+        if baseline_path is None or not baseline_path.exists():
+            print(f"[ERROR] Vergleichsdatei nicht gefunden: {args.compare}")
+            sys.exit(2)
+
+    data = run_benchmarks(args.only, quick=args.quick)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    _print_results(data)
+    print(f"\nErgebnisse gespeichert: {output}")
+
+    if baseline_path is not None:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if bool(baseline.get("quick")) != bool(data["quick"]):
+            print("[WARN] Vergleichslauf wurde mit anderer Datenmenge (--quick) erstellt.")
+        rows = compare(data, baseline, args.threshold)
+        _print_comparison(rows, args.threshold)
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
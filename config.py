@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+Typisierte Konfiguration aus ``config.yaml``.
+
+Die Datei wird genau einmal gelesen (``get_config()``) und in unveränderliche
+Dataclasses pro Abschnitt übersetzt; alle Module lesen ihre Einstellungen
+daraus statt selbst YAML zu parsen. Fehlt ein Wert, gilt der Default der
+jeweiligen Dataclass.
+
+``ConfigWatcher`` prüft die Datei im laufenden Betrieb (mtime/Größe), lädt
+sie bei Änderungen neu und reicht nur eine gültige Konfiguration weiter;
+``changed_keys()`` sagt, welche Einstellungen sich geändert haben.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+import metrics
+
+CONFIG_PATH = Path("config.yaml")
+DEFAULT_SPEECH_TEMPLATE = "Tisch {TABLE}: {PLAYER1_FULL} gegen {PLAYER2_FULL}"
+DEFAULT_RECALL_TEMPLATE = "Erneuter Aufruf: Tisch {TABLE}, {PLAYER1_LASTNAME} gegen {PLAYER2_LASTNAME}"
+
+metrics.define_counter("kickertool_config_reloads_total",
+                       "Geänderte config.yaml nach Ergebnis (applied, invalid, rejected).")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TTSConfig:
+    provider: str = "piper"
+    model_path: str = "voices/de_DE-thorsten-medium.onnx"
+    speaker: int | None = None
+    length_scale: float = 0.95
+    noise_scale: float = 0.5
+    noise_w: float = 0.8
+    lexicon_path: str = ""
+    rate: int = 170
+    volume: float = 1.0
+    voice_index: int | None = None
+    preload_max_items: int = 32
+    preload_max_mb: float = 200.0
+    preload_ttl_seconds: float = 900.0
+    engine: str = "auto"
+    voice_memory_mb: float = 512.0
+    voice_idle_seconds: float = 900.0
+    precision: str = "full"  # "full" | "int8" | "fp16" (siehe quantize_voice.py)
+
+
+@dataclass(frozen=True)
+class FilesConfig:
+    save_audio: bool = False
+    write_announcement_files: bool = False
+    announcement_format: str = "files"
+    announcement_queue_size: int = 256
+    announcement_fsync_interval: float = 1.0
+    audio_cache: bool = True
+    audio_cache_max_mb: float = 500.0
+
+
+@dataclass(frozen=True)
+class AnnouncementConfig:
+    notify_sound: str = ""
+    notify_resume_after_seconds: float = 0.0
+    enabled: bool = True
+    mute: bool = False
+    speech_template: str = DEFAULT_SPEECH_TEMPLATE
+    speech_template_doubles: str = ""
+
+
+@dataclass(frozen=True)
+class RecallConfig:
+    enabled: bool = False
+    intervals: tuple[float, ...] = (120.0, 180.0)
+    template: str = DEFAULT_RECALL_TEMPLATE
+
+
+@dataclass(frozen=True)
+class UIConfig:
+    max_fps: float = 10.0
+
+
+@dataclass(frozen=True)
+class DashboardConfig:
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 8080
+    token: str = ""
+
+
+@dataclass(frozen=True)
+class DiagnosticsConfig:
+    latency_trace: bool = False
+
+
+@dataclass(frozen=True)
+class ArchiveConfig:
+    enabled: bool = True
+    flush_seconds: float = 60.0
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9464
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    file: bool = True
+    level: str = "INFO"
+    max_mb: float = 5.0
+    backup_count: int = 5
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    mode: str = "threads"
+    playback_first: bool = True      # Wiedergabe vor Synthese und Oberfläche (siehe resource_governor)
+    synthesis_threads: int = 0       # onnxruntime-Threads pro Stimme, 0 = Kerne - 1 (höchstens 4)
+    synthesis_nice: int = 10
+    synthesis_processes: int = 0     # Synthese-Prozesse (runtime.mode: processes), 0 = wie Vorab-Synthese-Threads
+    preloads_while_playing: int = 1  # gleichzeitige Vorab-Synthesen, solange Audio läuft
+
+
+@dataclass(frozen=True)
+class VoiceConfig:
+    name: str
+    model_path: str
+    speaker: int | None = None
+    length_scale: float | None = None  # None = Wert aus tts
+    noise_scale: float | None = None
+    noise_w: float | None = None
+    tables: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ZoneConfig:
+    name: str
+    tables: tuple[str, ...] = ()
+    device: str = ""
+    player: str = ""
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    path: Path | None = None
+    api_token: str = ""
+    tournament_id: str = ""
+    poll_interval: float = 1.0
+    tts: TTSConfig = field(default_factory=TTSConfig)
+    files: FilesConfig = field(default_factory=FilesConfig)
+    announcement: AnnouncementConfig = field(default_factory=AnnouncementConfig)
+    recall: RecallConfig = field(default_factory=RecallConfig)
+    ui: UIConfig = field(default_factory=UIConfig)
+    dashboard: DashboardConfig = field(default_factory=DashboardConfig)
+    diagnostics: DiagnosticsConfig = field(default_factory=DiagnosticsConfig)
+    archive: ArchiveConfig = field(default_factory=ArchiveConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
+    zones: tuple[ZoneConfig, ...] = ()
+    voices: tuple[VoiceConfig, ...] = ()
+    raw: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def base_path(self) -> Path:
+        return self.path.parent if self.path else Path(".")
+
+    def resolve_path(self, value: str | Path) -> Path:
+        """Relative Pfade gelten relativ zu ``config.yaml``."""
+        p = Path(value)
+        return p if p.is_absolute() else (self.base_path / p).resolve()
+
+
+_SECTIONS = {
+    "tts": TTSConfig,
+    "files": FilesConfig,
+    "announcement": AnnouncementConfig,
+    "recall": RecallConfig,
+    "ui": UIConfig,
+    "dashboard": DashboardConfig,
+    "diagnostics": DiagnosticsConfig,
+    "archive": ArchiveConfig,
+    "metrics": MetricsConfig,
+    "logging": LoggingConfig,
+    "runtime": RuntimeConfig,
+}
+
+
+def _coerce(name: str, value: Any, default: Any, annotation: str):
+    if value is None:
+        return None if "None" in annotation else default
+    try:
+        if isinstance(default, bool) or annotation == "bool":
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "ja", "on")
+            return bool(value)
+        if annotation.startswith("int"):
+            return int(value)
+        if annotation.startswith("float"):
+            return float(value)
+        if annotation.startswith("str"):
+            return str(value).strip()
+        if annotation.startswith("tuple["):
+            # Liste oder kommagetrennter Text, z. B. "120, 180"
+            items = str(value).split(",") if isinstance(value, (str, int, float)) else list(value)
+            item_type = annotation[len("tuple["):].split(",")[0].strip()
+            return tuple(_coerce(name, item, None, item_type) for item in items if str(item).strip())
+    except (TypeError, ValueError):
+        raise ConfigError(f"{name}: ungültiger Wert {value!r} (erwartet {annotation})") from None
+    return value
+
+
+def _type_name(annotation) -> str:
+    return annotation.__name__ if isinstance(annotation, type) else str(annotation)
+
+
+def _build_section(cls, name: str, data: Any):
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{name}: Abschnitt muss ein Mapping sein")
+    values = {}
+    for f in fields(cls):
+        if f.name in data:
+            values[f.name] = _coerce(f"{name}.{f.name}", data[f.name], f.default, _type_name(f.type))
+    return cls(**values)
+
+
+def _parse_zones(data: Any) -> tuple[ZoneConfig, ...]:
+    if not data:
+        return ()
+    if not isinstance(data, list):
+        raise ConfigError("zones: muss eine Liste von Zonen sein")
+    zones = []
+    for idx, item in enumerate(data, start=1):
+        if not isinstance(item, dict) or not str(item.get("name") or "").strip():
+            raise ConfigError(f"zones[{idx}]: jede Zone braucht einen Namen")
+        tables = item.get("tables") or []
+        if isinstance(tables, (str, int)):
+            tables = str(tables).split(",")
+        if not isinstance(tables, list):
+            raise ConfigError(f"zones[{idx}].tables: Liste oder kommagetrennter Text erwartet")
+        zones.append(ZoneConfig(
+            name=str(item["name"]).strip(),
+            tables=tuple(str(t).strip() for t in tables if str(t).strip()),
+            device=str(item.get("device") or "").strip(),
+            player=str(item.get("player") or "").strip().lower(),
+        ))
+    names = [zone.name.casefold() for zone in zones]
+    if len(set(names)) != len(names):
+        raise ConfigError("zones: Zonennamen müssen eindeutig sein")
+    return tuple(zones)
+
+
+def _parse_voices(data: Any) -> tuple[VoiceConfig, ...]:
+    if not data:
+        return ()
+    if not isinstance(data, list):
+        raise ConfigError("voices: muss eine Liste von Stimmen sein")
+    voices = []
+    for idx, item in enumerate(data, start=1):
+        if not isinstance(item, dict) or not str(item.get("name") or "").strip():
+            raise ConfigError(f"voices[{idx}]: jede Stimme braucht einen Namen")
+        if not str(item.get("model_path") or "").strip():
+            raise ConfigError(f"voices[{idx}]: model_path fehlt")
+        voices.append(_build_section(VoiceConfig, f"voices[{idx}]", item))
+    names = [voice.name.casefold() for voice in voices]
+    if len(set(names)) != len(names):
+        raise ConfigError("voices: Stimmennamen müssen eindeutig sein")
+    return tuple(voices)
+
+
+def parse_config(data: dict, path: Path | None = None) -> AppConfig:
+    if not isinstance(data, dict):
+        raise ConfigError("config.yaml muss ein Mapping enthalten")
+    announcement = dict(data.get("announcement") or {})
+    # alter Name der Option
+    if announcement.get("notify_resume_after_seconds") is None and "notify_cooldown_seconds" in announcement:
+        announcement["notify_resume_after_seconds"] = announcement["notify_cooldown_seconds"]
+    if not (announcement.get("speech_template") or "").strip():
+        announcement.pop("speech_template", None)
+    sections = {
+        key: _build_section(cls, key, announcement if key == "announcement" else data.get(key))
+        for key, cls in _SECTIONS.items()
+    }
+    return AppConfig(
+        path=path,
+        api_token=str(data.get("api_token") or ""),
+        tournament_id=str(data.get("tournament_id") or ""),
+        poll_interval=_coerce("poll_interval", data.get("poll_interval"), 1.0, "float"),
+        zones=_parse_zones(data.get("zones")),
+        voices=_parse_voices(data.get("voices")),
+        raw=data,
+        **sections,
+    )
+
+
+def load_config(path: Path = CONFIG_PATH) -> AppConfig:
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return parse_config(data, path)
+
+
+_config: AppConfig | None = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> AppConfig:
+    """Gemeinsame Konfiguration (einmal geladen). Ohne ``config.yaml``: Defaults."""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = load_config(CONFIG_PATH) if CONFIG_PATH.exists() else AppConfig()
+    return _config
+
+
+def require_config() -> AppConfig:
+    """Wie ``get_config()``, verlangt aber eine vorhandene ``config.yaml`` mit Turnierdaten."""
+    cfg = get_config()
+    if cfg.path is None:
+        raise FileNotFoundError("config.yaml fehlt! Bitte anlegen.")
+    if not cfg.api_token or not cfg.tournament_id:
+        raise ConfigError("config.yaml: api_token und tournament_id müssen gesetzt sein.")
+    return cfg
+
+
+def changed_keys(old: AppConfig, new: AppConfig) -> set[str]:
+    """Geänderte Einstellungen als ``"poll_interval"`` bzw. ``"abschnitt.feld"``."""
+    keys = {name for name in ("api_token", "tournament_id", "poll_interval", "zones", "voices")
+            if getattr(old, name) != getattr(new, name)}
+    for section in _SECTIONS:
+        before, after = getattr(old, section), getattr(new, section)
+        if before != after:
+            keys.update(f"{section}.{f.name}" for f in fields(after)
+                        if getattr(before, f.name) != getattr(after, f.name))
+    return keys
+
+
+def _set_config(cfg: AppConfig):
+    global _config
+    with _config_lock:
+        _config = cfg
+
+
+class ConfigWatcher:
+    """
+    Überwacht ``config.yaml`` per mtime/Größe. Eine geänderte Datei wird erst
+    vollständig geladen und geprüft; nur wenn das klappt, wird sie zur
+    gemeinsamen Konfiguration und ``on_change(alt, neu)`` aufgerufen. Bei
+    Fehlern bleibt die alte Konfiguration aktiv und ``on_error`` wird einmal
+    pro Dateistand gemeldet.
+    """
+
+    def __init__(self, on_change: Callable[[AppConfig, AppConfig], None], path: Path | None = None,
+                 interval: float = 2.0, on_error: Callable[[str], None] | None = None):
+        self.path = Path(path) if path else (get_config().path or CONFIG_PATH)
+        self.interval = max(0.2, float(interval))
+        self._on_change = on_change
+        self._on_error = on_error or (lambda message: print(f"[WARN] {message}"))
+        self._signature = self._stat()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="config-watcher")
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """Lädt neu, falls sich die Datei geändert hat. ``True``, wenn eine neue Config aktiv ist."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            new = load_config(self.path)
+        except Exception as exc:
+            self._on_error(f"config.yaml ungültig, behalte bisherige Einstellungen: {exc}")
+            metrics.inc("kickertool_config_reloads_total", result="invalid")
+            return False
+        old = get_config()
+        if (old.tournament_id and not new.tournament_id) or (old.api_token and not new.api_token):
+            self._on_error("config.yaml: api_token und tournament_id dürfen nicht leer sein – Änderung ignoriert.")
+            metrics.inc("kickertool_config_reloads_total", result="rejected")
+            return False
+        _set_config(new)
+        metrics.inc("kickertool_config_reloads_total", result="applied")
+        try:
+            self._on_change(old, new)
+        except Exception as exc:
+            self._on_error(f"Konnte neue Einstellungen nicht vollständig übernehmen: {exc}")
+        return True
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Differenzieller Terminal-Renderer.
+
+Statt bei jeder Änderung den Bildschirm per ``cls``/``clear`` zu löschen und
+alles neu auszugeben, hält der Renderer das zuletzt gezeichnete Bild im
+Speicher und schreibt nur geänderte Zeilen (ANSI-Cursor-Adressierung).
+Neuzeichnungen werden angefordert statt sofort ausgeführt und in einem
+eigenen Thread auf höchstens ``max_fps`` Bilder pro Sekunde zusammengefasst.
+"""
+
+import os
+import re
+import sys
+import time
+import signal
+import shutil
+import threading
+from typing import Callable, TextIO
+
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+RESET = "\x1b[0m"
+
+
+def enable_ansi() -> bool:
+    """Aktiviert VT-Escape-Sequenzen in der Windows-Konsole (ohne Subprozess)."""
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except Exception:
+        return False
+
+
+def fit_line(line: str, width: int) -> str:
+    """Kürzt ``line`` auf ``width`` sichtbare Zeichen; ANSI-Sequenzen zählen nicht mit."""
+    if len(line) <= width:
+        return line
+    if "\x1b" not in line:
+        return line[:width]
+    out = []
+    visible = 0
+    pos = 0
+    truncated = False
+    for match in ANSI_PATTERN.finditer(line):
+        text = line[pos:match.start()]
+        if visible + len(text) > width:
+            out.append(text[: width - visible])
+            truncated = True
+            break
+        out.append(text)
+        visible += len(text)
+        out.append(match.group(0))
+        pos = match.end()
+    else:
+        text = line[pos:]
+        out.append(text[: max(0, width - visible)])
+        truncated = visible + len(text) > width
+    if truncated:
+        out.append(RESET)
+    return "".join(out)
+
+
+class TerminalRenderer:
+    def __init__(self, build_frame: Callable[[int], list[str]], max_fps: float = 10.0,
+                 stream: TextIO | None = None):
+        self._build_frame = build_frame
+        self._min_interval = 1.0 / max(0.5, float(max_fps or 10.0))
+        self._stream = stream or sys.stdout
+        self._dirty = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._screen: list[str] = []
+        self._size: tuple[int, int] | None = None
+        self._last_frame = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        enable_ansi()
+        # Größenänderung: das Terminal bricht die alten Zeilen um – komplett neu zeichnen (nur Unix kennt SIGWINCH)
+        if hasattr(signal, "SIGWINCH") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGWINCH, lambda signum, frame: self.invalidate())
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ui-renderer")
+        self._thread.start()
+
+    @property
+    def native_id(self) -> int | None:
+        return self._thread.native_id if self._thread is not None else None
+
+    def stop(self, final_frame: bool = True):
+        self._stopped.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if final_frame:
+            self._draw()
+
+    def set_max_fps(self, max_fps: float):
+        self._min_interval = 1.0 / max(0.5, float(max_fps or 10.0))
+
+    def request(self):
+        """Fordert eine Neuzeichnung an (nicht blockierend, mehrfache Aufrufe verschmelzen)."""
+        self._dirty.set()
+
+    def invalidate(self):
+        """Erzwingt beim nächsten Bild ein vollständiges Neuzeichnen."""
+        self._size = None
+        self._dirty.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._dirty.wait()
+            if self._stopped.is_set():
+                break
+            wait = self._last_frame + self._min_interval - time.monotonic()
+            if wait > 0 and self._stopped.wait(wait):
+                break
+            self._dirty.clear()
+            try:
+                self._draw()
+            except Exception:
+                self._size = None
+
+    def _draw(self):
+        columns, rows = shutil.get_terminal_size((120, 30))
+        width = max(20, columns)
+        lines = []
+        for line in self._build_frame(width):
+            lines.extend(line.split("\n"))
+        lines = [fit_line(line, width) for line in lines[: max(1, rows - 1)]]
+
+        out = []
+        if self._size != (columns, rows):
+            out.append("\x1b[H\x1b[2J")
+            previous: list[str] = []
+        else:
+            previous = self._screen
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                out.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        if len(lines) < len(previous):
+            out.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        if not out:
+            self._last_frame = time.monotonic()
+            return
+        out.append(f"\x1b[{len(lines) + 1};1H")
+        self._stream.write("".join(out))
+        self._stream.flush()
+        self._screen = lines
+        self._size = (columns, rows)
+        self._last_frame = time.monotonic()
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Spaltenarchiv der Court-Zustände für Auswertungen nach dem Event.
+
+Jeder Poll wird mit dem vorherigen Stand verglichen; nur Tische, deren Match
+oder Teams sich geändert haben, landen als Zeile im Archiv. Zeilen sind
+NumPy-Structured-Arrays (feste Breite, Strings als Integer-IDs aus einem
+Wörterbuch) und werden blockweise als ``chunk-<n>.npy`` geschrieben:
+
+    data/<tournament>/court_archive/
+        strings.jsonl     # ID -> String (Zeilennummer = ID, nur angehängt)
+        chunk-000001.npy  # Zeilen (ts, kind, table, match, team_a, team_b)
+        archive.json      # erster/letzter Poll
+
+``python court_archive.py stats`` berechnet daraus Auslastung, Match-Dauer,
+Leerlaufzeiten und Zeit bis zur Ansage pro Tisch – vektorisiert, ohne
+Python-Schleife über die Zeilen.
+
+NumPy ist optional; ohne NumPy bleibt das Archiv abgeschaltet.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import importlib.util
+from pathlib import Path
+
+from state_store import atomic_write_text
+
+np = None  # NumPy wird erst beim ersten Gebrauch geladen (Startzeit)
+
+ARCHIVE_DIR_NAME = "court_archive"
+STRINGS_FILE = "strings.jsonl"
+META_FILE = "archive.json"
+
+KIND_STATE = 0      # Tisch hat ein neues Match bzw. ist frei (match = -1)
+KIND_ANNOUNCED = 1  # Durchsage für das Match wurde gesprochen
+KIND_OFFLINE = 2    # Tool beendet – Zeitraum bis zum nächsten Zustand ist unbekannt
+
+ROW_FIELDS = [("ts", "<f8"), ("kind", "u1"), ("table", "<i4"), ("match", "<i4"),
+              ("team_a", "<i4"), ("team_b", "<i4")]
+ROW_DTYPE = None
+
+
+def available() -> bool:
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _require_numpy():
+    global np, ROW_DTYPE
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("NumPy ist nicht installiert") from None
+        ROW_DTYPE = numpy.dtype(ROW_FIELDS)
+        np = numpy
+    return np
+
+
+class CourtArchive:
+    def __init__(self, directory: Path, chunk_rows: int = 4096, flush_seconds: float = 60.0):
+        _require_numpy()
+        self.directory = Path(directory)
+        self.chunk_rows = max(16, int(chunk_rows))
+        self.flush_seconds = float(flush_seconds)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._strings: dict[str, int] = {}
+        self._new_strings: list[str] = []
+        self._rows: list[tuple] = []
+        self._last: dict[int, tuple] = {}
+        self._next_chunk = 1
+        self._meta = {"first_poll": None, "last_poll": None}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._open()
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        strings = _read_strings(self.directory)
+        self._strings = {value: idx for idx, value in enumerate(strings)}
+        chunks = _chunk_files(self.directory)
+        if chunks:
+            self._next_chunk = int(chunks[-1].stem.split("-")[1]) + 1
+        meta_path = self.directory / META_FILE
+        if meta_path.exists():
+            try:
+                self._meta.update(json.loads(meta_path.read_text(encoding="utf-8")))
+            except ValueError:
+                pass
+
+    def _intern(self, value: str | None) -> int:
+        if not value:
+            return -1
+        idx = self._strings.get(value)
+        if idx is None:
+            idx = self._strings[value] = len(self._strings)
+            self._new_strings.append(value)
+        return idx
+
+    # ---- Aufzeichnen ----
+    def record_poll(self, ts: float, courts) -> int:
+        """``courts``: Iterable aus (Tisch, Match-ID, Team A, Team B). Gibt die Zahl neuer Zeilen zurück."""
+        added = 0
+        with self._lock:
+            for table, match_id, team_a, team_b in courts:
+                if not table:
+                    continue
+                table_id = self._intern(table)
+                state = (self._intern(match_id), self._intern(team_a), self._intern(team_b))
+                if self._last.get(table_id) == state:
+                    continue
+                self._last[table_id] = state
+                self._rows.append((ts, KIND_STATE, table_id) + state)
+                added += 1
+            if self._meta["first_poll"] is None:
+                self._meta["first_poll"] = ts
+            self._meta["last_poll"] = ts
+            pending = len(self._rows)
+        if pending:
+            self._ensure_thread()
+            if pending >= self.chunk_rows:
+                self._wakeup.set()
+        return added
+
+    def record_announcement(self, ts: float, table: str | None, match_id: str | None):
+        if not table or not match_id:
+            return
+        with self._lock:
+            self._rows.append((ts, KIND_ANNOUNCED, self._intern(table), self._intern(match_id), -1, -1))
+        self._ensure_thread()
+
+    # ---- Schreiben ----
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows = self._rows
+                strings = self._new_strings
+                meta = dict(self._meta)
+                self._rows = []
+                self._new_strings = []
+            try:
+                if strings:
+                    # Wörterbuch vor den Zeilen sichern, die darauf verweisen
+                    with open(self.directory / STRINGS_FILE, "a", encoding="utf-8") as f:
+                        f.write("".join(json.dumps(value, ensure_ascii=False) + "\n" for value in strings))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    strings = []
+                if rows:
+                    path = self.directory / f"chunk-{self._next_chunk:06d}.npy"
+                    tmp = path.with_name(path.name + ".tmp")
+                    with open(tmp, "wb") as f:
+                        np.save(f, np.array(rows, dtype=ROW_DTYPE))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp, path)
+                    self._next_chunk += 1
+                    rows = []
+                atomic_write_text(self.directory / META_FILE, json.dumps(meta))
+            except Exception:
+                # nichts verlieren: beim nächsten Flush erneut versuchen
+                with self._lock:
+                    self._rows = rows + self._rows
+                    self._new_strings = strings + self._new_strings
+                raise
+
+    def close(self):
+        """Markiert alle Tische als offline, schreibt den letzten Block und beendet den Thread."""
+        now = time.time()
+        with self._lock:
+            for table_id in self._last:
+                self._rows.append((now, KIND_OFFLINE, table_id, -1, -1, -1))
+            self._last.clear()
+            if self._rows:
+                self._meta["last_poll"] = now
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="court-archive")
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"[WARN] Court-Archiv konnte nicht geschrieben werden: {exc}")
+
+
+# ==== Laden & Auswerten ====
+def _read_strings(directory: Path) -> list[str]:
+    path = Path(directory) / STRINGS_FILE
+    if not path.exists():
+        return []
+    strings = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                strings.append(json.loads(line))
+            except ValueError:
+                break  # abgeschnittene letzte Zeile
+    return strings
+
+
+def _chunk_files(directory: Path) -> list[Path]:
+    return sorted(Path(directory).glob("chunk-*.npy"))
+
+
+def load_archive(directory: Path):
+    """Liefert (Zeilen, Strings, Meta)."""
+    _require_numpy()
+    directory = Path(directory)
+    chunks = [np.load(path) for path in _chunk_files(directory)]
+    rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=ROW_DTYPE)
+    meta_path = directory / META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    return rows, _read_strings(directory), meta
+
+
+def _summary(values) -> dict:
+    if values.size == 0:
+        return {"count": 0, "mean": None, "median": None, "p90": None}
+    p50, p90 = np.percentile(values, [50, 90])
+    return {"count": int(values.size), "mean": float(values.mean()), "median": float(p50), "p90": float(p90)}
+
+
+def analyze(rows, strings: list[str], end_ts: float | None = None) -> dict:
+    """Auslastung, Match-Dauer, Leerlauf und Zeit bis zur Ansage (Sekunden) pro Tisch und gesamt."""
+    _require_numpy()
+    state = rows[rows["kind"] != KIND_ANNOUNCED]
+    announced = rows[rows["kind"] == KIND_ANNOUNCED]
+    if state.size == 0:
+        return {"tables": {}, "overall": {}, "span_seconds": 0.0}
+    state = state[np.lexsort((state["ts"], state["table"]))]
+    ts = state["ts"]
+    table = state["table"]
+    match = state["match"]
+    kind = state["kind"]
+    if end_ts is None:
+        end_ts = float(rows["ts"].max())
+
+    # Segmente: von einer Zeile bis zur nächsten Zeile desselben Tisches
+    same_next = np.zeros(state.size, dtype=bool)
+    same_next[:-1] = table[:-1] == table[1:]
+    next_ts = np.full(state.size, end_ts)
+    next_ts[:-1][same_next[:-1]] = ts[1:][same_next[:-1]]
+    duration = np.maximum(next_ts - ts, 0.0)
+
+    # Aufeinanderfolgende Zeilen mit gleichem Match (z. B. geänderte Team-Namen) zusammenfassen
+    starts = np.ones(state.size, dtype=bool)
+    starts[1:] = ~((table[1:] == table[:-1]) & (match[1:] == match[:-1]) & (kind[1:] == kind[:-1]))
+    group = np.cumsum(starts) - 1
+    g_duration = np.bincount(group, weights=duration)
+    g_start = ts[starts]
+    g_table = table[starts]
+    g_match = match[starts]
+    g_kind = kind[starts]
+    g_first = np.flatnonzero(starts)
+    g_last = np.flatnonzero(np.append(starts[1:], True))
+    # Nur vollständig beobachtete Segmente zählen für Dauer-Statistiken:
+    # Start nach einem bekannten Zustand, Ende durch einen neuen Zustand (nicht durch Beenden/Archivende)
+    known_prev = np.zeros(state.size, dtype=bool)
+    known_prev[1:] = (table[1:] == table[:-1]) & (kind[:-1] == KIND_STATE)
+    known_next = np.zeros(state.size, dtype=bool)
+    known_next[:-1] = same_next[:-1] & (kind[1:] == KIND_STATE)
+    g_closed = known_prev[g_first] & known_next[g_last]
+
+    busy = (g_kind == KIND_STATE) & (g_match >= 0)
+    idle = (g_kind == KIND_STATE) & (g_match < 0)
+    n = max(len(strings), int(table.max()) + 1)
+    busy_time = np.bincount(g_table, weights=np.where(busy, g_duration, 0.0), minlength=n)
+    idle_time = np.bincount(g_table, weights=np.where(idle, g_duration, 0.0), minlength=n)
+    match_mask = busy & g_closed
+    gap_mask = idle & g_closed
+
+    # Zeit bis zur Ansage: erste Zeile des Matches -> erste Ansage des Matches
+    ttc = np.empty(0)
+    ttc_table = np.empty(0, dtype=np.int32)
+    if announced.size and busy.any():
+        order = np.lexsort((g_start[busy], g_match[busy]))
+        started_match = g_match[busy][order]
+        started_ts = g_start[busy][order]
+        first_idx = np.unique(started_match, return_index=True)[1]
+        started_match = started_match[first_idx]
+        started_ts = started_ts[first_idx]
+        ann = announced[np.lexsort((announced["ts"], announced["match"]))]
+        ann = ann[np.unique(ann["match"], return_index=True)[1]]
+        pos = np.clip(np.searchsorted(started_match, ann["match"]), 0, started_match.size - 1)
+        found = started_match[pos] == ann["match"]
+        ttc = np.maximum(ann["ts"][found] - started_ts[pos[found]], 0.0)
+        ttc_table = ann["table"][found]
+
+    tables = {}
+    for table_id in np.unique(table):
+        observed = busy_time[table_id] + idle_time[table_id]
+        name = strings[table_id] if table_id < len(strings) else str(table_id)
+        tables[name] = {
+            "utilization": float(busy_time[table_id] / observed) if observed > 0 else None,
+            "busy_seconds": float(busy_time[table_id]),
+            "idle_seconds": float(idle_time[table_id]),
+            "matches": _summary(g_duration[match_mask & (g_table == table_id)]),
+            "idle_gaps": _summary(g_duration[gap_mask & (g_table == table_id)]),
+            "time_to_call": _summary(ttc[ttc_table == table_id]),
+        }
+    observed_total = busy_time.sum() + idle_time.sum()
+    overall = {
+        "utilization": float(busy_time.sum() / observed_total) if observed_total > 0 else None,
+        "matches": _summary(g_duration[match_mask]),
+        "idle_gaps": _summary(g_duration[gap_mask]),
+        "time_to_call": _summary(ttc),
+    }
+    return {"tables": tables, "overall": overall, "span_seconds": float(end_ts - ts.min())}
+
+
+def _fmt_minutes(seconds) -> str:
+    return "-" if seconds is None else f"{seconds / 60:.1f}"
+
+
+def _table_sort_key(name: str):
+    digits = "".join(ch for ch in name if ch.isdigit())
+    return (0, int(digits), name) if digits else (1, 0, name)
+
+
+def format_stats(result: dict) -> str:
+    if not result["tables"]:
+        return "Archiv ist leer."
+    lines = [
+        f"Zeitraum: {result['span_seconds'] / 3600:.1f} h",
+        f"{'Tisch':<14} {'Auslastung':>10} {'Matches':>8} {'Ø Dauer':>8} {'Median':>8} "
+        f"{'Ø Leerlauf':>10} {'Ø bis Ansage':>12}",
+        "(Dauern in Minuten, Zeit bis Ansage in Sekunden)",
+    ]
+
+    def row(name: str, data: dict):
+        util = data["utilization"]
+        ttc = data["time_to_call"]["mean"]
+        lines.append(
+            f"{name[:14]:<14} {('-' if util is None else f'{util * 100:.0f} %'):>10} "
+            f"{data['matches']['count']:>8} {_fmt_minutes(data['matches']['mean']):>8} "
+            f"{_fmt_minutes(data['matches']['median']):>8} {_fmt_minutes(data['idle_gaps']['mean']):>10} "
+            f"{('-' if ttc is None else f'{ttc:.1f}'):>12}"
+        )
+
+    for name in sorted(result["tables"], key=_table_sort_key):
+        row(name, result["tables"][name])
+    row("Gesamt", result["overall"])
+    return "\n".join(lines)
+
+
+def _default_archive_dir() -> Path:
+    from extract_announcements_from_kickertool import BASE_DIR
+    return BASE_DIR / ARCHIVE_DIR_NAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auswertung des Court-Archivs (Auslastung, Match-Dauer, Leerlauf).")
+    parser.add_argument("command", nargs="?", default="stats", choices=["stats"])
+    parser.add_argument("-d", "--dir", help=f"Archiv-Ordner (Standard: data/<tournament>/{ARCHIVE_DIR_NAME})")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+    if not available():
+        print("[ERROR] NumPy ist nicht installiert (pip install numpy).")
+        sys.exit(2)
+    archive_dir = Path(args.dir) if args.dir else _default_archive_dir()
+    if not archive_dir.exists():
+        print(f"[ERROR] Ordner nicht gefunden: {archive_dir}")
+        sys.exit(2)
+    started = time.perf_counter()
+    rows, strings, meta = load_archive(archive_dir)
+    result = analyze(rows, strings, end_ts=meta.get("last_poll"))
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_stats(result))
+        print(f"\n{rows.size} Zeilen ausgewertet in {elapsed * 1000:.0f} ms.")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Kompaktes Abbild der Tische aus der Courts-Antwort.
+
+Die API liefert mit ``includeMatchDetails=true`` pro Tisch das komplette
+Match (Disziplin, Sätze, Spieler-IDs …), gebraucht werden aber nur Tischname,
+Match-ID, die beiden Teams und ob das Match schon läuft. ``CourtSnapshotParser`` hält deshalb nur
+``CourtInfo``-Tupel mit internierten Strings; der Dict-Baum der Antwort wird
+direkt nach dem Auslesen verworfen.
+
+Meist ändert sich zwischen zwei Polls nichts: Sind die Rohdaten byte-gleich
+mit dem letzten Abruf, wird gar nicht erst geparst und derselbe Snapshot
+zurückgegeben (``is``-Vergleich genügt). Unveränderte Tische einer geänderten
+Antwort übernehmen ihr bisheriges ``CourtInfo``-Objekt.
+"""
+
+import sys
+import json
+from typing import Callable, NamedTuple
+
+import metrics
+
+UNCHANGED = "unchanged"  # Poll-Prozess: Snapshot wie beim letzten Mal (siehe process_stages)
+
+metrics.define_counter("kickertool_court_parse_total",
+                       "Court-Antworten nach Ergebnis (parsed = neu geparst, unchanged = byte-gleich übersprungen).")
+
+
+class CourtInfo(NamedTuple):
+    table: str | None
+    match_id: str | None
+    team_a: str | None
+    team_b: str | None
+    has_full: bool
+    started: bool = False  # Match läuft schon (kein erneuter Aufruf mehr)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class CourtSnapshotParser:
+    def __init__(self, extract: Callable[[object], tuple]):
+        self._extract = extract
+        self._raw: bytes | None = None
+        self._snapshot: tuple[CourtInfo, ...] | None = None
+        self._infos: dict[tuple, CourtInfo] = {}
+
+    def parse(self, raw: bytes) -> tuple[CourtInfo, ...] | None:
+        """Snapshot der Tische; ``None``, wenn die Antwort keine Liste ist. Ungültiges JSON wirft ``ValueError``."""
+        if self._snapshot is not None and raw == self._raw:
+            metrics.inc("kickertool_court_parse_total", result="unchanged")
+            return self._snapshot
+        data = json.loads(raw)
+        if not isinstance(data, list):
+            return None
+        previous = self._infos
+        infos: dict[tuple, CourtInfo] = {}
+        courts = []
+        for court in data:
+            values = self._extract(court)
+            info = previous.get(values) or infos.get(values)
+            if info is None:
+                info = CourtInfo(*map(_intern, values))
+            infos[values] = info
+            courts.append(info)
+        self._raw = raw
+        self._snapshot = tuple(courts)
+        self._infos = infos
+        metrics.inc("kickertool_court_parse_total", result="parsed")
+        return self._snapshot
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Lokales Web-Dashboard mit Live-Updates per Server-Sent Events.
+
+Die Ansage-Threads rufen nur ``DashboardHub.publish()`` auf (Zähler erhöhen,
+wartende Clients wecken). Der Zustand wird pro Änderung höchstens einmal
+erfasst und als JSON serialisiert – egal wie viele Browser verbunden sind;
+jeder Client-Thread schickt nur noch die fertigen Bytes.
+
+Ohne Token lauscht der Server nur auf Loopback-Adressen; Aktionen nehmen nur
+``application/json`` an, damit fremde Webseiten sie nicht per Formular
+auslösen können.
+"""
+
+import hmac
+import json
+import time
+import socket
+import ipaddress
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+KEEPALIVE_SECONDS = 15.0
+MIN_PUSH_INTERVAL = 0.2
+
+
+def is_loopback(host: str) -> bool:
+    """``True``, wenn ``host`` nur vom eigenen Rechner aus erreichbar ist."""
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except (OSError, UnicodeError):
+        return False
+    try:
+        return bool(addresses) and all(ipaddress.ip_address(a.split("%", 1)[0]).is_loopback for a in addresses)
+    except ValueError:
+        return False
+
+
+class DashboardHub:
+    def __init__(self, snapshot: Callable[[], dict]):
+        self._snapshot = snapshot
+        self._cond = threading.Condition()
+        self._version = 0
+        self._closed = False
+        self._build_lock = threading.Lock()
+        self._payload_version = -1
+        self._payload = b"{}"
+
+    def publish(self):
+        """Markiert den Zustand als geändert (O(1), blockiert nie auf Clients)."""
+        with self._cond:
+            self._version += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def payload(self) -> tuple[int, bytes]:
+        with self._cond:
+            version = self._version
+        with self._build_lock:
+            if self._payload_version != version:
+                self._payload = json.dumps(self._snapshot(), ensure_ascii=False).encode("utf-8")
+                self._payload_version = version
+            return self._payload_version, self._payload
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed or self._version != seen_version, timeout)
+
+
+_INDEX_HTML = """<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Kickertool TTS</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 0; background: #111; color: #eee; }
+  header { padding: 12px 16px; background: #1b5e20; display: flex; flex-wrap: wrap; gap: 8px; align-items: center; }
+  header h1 { font-size: 1.2rem; margin: 0 16px 0 0; }
+  button { font-size: 1rem; padding: 10px 16px; border: 0; border-radius: 6px; background: #eee; color: #111; }
+  button.active { background: #ffb300; }
+  main { padding: 8px 16px; display: grid; gap: 16px; grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); }
+  section h2 { font-size: 1rem; border-bottom: 1px solid #444; padding-bottom: 4px; }
+  ol, ul { padding-left: 20px; }
+  li { margin: 6px 0; }
+  li.playing { color: #66bb6a; font-weight: bold; }
+  li button { font-size: 0.8rem; padding: 4px 8px; margin-left: 8px; }
+  #status { font-size: 0.9rem; }
+  #logs { font-family: monospace; font-size: 0.8rem; white-space: pre-wrap; }
+  .offline { opacity: 0.5; }
+</style>
+</head>
+<body>
+<header>
+  <h1>Kickertool TTS</h1>
+  <button id="pause" onclick="act('pause')">Pause</button>
+  <button id="mute" onclick="act('mute')">Stumm</button>
+  <span id="status">verbinde …</span>
+</header>
+<main>
+  <section><h2>Anstehende Durchsagen</h2><ul id="queue"></ul></section>
+  <section><h2>Letzte Durchsagen</h2><ol id="history"></ol></section>
+  <section><h2>Logs</h2><div id="logs"></div></section>
+</main>
+<script>
+const token = new URLSearchParams(location.search).get("token") || "";
+const q = token ? "?token=" + encodeURIComponent(token) : "";
+function el(tag, text, cls) { const e = document.createElement(tag); e.textContent = text; if (cls) e.className = cls; return e; }
+function act(name, body) {
+  fetch("/api/" + name + q, {method: "POST", headers: {"Content-Type": "application/json"}, body: JSON.stringify(body || {})});
+}
+function render(s) {
+  document.body.classList.remove("offline");
+  document.getElementById("status").textContent =
+    (s.enabled ? "Ansagen aktiv" : "Ansagen pausiert") + " · " + (s.muted ? "Ton stumm" : "Ton an") + " · Queue: " + s.queue.length;
+  const pause = document.getElementById("pause");
+  pause.textContent = s.enabled ? "Pause" : "Play"; pause.classList.toggle("active", !s.enabled);
+  const mute = document.getElementById("mute");
+  mute.textContent = s.muted ? "Ton an" : "Stumm"; mute.classList.toggle("active", s.muted);
+  const queue = document.getElementById("queue"); queue.replaceChildren();
+  if (!s.queue.length) queue.append(el("li", "(keine)"));
+  for (const item of s.queue) queue.append(el("li", item.text, item.status === "playing" ? "playing" : ""));
+  const history = document.getElementById("history"); history.replaceChildren();
+  s.history.forEach((text, i) => {
+    const li = el("li", text); const b = el("button", "Wiederholen");
+    b.onclick = () => act("replay", {index: i + 1}); li.append(b); history.append(li);
+  });
+  document.getElementById("logs").textContent = s.logs.join("\\n");
+}
+function connect() {
+  const source = new EventSource("/events" + q);
+  source.addEventListener("state", (ev) => render(JSON.parse(ev.data)));
+  source.onerror = () => { document.body.classList.add("offline"); document.getElementById("status").textContent = "Verbindung unterbrochen …"; };
+}
+connect();
+</script>
+</body>
+</html>
+"""
+
+
+def _make_handler(hub: DashboardHub, actions: dict[str, Callable[[dict], str | None]], token: str):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _authorized(self, query: dict) -> bool:
+            if not token:
+                return True
+            supplied = self.headers.get("X-Dashboard-Token") or (query.get("token") or [""])[0]
+            return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, data: dict):
+            self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if not self._authorized(query):
+                self._send_json(403, {"error": "token"})
+                return
+            if url.path in ("/", "/index.html"):
+                self._send(200, _INDEX_HTML.encode("utf-8"), "text/html; charset=utf-8")
+            elif url.path == "/api/state":
+                _, payload = hub.payload()
+                self._send(200, payload, "application/json; charset=utf-8")
+            elif url.path == "/events":
+                self._stream_events()
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if not self._authorized(query):
+                self._send_json(403, {"error": "token"})
+                return
+            name = url.path.rsplit("/", 1)[-1]
+            action = actions.get(name) if url.path.startswith("/api/") else None
+            if action is None:
+                self._send_json(404, {"error": "unbekannte Aktion"})
+                return
+            content_type = (self.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+            if content_type != "application/json":
+                self._send_json(415, {"error": "Content-Type muss application/json sein"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                if not isinstance(body, dict):
+                    body = {}
+            except ValueError:
+                self._send_json(400, {"error": "ungültiges JSON"})
+                return
+            error = action(body)
+            if error:
+                self._send_json(400, {"error": error})
+            else:
+                self._send_json(200, {"ok": True})
+
+        def _stream_events(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            seen = -1
+            try:
+                self.wfile.write(b"retry: 2000\n\n")
+                while not hub.closed:
+                    version, payload = hub.payload()
+                    if version != seen:
+                        self.wfile.write(b"event: state\ndata: " + payload + b"\n\n")
+                        self.wfile.flush()
+                        seen = version
+                        # Bursts (z. B. Rundenstart) zu einem Update zusammenfassen
+                        time.sleep(MIN_PUSH_INTERVAL)
+                    if not hub.wait_for_change(seen, KEEPALIVE_SECONDS):
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, OSError):
+                pass
+
+    return Handler
+
+
+class DashboardServer:
+    def __init__(self, hub: DashboardHub, actions: dict[str, Callable[[dict], str | None]],
+                 host: str = "127.0.0.1", port: int = 8080, token: str = ""):
+        if not token and not is_loopback(host):
+            raise ValueError(f"Dashboard auf {host} nur mit dashboard.token – sonst kann jeder im Netz die Ansagen steuern")
+        self.hub = hub
+        self._server = ThreadingHTTPServer((host, int(port)), _make_handler(hub, actions, token))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="dashboard-http")
+        self._thread.start()
+
+    def stop(self):
+        self.hub.close()
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,20 +1,19 @@
 import os
 import re
 import json
+import time
 import shutil
-import requests
-import yaml
 from pathlib import Path
+import metrics
+from config import require_config
+from state_store import JournaledStateStore
+from court_snapshot import CourtSnapshotParser
 
 # ==== CONFIG LADEN ====
-CONFIG_PATH = Path("config.yaml")
-if not CONFIG_PATH.exists():
-    raise FileNotFoundError("config.yaml fehlt! Bitte anlegen.")
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    CONFIG = yaml.safe_load(f) or {}
+CONFIG = require_config()
 
-api_token = CONFIG["api_token"]
-tournament_id = str(CONFIG["tournament_id"])
+api_token = CONFIG.api_token
+tournament_id = CONFIG.tournament_id
 
 def safe_slug(s: str) -> str:
     s = (s or "").strip()
@@ -73,8 +72,10 @@ def _entry_to_team_name(entry):
 BASE_DIR = Path("data") / safe_slug(tournament_id)
 output_dir = BASE_DIR / "announcements"
 state_file = BASE_DIR / "seen_matches.json"
+_state_store = JournaledStateStore(state_file)
 
 headers = {'Authorization': api_token}
+_session = None
 courts_url = (
     f'https://api.tournament.io/v1/public/tournaments/{tournament_id}/courts?includeMatchDetails=true'
 )
@@ -90,49 +91,100 @@ def ensure_dirs():
 
 
 def load_state():
-    if state_file.exists():
-        try:
-            with open(state_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-        except Exception:
-            pass
-    return {}
+    """Lädt den State aus Snapshot + Journal (siehe state_store.py)."""
+    return _state_store.load()
 
 
 def save_state(state):
-    try:
-        state_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(state_file, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"[WARN] Konnte State nicht speichern: {e}")
+    """Übernimmt Änderungen in den Journal-Store; geschrieben wird im Hintergrund."""
+    _state_store.save(state)
 
 
-def fetch_courts():
+def flush_state():
+    """Schreibt ausstehende Änderungen und kompaktiert (beim Beenden aufrufen)."""
+    _state_store.close()
+
+
+def _http_session():
+    """requests wird erst beim ersten Poll importiert (spart ~100 ms beim Start)."""
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+        _session.headers.update(headers)
+    return _session
+
+
+def set_api_token(token: str):
+    """Neuer Token aus config.yaml (Hot-Reload); gilt ab dem nächsten Poll."""
+    global api_token, _session
+    api_token = token
+    headers['Authorization'] = token
+    _session = None
+
+
+def _fetch_courts_raw() -> bytes | None:
+    started = time.perf_counter()
+    metrics.inc("kickertool_polls_total")
     try:
-        r = requests.get(courts_url, headers=headers, timeout=15)
+        r = _http_session().get(courts_url, timeout=15)
         if r.status_code != 200:
+            metrics.inc("kickertool_poll_errors_total", reason=f"http_{r.status_code}")
             print(f"[HTTP {r.status_code}] {r.text[:200]}")
             return None
-        return r.json()
+        return r.content
     except Exception as e:
+        metrics.inc("kickertool_poll_errors_total", reason=type(e).__name__)
         print(f"[ERROR] Laden der Courts: {e}")
         return None
+    finally:
+        metrics.observe("kickertool_poll_duration_seconds", time.perf_counter() - started)
 
 
-def extract_match_info_from_court(court_obj):
-    """Gibt (tischname, match_id, team_a, team_b, has_full_match) zurück."""
+def _invalid_json(e: ValueError):
+    metrics.inc("kickertool_poll_errors_total", reason=type(e).__name__)
+    print(f"[ERROR] Laden der Courts: {e}")
+
+
+def fetch_courts():
+    raw = _fetch_courts_raw()
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        _invalid_json(e)
+        return None
+
+
+# Ob ein Match schon läuft, steht je nach Kickertool-Version im Status oder in ``startedAt``.
+# Nur eindeutige Angaben zählen: "active", ``startTime`` oder ``started`` kann die API schon für
+# ein aufgerufenes, noch nicht gespieltes Match setzen – dann fielen die erneuten Aufrufe weg.
+_STARTED_STATES = frozenset({
+    "running", "started", "playing", "live", "in_progress", "inprogress",
+    "finished", "completed", "done",
+})
+_STARTED_FIELDS = ("startedAt",)
+
+
+def _match_started(current_match: dict) -> bool:
+    state = current_match.get("state") or current_match.get("status")
+    if isinstance(state, str) and state.strip().lower() in _STARTED_STATES:
+        return True
+    return any(current_match.get(name) for name in _STARTED_FIELDS)
+
+
+def extract_court_info(court_obj):
+    """Gibt (tischname, match_id, team_a, team_b, has_full_match, started) zurück."""
     if not isinstance(court_obj, dict):
-        return None, None, None, None, False
+        return None, None, None, None, False, False
 
     tischname_raw = court_obj.get("name", "")
     tischname = str(tischname_raw).strip() or None
 
     current_match = court_obj.get("currentMatch")
     if not isinstance(current_match, dict):
-        return tischname, None, None, None, False
+        return tischname, None, None, None, False, False
 
     match_id = current_match.get("id")
     entries = current_match.get("entries") or []
@@ -142,4 +194,31 @@ def extract_match_info_from_court(court_obj):
     team_b = _entry_to_team_name(entries[1]) if len(entries) >= 2 else None
 
     has_full = bool(tischname and match_id and team_a and team_b)
-    return tischname, (str(match_id) if match_id else None), team_a, team_b, has_full
+    return (tischname, (str(match_id) if match_id else None), team_a, team_b, has_full,
+            _match_started(current_match))
+
+
+def extract_match_info_from_court(court_obj):
+    """Gibt (tischname, match_id, team_a, team_b, has_full_match) zurück."""
+    return extract_court_info(court_obj)[:5]
+
+
+_snapshot_parser = CourtSnapshotParser(extract_court_info)
+
+
+def fetch_court_infos():
+    """
+    Tische als ``CourtInfo``-Tupel (tischname, match_id, team_a, team_b, has_full, started); ``None`` bei Fehlern.
+    Ist die Antwort byte-gleich mit der letzten, kommt ohne Parsen derselbe Snapshot zurück.
+    """
+    raw = _fetch_courts_raw()
+    if raw is None:
+        return None
+    try:
+        courts = _snapshot_parser.parse(raw)
+    except ValueError as e:
+        _invalid_json(e)
+        return None
+    if courts is None:
+        metrics.inc("kickertool_poll_errors_total", reason="format")
+    return courts
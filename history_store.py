@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Durchsage-History für das ganze Turnier.
+
+Jede gesprochene Durchsage wird als JSON-Zeile an
+``announcement_history.jsonl`` angehängt – die Datei wird nie komplett neu
+geschrieben. Im Speicher liegen Indizes auf Tisch, Match-ID, Spielernamen
+(sortierte Token-Liste, Präfixsuche per ``bisect``) und Zeit, damit
+``replay tisch 5`` oder ``replay Müller`` ohne Durchlaufen der History
+auskommen.
+
+``append`` aktualisiert nur die Indizes; die Zeile schreibt ein eigener Thread
+(``history-writer``) mit dauerhaft offener Datei, damit der Player-Thread
+einer Zone nicht auf die Platte wartet. ``close`` schreibt alles Wartende.
+"""
+
+import re
+import json
+import time
+import bisect
+import threading
+from pathlib import Path
+from queue import Queue, Empty
+from typing import Callable
+
+from speech_templates import split_team_members
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_TABLE_PREFIX = re.compile(r"^(?:tisch|table|court)\s*", re.IGNORECASE)
+_STOP = object()
+
+
+def normalize_table(name: str | None) -> str:
+    """``"Tisch 5"``, ``"tisch5"`` und ``"5"`` landen im selben Index-Eintrag."""
+    return _TABLE_PREFIX.sub("", (name or "").strip()).casefold()
+
+
+def name_tokens(*names: str | None) -> set[str]:
+    tokens = set()
+    for name in names:
+        for member in split_team_members(name or ""):
+            tokens.update(token.casefold() for token in _TOKEN_PATTERN.findall(member))
+    return tokens
+
+
+class HistoryEntry:
+    __slots__ = ("seq", "ts", "key", "text", "table", "match_id", "team_a", "team_b")
+
+    def __init__(self, seq: int, ts: float, key: str, text: str, table: str | None = None,
+                 match_id: str | None = None, team_a: str | None = None, team_b: str | None = None):
+        self.seq = seq
+        self.ts = ts
+        self.key = key
+        self.text = text
+        self.table = table
+        self.match_id = match_id
+        self.team_a = team_a
+        self.team_b = team_b
+
+    def to_json(self) -> dict:
+        data = {"ts": round(self.ts, 3), "id": self.key, "text": self.text}
+        for field in ("table", "match_id", "team_a", "team_b"):
+            value = getattr(self, field)
+            if value:
+                data[field] = value
+        return data
+
+
+class AnnouncementHistory:
+    def __init__(self, path: Path, on_error: Callable[[str], None] | None = None):
+        self.path = Path(path)
+        self._on_error = on_error or (lambda message: print(f"[WARN] {message}"))
+        self._lock = threading.Lock()
+        self._queue: "Queue[object]" = Queue()
+        self._writer: threading.Thread | None = None
+        self._entries: list[HistoryEntry] = []
+        self._times: list[float] = []
+        self._by_table: dict[str, list[int]] = {}
+        self._by_match: dict[str, list[int]] = {}
+        self._by_token: dict[str, list[int]] = {}
+        self._tokens: list[str] = []  # sortiert, für Präfixsuche
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---- Laden ----
+    def load(self, legacy_path: Path | None = None) -> int:
+        """Liest die JSONL-Datei; fehlt sie, wird die alte JSON-History (max. 20 Einträge) übernommen."""
+        records = []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(data, dict) and data.get("text"):
+                        records.append(data)
+        elif legacy_path is not None and Path(legacy_path).exists():
+            records = self._read_legacy(Path(legacy_path))
+            if records:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    for data in records:
+                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        with self._lock:
+            for data in records:
+                self._index(HistoryEntry(
+                    len(self._entries), float(data.get("ts") or 0.0), data.get("id") or f"history-{len(self._entries) + 1}",
+                    data["text"], data.get("table"), data.get("match_id"), data.get("team_a"), data.get("team_b"),
+                ))
+        return len(records)
+
+    @staticmethod
+    def _read_legacy(path: Path) -> list[dict]:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, list):
+            return []
+        ts = path.stat().st_mtime
+        # alte Datei: neueste zuerst
+        return [
+            {"ts": ts, "id": entry.get("id"), "text": entry.get("text")}
+            for entry in reversed(data)
+            if isinstance(entry, dict) and entry.get("text")
+        ]
+
+    # ---- Schreiben ----
+    def append(self, key: str, text: str, table: str | None = None, match_id: str | None = None,
+               team_a: str | None = None, team_b: str | None = None, ts: float | None = None) -> HistoryEntry:
+        with self._lock:
+            entry = HistoryEntry(len(self._entries), time.time() if ts is None else ts, key, text,
+                                 table, match_id, team_a, team_b)
+            self._index(entry)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True, name="history-writer")
+                self._writer.start()
+        self._queue.put(json.dumps(entry.to_json(), ensure_ascii=False) + "\n")
+        return entry
+
+    def close(self, timeout: float = 5.0):
+        """Schreibt alle wartenden Einträge und schließt die Datei."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        self._queue.put(_STOP)
+        writer.join(timeout=timeout)
+
+    def _write_loop(self):
+        handle = None
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            lines = [item for item in batch if item is not _STOP]
+            if lines:
+                try:
+                    if handle is None:
+                        self.path.parent.mkdir(parents=True, exist_ok=True)
+                        handle = open(self.path, "a", encoding="utf-8")
+                    handle.write("".join(lines))
+                    handle.flush()
+                except Exception as exc:
+                    self._on_error(f"Konnte History nicht speichern: {exc}")
+                    _close_quietly(handle)
+                    handle = None
+            if len(lines) != len(batch):
+                _close_quietly(handle)
+                return
+
+    def _index(self, entry: HistoryEntry):
+        self._entries.append(entry)
+        # Zeitindex bleibt sortiert, auch wenn die Uhr einmal zurückspringt
+        if self._times and entry.ts < self._times[-1]:
+            entry.ts = self._times[-1]
+        self._times.append(entry.ts)
+        if entry.table:
+            self._by_table.setdefault(normalize_table(entry.table), []).append(entry.seq)
+        if entry.match_id:
+            self._by_match.setdefault(str(entry.match_id), []).append(entry.seq)
+        tokens = name_tokens(entry.team_a, entry.team_b) if (entry.team_a or entry.team_b) \
+            else {token.casefold() for token in _TOKEN_PATTERN.findall(entry.text)}
+        for token in tokens:
+            seqs = self._by_token.get(token)
+            if seqs is None:
+                self._by_token[token] = [entry.seq]
+                bisect.insort(self._tokens, token)
+            else:
+                seqs.append(entry.seq)
+
+    # ---- Abfragen (Ergebnis jeweils neueste zuerst) ----
+    def recent(self, limit: int = 20) -> list[HistoryEntry]:
+        with self._lock:
+            return self._entries[-limit:][::-1] if limit > 0 else []
+
+    def _resolve(self, seqs) -> list[HistoryEntry]:
+        return [self._entries[seq] for seq in sorted(seqs, reverse=True)]
+
+    def by_table(self, table: str) -> list[HistoryEntry]:
+        with self._lock:
+            return self._resolve(self._by_table.get(normalize_table(table), ()))
+
+    def by_match(self, match_id: str) -> list[HistoryEntry]:
+        with self._lock:
+            return self._resolve(self._by_match.get(str(match_id), ()))
+
+    def by_player(self, query: str) -> list[HistoryEntry]:
+        """Alle Durchsagen, in denen jedes Wort der Suche Präfix eines Namensteils ist."""
+        words = [word.casefold() for word in _TOKEN_PATTERN.findall(query or "")]
+        if not words:
+            return []
+        with self._lock:
+            result: set[int] | None = None
+            for word in words:
+                seqs: set[int] = set()
+                pos = bisect.bisect_left(self._tokens, word)
+                while pos < len(self._tokens) and self._tokens[pos].startswith(word):
+                    seqs.update(self._by_token[self._tokens[pos]])
+                    pos += 1
+                result = seqs if result is None else result & seqs
+                if not result:
+                    return []
+            return self._resolve(result)
+
+    def at(self, ts: float) -> HistoryEntry | None:
+        """Durchsage, die ``ts`` zeitlich am nächsten liegt."""
+        with self._lock:
+            if not self._times:
+                return None
+            pos = bisect.bisect_left(self._times, ts)
+            candidates = [idx for idx in (pos - 1, pos) if 0 <= idx < len(self._times)]
+            best = min(candidates, key=lambda idx: abs(self._times[idx] - ts))
+            return self._entries[best]
+
+
+def _close_quietly(handle):
+    if handle is not None:
+        try:
+            handle.close()
+        except OSError:
+            pass
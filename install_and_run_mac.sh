@@ -57,7 +57,7 @@ echo "[3/6] Aktualisiere pip..."
 pip install -U pip --quiet
 
 echo "[4/6] Installiere/aktualisiere Pakete..."
-pip install --upgrade requests piper-tts onnxruntime pyttsx3 pyyaml pathvalidate --quiet
+pip install --upgrade requests piper-tts onnxruntime onnx pyttsx3 pyyaml pathvalidate --quiet
 
 # 4) Sprachmodell herunterladen (nur wenn fehlend oder zu klein)
 echo "[5/6] Prüfe Sprachmodell in '$VOICE_DIR'..."
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latenz-Tracing pro Durchsage.
+
+Jede Ansage bekommt einen Trace mit monotonen Zeitstempeln für die einzelnen
+Stufen (Poll empfangen -> Änderung erkannt -> Text gerendert -> Synthese ->
+Hinweiston -> Sprachausgabe). Abgeschlossene Traces landen als JSON-Zeile in
+``data/<tournament>/latency_traces.jsonl``; ``python latency_trace.py report``
+wertet die Datei aus (p50/p95/p99 pro Stufe).
+
+Geschrieben wird in einem eigenen Thread (``trace-writer``) mit dauerhaft
+offener Datei – ``finish`` läuft im Player-Thread und darf die nächste
+Durchsage nicht auf einen langsamen USB-Stick oder ein Netzlaufwerk warten
+lassen. Ist die Queue voll, wird der Trace verworfen.
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from queue import Queue, Full, Empty
+
+STAGES = (
+    "poll_received",
+    "change_detected",
+    "template_rendered",
+    "synth_queued",
+    "synth_started",
+    "synth_finished",
+    "dequeued",
+    "notify_played",
+    "speech_start",
+    "speech_end",
+)
+TRACE_FILE_NAME = "latency_traces.jsonl"
+MAX_PENDING = 1024
+
+_lock = threading.Lock()
+_active: dict[str, dict] = {}
+_enabled = False
+_trace_file: Path | None = None
+_STOP = object()
+_queue: "Queue[object]" = Queue(maxsize=MAX_PENDING)
+_writer: threading.Thread | None = None
+
+
+def configure(trace_file: Path | None, enabled: bool = True):
+    global _enabled, _trace_file
+    with _lock:
+        _trace_file = Path(trace_file) if trace_file else None
+        _enabled = bool(enabled and trace_file)
+        if not _enabled:
+            _active.clear()
+
+
+def close(timeout: float = 5.0):
+    """Schreibt alle wartenden Traces und schließt die Datei."""
+    global _writer
+    with _lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return
+    try:
+        _queue.put(_STOP, timeout=timeout)
+    except Full:
+        pass
+    writer.join(timeout=timeout)
+
+
+def begin(key: str, **info):
+    """Startet einen Trace (idempotent – ein bestehender Trace bleibt erhalten)."""
+    if not _enabled or not key:
+        return
+    with _lock:
+        if key in _active:
+            return
+        _active[key] = {"stages": {}, "info": dict(info), "started": time.time()}
+
+
+def mark(key: str, stage: str, ts: float | None = None):
+    """Merkt den ersten Zeitpunkt, zu dem ``key`` die Stufe ``stage`` erreicht."""
+    if not _enabled or not key:
+        return
+    stamp = time.monotonic() if ts is None else ts
+    with _lock:
+        trace = _active.get(key)
+        if trace is not None:
+            trace["stages"].setdefault(stage, stamp)
+
+
+def annotate(key: str, **info):
+    if not _enabled or not key:
+        return
+    with _lock:
+        trace = _active.get(key)
+        if trace is not None:
+            trace["info"].update(info)
+
+
+def discard(key: str):
+    """Verwirft einen Trace ohne Eintrag (Durchsage wird nicht gesprochen)."""
+    with _lock:
+        _active.pop(key, None)
+
+
+def finish(key: str, status: str = "ok"):
+    """Schließt den Trace ab und übergibt ihn dem Writer-Thread (blockiert nie)."""
+    if not _enabled or not key:
+        return
+    with _lock:
+        trace = _active.pop(key, None)
+        target = _trace_file
+    if trace is None or target is None:
+        return
+    stages = trace["stages"]
+    if not stages:
+        return
+    origin = min(stages.values())
+    record = {
+        "key": key,
+        "status": status,
+        "wall_time": datetime.fromtimestamp(trace["started"]).isoformat(timespec="seconds"),
+        **trace["info"],
+        "stages_ms": {
+            stage: round((stages[stage] - origin) * 1000.0, 3)
+            for stage in sorted(stages, key=stages.get)
+        },
+    }
+    _start_writer()
+    try:
+        _queue.put_nowait((target, record))
+    except Full:
+        pass  # Ziel zu langsam – ein fehlender Trace ist besser als eine verzögerte Durchsage
+
+
+def _start_writer():
+    global _writer
+    with _lock:
+        if _writer is not None:
+            return
+        _writer = threading.Thread(target=_write_loop, daemon=True, name="trace-writer")
+        _writer.start()
+
+
+def _write_loop():
+    handle = None
+    path: Path | None = None
+    while True:
+        batch = [_queue.get()]
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except Empty:
+                break
+        for item in batch:
+            if item is _STOP:
+                continue
+            target, record = item
+            try:
+                if handle is None or path != target:
+                    _close_quietly(handle)
+                    handle, path = None, target
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    handle = open(target, "a", encoding="utf-8")
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except Exception as exc:
+                _close_quietly(handle)
+                handle = None
+                print(f"[WARN] Konnte Latenz-Trace nicht schreiben: {exc}")
+        if handle is not None:
+            try:
+                handle.flush()
+            except OSError as exc:
+                print(f"[WARN] Konnte Latenz-Trace nicht schreiben: {exc}")
+        if any(item is _STOP for item in batch):
+            _close_quietly(handle)
+            return
+
+
+def _close_quietly(handle):
+    if handle is not None:
+        try:
+            handle.close()
+        except OSError:
+            pass
+
+
+# =========================
+# Auswertung
+# =========================
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def load_traces(path: Path) -> list[dict]:
+    records = []
+    if not path.exists():
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(data, dict) and isinstance(data.get("stages_ms"), dict):
+                records.append(data)
+    return records
+
+
+def summarize(records: list[dict]) -> list[tuple[str, int, float, float, float]]:
+    """Liefert (Stufe, n, p50, p95, p99) in ms – Dauer seit der vorherigen Stufe."""
+    deltas: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    totals: list[float] = []
+    for record in records:
+        stages = record["stages_ms"]
+        previous = None
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            if previous is not None:
+                deltas[stage].append(max(0.0, stages[stage] - previous))
+            previous = stages[stage]
+        if "speech_end" in stages:
+            totals.append(stages["speech_end"])
+    rows = []
+    for stage in STAGES:
+        values = sorted(deltas[stage])
+        if values:
+            rows.append((stage, len(values), _percentile(values, 50), _percentile(values, 95), _percentile(values, 99)))
+    if totals:
+        totals.sort()
+        rows.append(("total", len(totals), _percentile(totals, 50), _percentile(totals, 95), _percentile(totals, 99)))
+    return rows
+
+
+def format_report(rows: list[tuple[str, int, float, float, float]]) -> str:
+    if not rows:
+        return "Keine Latenz-Traces vorhanden."
+    lines = [f"{'Stufe':<18} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"]
+    for stage, count, p50, p95, p99 in rows:
+        lines.append(f"{stage:<18} {count:>6} {p50:>10.1f} {p95:>10.1f} {p99:>10.1f}")
+    return "\n".join(lines)
+
+
+def report(path: Path | None = None) -> str:
+    target = Path(path) if path else _trace_file
+    if target is None:
+        return "Latenz-Tracing ist nicht konfiguriert."
+    return format_report(summarize(load_traces(target)))
+
+
+def _default_trace_file() -> Path:
+    from extract_announcements_from_kickertool import BASE_DIR
+    return BASE_DIR / TRACE_FILE_NAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auswertung der Latenz-Traces (p50/p95/p99 pro Stufe).")
+    parser.add_argument("command", nargs="?", default="report", choices=["report"])
+    parser.add_argument("-f", "--file", help=f"Trace-Datei (Standard: data/<tournament>/{TRACE_FILE_NAME})")
+    args = parser.parse_args()
+    trace_path = Path(args.file) if args.file else _default_trace_file()
+    if not trace_path.exists():
+        print(f"[ERROR] Datei nicht gefunden: {trace_path}")
+        sys.exit(2)
+    print(report(trace_path))
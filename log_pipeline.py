@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Nicht blockierendes Logging für Konsole und Logdatei.
+
+``ui_log`` wird aus der Poll-Schleife, den Player-Threads und den
+Preload-Callbacks aufgerufen. Der Aufrufer legt den Eintrag nur in eine
+begrenzte Queue (``QueueHandler``); ein eigener Thread (``log-writer``)
+schreibt ihn als JSON-Zeile in eine rotierende Logdatei und reicht ihn an das
+Log-Panel der Konsole weiter. Ist die Queue voll, wird verworfen und gezählt –
+Polling und Wiedergabe warten nie auf die Platte oder das Terminal.
+
+Jede Zeile enthält Zeit, Level, Thread, Stufe (``poll``, ``synthesis``,
+``playback`` …; ohne Angabe aus dem Threadnamen abgeleitet), Match-ID und
+Text, z. B.::
+
+    {"time": "2024-05-04T14:05:01.123", "level": "WARN", "thread": "announcement-player",
+     "stage": "playback", "match_id": "m17", "msg": "TTS-Worker-Fehler: ..."}
+"""
+
+import json
+import queue
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, RotatingFileHandler
+from pathlib import Path
+from typing import Callable
+
+import metrics
+
+LOGGER_NAME = "kickertool"
+LOG_DIR_NAME = "logs"
+LOG_FILE_NAME = "kickertool.jsonl"
+
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARN": logging.WARNING,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "FATAL": logging.CRITICAL,
+}
+_LABELS = {logging.WARNING: "WARN", logging.CRITICAL: "FATAL"}
+# Stufe aus dem Threadnamen, falls der Aufrufer keine angibt
+_THREAD_STAGES = (
+    ("MainThread", "poll"),
+    ("announcement-player", "playback"),
+    ("tts-preload", "synthesis"),
+    ("command-listener", "console"),
+    ("dashboard", "dashboard"),
+    ("config-watcher", "config"),
+    ("recall-scheduler", "recall"),
+    ("trace-writer", "trace"),
+    ("history-writer", "history"),
+)
+
+metrics.define_counter("kickertool_log_dropped_total",
+                       "Verworfene Log-Einträge, weil die Log-Queue voll war.")
+
+
+def level_number(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(str(level).strip().upper(), logging.INFO)
+
+
+def level_label(levelno: int) -> str:
+    return _LABELS.get(levelno) or logging.getLevelName(levelno)
+
+
+def _stage_for(record: logging.LogRecord) -> str:
+    stage = getattr(record, "stage", "")
+    if stage:
+        return stage
+    name = record.threadName or ""
+    return next((stage for prefix, stage in _THREAD_STAGES if name.startswith(prefix)), "")
+
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": level_label(record.levelno),
+            "thread": record.threadName,
+            "stage": _stage_for(record),
+            "match_id": getattr(record, "match_id", "") or None,
+            "msg": record.getMessage(),
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+
+class PanelHandler(logging.Handler):
+    """Reicht ``[LEVEL] Text`` an das Log-Panel (bzw. stdout ohne Live-UI) weiter."""
+
+    def __init__(self, sink: Callable[[str], None], level: int = logging.INFO):
+        super().__init__(level)
+        self._sink = sink
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._sink(f"[{level_label(record.levelno)}] {record.getMessage()}")
+        except Exception:
+            self.handleError(record)
+
+
+class _PipelineQueueHandler(QueueHandler):
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline._queue)
+        self._pipeline = pipeline
+
+    def enqueue(self, record: logging.LogRecord):
+        if not self._pipeline.running:
+            # vor start() bzw. nach stop(): direkt ausgeben, es gibt keinen Writer-Thread
+            self._pipeline._dispatch(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._pipeline.dropped += 1
+            metrics.inc("kickertool_log_dropped_total")
+
+
+class LogPipeline:
+    def __init__(self, console_sink: Callable[[str], None], name: str = LOGGER_NAME, max_queue: int = 10000):
+        self._queue: "queue.Queue[logging.LogRecord | None]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._handlers: list[logging.Handler] = [PanelHandler(console_sink)]
+        self._thread: threading.Thread | None = None
+        self.running = False
+        self.dropped = 0
+        self.file_path: Path | None = None
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.handlers[:] = [_PipelineQueueHandler(self)]
+
+    def add_file(self, path: Path, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5,
+                 level: str | int = "INFO"):
+        """Rotierende JSON-Logdatei (``kickertool.jsonl``, ``.1`` … ``.<backup_count>``)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max(0, int(max_bytes)), backupCount=max(0, int(backup_count)),
+                                      encoding="utf-8", delay=True)
+        handler.setLevel(level_number(level))
+        handler.setFormatter(JsonLineFormatter())
+        self._handlers.append(handler)
+        self.file_path = path
+
+    def log(self, level: str | int, message: str, *, stage: str = "", match_id: str | None = None):
+        self.logger.log(level_number(level), message, extra={"stage": stage, "match_id": match_id or ""})
+
+    def start(self):
+        if self._thread is None:
+            self.running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name="log-writer")
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Schreibt die Queue leer; danach wird wieder direkt ausgegeben."""
+        if self._thread is None:
+            return
+        self.running = False
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        for handler in self._handlers:
+            handler.flush()
+
+    def _dispatch(self, record: logging.LogRecord):
+        for handler in self._handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            self._dispatch(record)
+        # was nach dem Stopp-Signal noch angekommen ist
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if record is not None:
+                self._dispatch(record)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leichtgewichtige Prometheus-Metriken ohne externe Abhängigkeiten.
+
+Die Hot-Paths (Polling, Wiedergabe, Preload) erhöhen nur Zähler bzw. tragen
+Messwerte in feste Buckets ein – beides O(1) unter einem kurzen Lock. Gauges
+wie Queue-Tiefe oder RSS werden erst beim Abruf von ``/metrics`` im
+Server-Thread berechnet.
+"""
+
+import os
+import sys
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_definitions: dict[str, tuple[str, str]] = {}          # name -> (type, help)
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], list] = {}        # -> [bucket_counts, sum, count]
+_histogram_buckets: dict[str, tuple[float, ...]] = {}
+_gauge_callbacks: dict[str, Callable[[], float | None]] = {}
+_server: ThreadingHTTPServer | None = None
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def define_counter(name: str, help_text: str):
+    _definitions[name] = ("counter", help_text)
+
+
+def define_histogram(name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+    _definitions[name] = ("histogram", help_text)
+    _histogram_buckets[name] = tuple(sorted(buckets))
+
+
+def define_gauge(name: str, help_text: str, callback: Callable[[], float | None]):
+    _definitions[name] = ("gauge", help_text)
+    _gauge_callbacks[name] = callback
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, **labels):
+    buckets = _histogram_buckets.get(name, DEFAULT_BUCKETS)
+    key = (name, _label_key(labels))
+    idx = bisect.bisect_left(buckets, value)
+    with _lock:
+        data = _histograms.get(key)
+        if data is None:
+            data = _histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+        data[0][idx] += 1
+        data[1] += value
+        data[2] += 1
+
+
+def drain() -> tuple[dict, dict]:
+    """Zähler und Histogramme seit dem letzten Aufruf (Kindprozesse schicken sie an den Hauptprozess)."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: [list(data[0]), data[1], data[2]] for key, data in _histograms.items()}
+        _counters.clear()
+        _histograms.clear()
+    return counters, histograms
+
+
+def merge(counters: dict, histograms: dict):
+    """Übernimmt mit ``drain()`` eingesammelte Werte eines anderen Prozesses."""
+    with _lock:
+        for key, value in counters.items():
+            _counters[key] = _counters.get(key, 0.0) + value
+        for key, (bucket_counts, total, count) in histograms.items():
+            data = _histograms.get(key)
+            if data is None:
+                _histograms[key] = [list(bucket_counts), total, count]
+            elif len(data[0]) == len(bucket_counts):
+                data[0] = [a + b for a, b in zip(data[0], bucket_counts)]
+                data[1] += total
+                data[2] += count
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render() -> str:
+    """Erzeugt das Prometheus-Textformat (Version 0.0.4)."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: [list(data[0]), data[1], data[2]] for key, data in _histograms.items()}
+    lines = []
+    for name, (kind, help_text) in sorted(_definitions.items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        elif kind == "gauge":
+            try:
+                value = _gauge_callbacks[name]()
+            except Exception:
+                value = None
+            if value is not None:
+                lines.append(f"{name} {_format_value(value)}")
+        elif kind == "histogram":
+            buckets = _histogram_buckets[name]
+            for (metric, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes() -> float | None:
+    """Aktueller Resident Set Size des Prozesses (psutil, /proc oder WinAPI)."""
+    try:
+        import psutil  # type: ignore
+        return float(psutil.Process().memory_info().rss)
+    except Exception:
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as f:
+                pages = int(f.read().split()[1])
+            return float(pages * os.sysconf("SC_PAGE_SIZE"))
+        except Exception:
+            return None
+    if os.name == "nt":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(_Counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return float(counters.WorkingSetSize)
+        except Exception:
+            return None
+        return None
+    try:
+        import resource
+        # macOS liefert ru_maxrss in Bytes (Spitzenwert, nicht aktueller Wert)
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """Startet den Metrik-Endpunkt in einem Daemon-Thread (idempotent)."""
+    global _server
+    if _server is not None:
+        return _server
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    _server = server
+    return server
+
+
+def stop_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+
+
+# ==== Standard-Metriken ====
+define_histogram("kickertool_poll_duration_seconds", "Dauer eines Court-Abrufs (fetch_courts).")
+define_counter("kickertool_polls_total", "Anzahl der Court-Abrufe.")
+define_counter("kickertool_poll_errors_total", "Fehlgeschlagene Court-Abrufe nach Ursache.")
+define_counter("kickertool_preload_total", "Vorbereitete TTS-Jobs bei der Wiedergabe (hit/pending/miss).")
+define_histogram("kickertool_synthesis_duration_seconds", "Dauer der Sprachsynthese pro Provider.")
+define_histogram("kickertool_playback_duration_seconds", "Dauer der Audiowiedergabe pro Provider.")
+define_counter("kickertool_audio_cache_total", "Audio-Cache-Treffer/-Fehlschläge bei der Piper-Synthese.")
+define_counter("kickertool_notify_sound_total", "Hinweiston abgespielt/übersprungen/fehlgeschlagen.")
+define_gauge("kickertool_process_resident_memory_bytes", "Resident Set Size des Prozesses.", process_rss_bytes)
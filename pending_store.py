@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Persistente Warteschlange der noch nicht gesprochenen Durchsagen.
+
+``seen_matches.json`` markiert ein Match schon beim Einreihen als angesagt.
+Stirbt der Prozess, bevor die Durchsage lief, wäre sie verloren. Deshalb
+wird die Warteschlange (Text, Match-Infos, Pfad zur bereits synthetisierten
+WAV) bei jeder Änderung als ``pending_announcements.json`` gesichert –
+atomar und in einem Hintergrund-Thread, der schnelle Änderungsfolgen zu
+einem Schreibvorgang zusammenfasst.
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+
+from state_store import atomic_write_text
+
+PENDING_FILE_NAME = "pending_announcements.json"
+FORMAT_VERSION = 1
+
+
+class PendingQueueStore:
+    def __init__(self, path: Path, flush_interval: float = 0.2):
+        self.path = Path(path)
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._snapshot: list[dict] | None = None  # noch nicht geschrieben
+        self._written: list[dict] | None = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_error: Exception | None = None
+
+    def load(self) -> list[dict]:
+        """Gesicherte Einträge in Abspielreihenfolge (leer, wenn nichts offen war)."""
+        if not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            print(f"[WARN] Gesicherte Warteschlange unlesbar: {exc}")
+            return []
+        entries = data.get("entries") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return []
+        result = [entry for entry in entries if isinstance(entry, dict) and entry.get("key") and entry.get("text")]
+        with self._lock:
+            self._written = result
+        return result
+
+    def save(self, entries: list[dict]):
+        """Übernimmt den aktuellen Stand der Warteschlange (nicht blockierend)."""
+        with self._lock:
+            if entries == self._written and self._snapshot is None:
+                return
+            self._snapshot = list(entries)
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                entries = self._snapshot
+                self._snapshot = None
+            if entries is None:
+                return
+            try:
+                atomic_write_text(self.path, json.dumps(
+                    {"version": FORMAT_VERSION, "saved": round(time.time(), 3), "entries": entries},
+                    ensure_ascii=False,
+                ))
+            except Exception as exc:
+                self.last_error = exc
+                with self._lock:
+                    if self._snapshot is None:
+                        self._snapshot = entries
+                print(f"[WARN] Konnte Warteschlange nicht sichern: {exc}")
+                return
+            with self._lock:
+                self._written = entries
+
+    def close(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="pending-writer")
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self._stopped.wait(self.flush_interval)
+            self.flush()
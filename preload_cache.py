@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Begrenzter Speicher für vorbereitete TTS-Jobs.
+
+Vorab synthetisierte Durchsagen liegen bis zur Wiedergabe hier. Damit ein
+langer Turniertag den Speicher und das Temp-Verzeichnis nicht volllaufen
+lässt, gilt:
+
+- Budget: höchstens ``max_items`` Einträge bzw. ``max_bytes`` WAV-Daten;
+  darüber fliegen zuerst Einträge, die keine wartende Durchsage mehr haben,
+  dann die ältesten.
+- TTL: nicht mehr benötigte Einträge werden nach ``ttl`` Sekunden verworfen
+  (gezählt als Leck – sie hätten abgeholt werden müssen).
+- Abbruch: beim Verwerfen wird eine laufende Synthese wirklich beendet
+  (Piper-Prozess wird gekillt), nicht nur das Ergebnis ignoriert.
+- Aufräumen: ein Sweeper löscht verwaiste Temp-Audios (Absturz, halb
+  fertige Synthese), die älter als ``orphan_min_age`` sind und von nichts
+  mehr referenziert werden.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Callable
+
+import metrics
+from text_to_speech import CancelToken
+
+metrics.define_counter("kickertool_preload_evictions_total",
+                       "Verworfene vorbereitete TTS-Jobs nach Grund (budget/ttl/reload).")
+metrics.define_counter("kickertool_preload_leaks_total",
+                       "Aufgeräumte Lecks: nie abgeholte Jobs (unclaimed) und verwaiste Temp-Audios (orphan_file).")
+
+
+class _Entry:
+    __slots__ = ("key", "future", "token", "created", "size")
+
+    def __init__(self, key: str, future: Future, token: CancelToken | None):
+        self.key = key
+        self.future = future
+        self.token = token
+        self.created = time.monotonic()
+        self.size = 0
+
+
+class PreloadCache:
+    def __init__(self, prepare: Callable[[str, str, CancelToken, str], object], release: Callable[[object], None],
+                 max_items: int = 32, max_bytes: int = 200 * 1024 * 1024, ttl: float = 900.0,
+                 sweep_interval: float = 60.0, orphan_min_age: float = 3600.0,
+                 pinned: Callable[[str], bool] | None = None,
+                 orphan_locations: Callable[[], list[tuple[Path, str]]] | None = None,
+                 referenced: Callable[[], set[str]] | None = None):
+        self._prepare = prepare
+        self._release = release
+        self.max_items = max(1, int(max_items))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = float(ttl)
+        self.sweep_interval = max(1.0, float(sweep_interval))
+        self.orphan_min_age = float(orphan_min_age)
+        self._pinned = pinned or (lambda key: False)
+        self._orphan_locations = orphan_locations or (lambda: [])
+        self._referenced = referenced or (lambda: set())
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._bytes = 0
+        self._executor: Executor | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.evictions = 0
+        self.leaks = 0
+        metrics.define_gauge("kickertool_preload_entries", "Vorbereitete TTS-Jobs im Speicher.", self.__len__)
+        metrics.define_gauge("kickertool_preload_bytes", "WAV-Daten vorbereiteter TTS-Jobs.", lambda: self._bytes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self, executor: Executor):
+        self._executor = executor
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="preload-sweeper")
+            self._thread.start()
+
+    def close(self):
+        """Bricht laufende Synthesen ab; fertige Audios bleiben (gesicherte Warteschlange)."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            if not entry.future.done():
+                entry.future.cancel()
+                if entry.token is not None:
+                    entry.token.cancel()
+
+    # ---- Zugriff ----
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not entry.future.done()
+
+    def submit(self, key: str, cache_key: str, text: str, voice: str = "") -> Future | None:
+        """Startet die Synthese im Hintergrund. ``None``, wenn sie schon läuft oder kein Executor da ist."""
+        if self._executor is None:
+            return None
+        token = CancelToken()
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and not previous.future.done():
+                return None
+            future = self._executor.submit(self._prepare, cache_key, text, token, voice)
+            entry = _Entry(key, future, token)
+            self._entries[key] = entry
+            if previous is not None:
+                self._bytes -= previous.size
+        if previous is not None:
+            self._dispose(previous)
+        future.add_done_callback(lambda done: self._on_done(entry))
+        self._enforce_budget()
+        return future
+
+    def put_ready(self, key: str, job):
+        """Legt einen bereits fertigen Job ab (z. B. aus der gesicherten Warteschlange)."""
+        future: Future = Future()
+        future.set_result(job)
+        entry = _Entry(key, future, None)
+        entry.size = self._job_size(job)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            self._entries[key] = entry
+            self._bytes += entry.size - (previous.size if previous else 0)
+        if previous is not None:
+            self._dispose(previous)
+        self._enforce_budget()
+
+    def take(self, key: str) -> Future | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry.size
+        return entry.future
+
+    def discard(self, key: str, reason: str = "cancelled") -> bool:
+        """Verwirft einen einzelnen Eintrag (laufende Synthese wird abgebrochen)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry.size
+        self._evict(entry, reason)
+        return True
+
+    def clear(self, reason: str = "reload") -> int:
+        """Verwirft alle Einträge (laufende Synthesen werden abgebrochen)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._bytes = 0
+        for entry in entries:
+            self._evict(entry, reason)
+        return len(entries)
+
+    # ---- Budget / TTL ----
+    @staticmethod
+    def _job_size(job) -> int:
+        nbytes = getattr(job, "nbytes", None)
+        if nbytes is not None:
+            return int(nbytes)
+        path = getattr(job, "wav_path", None)
+        if not path:
+            return 0
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _on_done(self, entry: _Entry):
+        if entry.future.cancelled() or entry.future.exception() is not None:
+            return
+        size = self._job_size(entry.future.result())
+        with self._lock:
+            if self._entries.get(entry.key) is not entry:
+                return
+            entry.size = size
+            self._bytes += size
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        victims = []
+        with self._lock:
+            if len(self._entries) <= self.max_items and (not self.max_bytes or self._bytes <= self.max_bytes):
+                return
+            # zuerst Einträge ohne wartende Durchsage, jeweils die ältesten
+            order = sorted(self._entries.values(), key=lambda e: (self._pinned(e.key), e.created))
+            for entry in order:
+                if len(self._entries) <= self.max_items and (not self.max_bytes or self._bytes <= self.max_bytes):
+                    break
+                del self._entries[entry.key]
+                self._bytes -= entry.size
+                victims.append(entry)
+        for entry in victims:
+            self._evict(entry, "budget")
+
+    def _evict(self, entry: _Entry, reason: str):
+        self.evictions += 1
+        metrics.inc("kickertool_preload_evictions_total", reason=reason)
+        self._dispose(entry)
+
+    def _dispose(self, entry: _Entry):
+        if not entry.future.done():
+            entry.future.cancel()
+            if entry.token is not None:
+                entry.token.cancel()
+        # auch eine Synthese, die trotz Abbruch noch fertig wird, gibt ihr Audio frei
+        entry.future.add_done_callback(self._release_result)
+
+    def _release_result(self, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            self._release(future.result())
+        except Exception as exc:
+            print(f"[WARN] Vorbereitetes Audio konnte nicht freigegeben werden: {exc}")
+
+    # ---- Sweeper ----
+    def _run(self):
+        while not self._stopped.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as exc:
+                print(f"[WARN] Preload-Sweeper: {exc}")
+
+    def sweep(self) -> tuple[int, int]:
+        """Verwirft abgelaufene, nicht mehr benötigte Einträge und löscht verwaiste Temp-Audios."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if now - entry.created >= self.ttl and not self._pinned(entry.key):
+                    del self._entries[entry.key]
+                    self._bytes -= entry.size
+                    expired.append(entry)
+        for entry in expired:
+            self.leaks += 1
+            metrics.inc("kickertool_preload_leaks_total", kind="unclaimed")
+            self._evict(entry, "ttl")
+        return len(expired), self._sweep_orphans()
+
+    def _sweep_orphans(self) -> int:
+        keep = set(self._referenced())
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.future.done() and not entry.future.cancelled() and entry.future.exception() is None:
+                    path = getattr(entry.future.result(), "wav_path", None)
+                    if path:
+                        keep.add(path)
+        keep = {os.path.abspath(path) for path in keep}
+        cutoff = time.time() - self.orphan_min_age
+        deleted = 0
+        for directory, pattern in self._orphan_locations():
+            for path in Path(directory).glob(pattern):
+                try:
+                    if os.path.abspath(path) in keep or path.stat().st_mtime > cutoff:
+                        continue
+                    path.unlink()
+                except OSError:
+                    continue
+                deleted += 1
+                self.leaks += 1
+                metrics.inc("kickertool_preload_leaks_total", kind="orphan_file")
+        return deleted
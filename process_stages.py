@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+Optionaler Mehrprozess-Betrieb (``runtime.mode: processes``).
+
+Abruf der Tische, Synthese und Wiedergabe laufen in eigenen Prozessen; der
+Hauptprozess behält Diff, Warteschlangen, UI und Dateien. Eine träge
+Neuzeichnung oder JSON-Verarbeitung im Hauptprozess verzögert so nicht mehr
+den Start einer Durchsage, und die Synthese konkurriert nicht um den GIL des
+Players.
+
+- Jede Stufe ist ein Prozess mit eigener Auftrags-Queue, alle melden über
+  eine gemeinsame Ergebnis-Queue zurück (inkl. ihrer Metriken, siehe
+  ``metrics.drain``). Synthese (``synth-1`` …) und Wiedergabe (``player-1`` …,
+  einer pro Zone) gibt es mehrfach; ein Auftrag geht an die Stufe mit den
+  wenigsten offenen Aufträgen. So spielen Zonen parallel, und mehrere
+  Vorab-Synthesen laufen gleichzeitig.
+- Audio geht als Pfad der WAV von der Synthese zum Player – Piper schreibt sie
+  ohnehin (Temp-Datei oder Audio-Cache), der Player liest sie direkt. Temp-WAVs
+  löscht der Player nach dem Abspielen.
+- Der ``StageSupervisor`` wartet auf das Ende der Prozesse (Sentinels, kein
+  Polling). Stirbt eine Stufe, wird sie neu gestartet und alle noch offenen
+  Aufträge werden erneut geschickt. Ein Auftrag, bei dem die Stufe
+  ``max_attempts``-mal abstürzt, schlägt fehl, statt sie endlos neu zu starten.
+"""
+
+import time
+import signal
+import itertools
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable
+
+import metrics
+from court_snapshot import UNCHANGED
+
+POLL_STAGE = "poll"
+SYNTH_STAGE = "synth"
+PLAYER_STAGE = "player"
+RESTART_BACKOFF = 1.0  # Sekunden Pause, wenn eine Stufe direkt nach dem Start wieder stirbt
+
+metrics.define_counter("kickertool_stage_restarts_total",
+                       "Neustarts abgestürzter Prozess-Stufen (Mehrprozess-Betrieb).")
+
+
+class StageError(RuntimeError):
+    pass
+
+
+# ==== Kindprozesse ====
+def _poll_handler(options: dict) -> Callable:
+    import extract_announcements_from_kickertool as kt
+    token = [kt.api_token]
+    last = [None]
+
+    def handle(request: tuple[str, bool]):
+        api_token, has_last = request
+        if api_token and api_token != token[0]:
+            kt.set_api_token(api_token)
+            token[0] = api_token
+        courts = kt.fetch_court_infos()
+        if has_last and courts is not None and courts is last[0]:
+            return UNCHANGED  # nicht jedes Mal den ganzen Snapshot übertragen
+        last[0] = courts
+        return courts
+
+    return handle
+
+
+def _synth_handler(options: dict) -> Callable:
+    import text_to_speech as tts
+    if options.get("audio_cache_dir"):
+        tts.set_audio_cache_dir(options["audio_cache_dir"])
+
+    def handle(request: tuple[str, str]) -> dict:
+        text, voice = request
+        job = tts.prepare_tts_playback(text, voice=voice)
+        wav_path = getattr(job, "wav_path", None)
+        if not wav_path:
+            raise StageError("Synthese lieferte keine WAV")
+        return {"wav_path": wav_path}
+
+    return handle
+
+
+def _player_handler(options: dict) -> Callable:
+    import text_to_speech as tts
+    if options.get("audio_cache_dir"):
+        tts.set_audio_cache_dir(options["audio_cache_dir"])  # Cache-WAVs nach dem Abspielen behalten
+
+    def handle(request: dict) -> bool:
+        # Temp-WAVs löscht der Job erst nach dem Abspielen: stirbt der Player mittendrin, spielt der Neustart sie erneut
+        job = tts.prepared_audio_job(request.get("path"))
+        if job is None:
+            raise StageError(f"Audio fehlt: {request.get('path')}")
+        job(device=request.get("device", ""), player=request.get("player", ""))
+        return True
+
+    return handle
+
+
+_HANDLERS = {POLL_STAGE: _poll_handler, SYNTH_STAGE: _synth_handler, PLAYER_STAGE: _player_handler}
+
+
+def _stage_main(name: str, requests, results, options: dict):
+    # STRG+C gilt dem Hauptprozess; die Stufen beendet stop() geordnet
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if options.get("nice"):
+        from resource_governor import set_process_priority
+        set_process_priority(None, options["nice"])  # vor dem Laden der Stimme: alle Threads erben den Wert
+    handle = _HANDLERS[options.get("kind", name)](options)
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+        req_id, payload = message
+        results.put((name, req_id, "started", None, None))
+        try:
+            value, kind = handle(payload), "ok"
+        except Exception as exc:
+            value, kind = f"{type(exc).__name__}: {exc}", "error"
+        results.put((name, req_id, kind, value, metrics.drain()))
+
+
+# ==== Supervisor ====
+class _Stage:
+    def __init__(self, name: str, options: dict):
+        self.name = name
+        self.options = options
+        self.process = None
+        self.requests = None
+        self.in_flight: dict[int, tuple[object, Future]] = {}  # Einfügereihenfolge = Auftragsreihenfolge
+        self.attempts: dict[int, int] = {}
+        self.current: int | None = None
+        self.started_at = 0.0
+
+
+class StageSupervisor:
+    def __init__(self, stages: dict[str, dict], on_warning: Callable[[str], None] | None = None,
+                 on_orphan: Callable[[str, object], None] | None = None, max_attempts: int = 3):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stages = {name: _Stage(name, dict(options)) for name, options in stages.items()}
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._wake_reader, self._wake_writer = self._ctx.Pipe(duplex=False)
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._on_warning = on_warning or (lambda message: print(f"[WARN] {message}"))
+        self._on_orphan = on_orphan or (lambda stage, value: None)
+        self.max_attempts = max(1, int(max_attempts))
+
+    def start(self):
+        with self._lock:
+            for stage in self._stages.values():
+                self._spawn(stage)
+        for target, name in ((self._read_results, "stage-results"), (self._watch, "stage-supervisor")):
+            thread = threading.Thread(target=target, daemon=True, name=name)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, stage_name: str, payload) -> Future:
+        return self.submit_least_busy((stage_name,), payload)
+
+    def submit_least_busy(self, stage_names: tuple[str, ...], payload) -> Future:
+        """Auftrag an die Stufe mit den wenigsten offenen Aufträgen; ``future.stage`` nennt sie."""
+        future: Future = Future()
+        with self._lock:
+            stage = min((self._stages[name] for name in stage_names), key=lambda s: len(s.in_flight))
+            future.stage = stage.name
+            if self._stopped.is_set():
+                future.set_exception(StageError("Prozess-Stufen sind beendet"))
+                return future
+            req_id = next(self._ids)
+            future.req_id = req_id
+            stage.in_flight[req_id] = (payload, future)
+            stage.requests.put((req_id, payload))
+        return future
+
+    def abandon(self, stage_name: str, future: Future):
+        """Ergebnis wird nicht mehr gebraucht; kommt es doch, geht es an ``on_orphan``."""
+        with self._lock:
+            self._stages[stage_name].in_flight.pop(getattr(future, "req_id", None), None)
+        future.cancel()
+
+    def restart(self, stage_name: str):
+        """Startet eine Stufe neu (z. B. geänderte Stimme); offene Aufträge gehen an den neuen Prozess."""
+        stage = self._stages[stage_name]
+        with self._lock:
+            old_process, old_requests = stage.process, stage.requests
+            old_requests.put(None)
+            self._spawn(stage)
+        self._wake()
+        threading.Thread(target=old_process.join, args=(10.0,), daemon=True).start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._stopped.is_set():
+            return
+        with self._lock:
+            self._stopped.set()
+            for stage in self._stages.values():
+                stage.requests.put(None)
+        self._wake()
+        deadline = time.monotonic() + timeout
+        for stage in self._stages.values():
+            stage.process.join(timeout=max(0.1, deadline - time.monotonic()))
+            if stage.process.is_alive():
+                stage.process.terminate()
+                stage.process.join(timeout=1.0)
+        self._results.put(None)
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        with self._lock:
+            pending = [future for stage in self._stages.values() for _, future in stage.in_flight.values()]
+            for stage in self._stages.values():
+                stage.in_flight.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(StageError("Prozess-Stufen wurden beendet"))
+
+    # ---- intern ----
+    def _spawn(self, stage: _Stage):
+        """Neuer Prozess mit frischer Queue; offene Aufträge in alter Reihenfolge erneut senden (unter ``_lock``)."""
+        stage.requests = self._ctx.Queue()
+        stage.process = self._ctx.Process(target=_stage_main, name=f"kickertool-{stage.name}",
+                                          args=(stage.name, stage.requests, self._results, stage.options),
+                                          daemon=True)
+        stage.process.start()
+        stage.started_at = time.monotonic()
+        stage.current = None
+        for req_id, (payload, _) in stage.in_flight.items():
+            stage.requests.put((req_id, payload))
+
+    def _wake(self):
+        try:
+            self._wake_writer.send_bytes(b"x")
+        except OSError:
+            pass
+
+    def _read_results(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            stage_name, req_id, kind, value, stage_metrics = item
+            if stage_metrics:
+                metrics.merge(*stage_metrics)
+            stage = self._stages[stage_name]
+            with self._lock:
+                if kind == "started":
+                    stage.current = req_id
+                    continue
+                entry = stage.in_flight.pop(req_id, None)
+                stage.attempts.pop(req_id, None)
+                if stage.current == req_id:
+                    stage.current = None
+            if entry is None:
+                # abgebrochen oder doppelt (nach Neustart erneut gesendet)
+                if kind == "ok":
+                    self._on_orphan(stage_name, value)
+                continue
+            future = entry[1]
+            if future.done():
+                continue
+            if kind == "ok":
+                future.set_result(value)
+            else:
+                future.set_exception(StageError(value))
+
+    def _watch(self):
+        while not self._stopped.is_set():
+            with self._lock:
+                sentinels = {stage.process.sentinel: stage for stage in self._stages.values()}
+            ready = wait(list(sentinels) + [self._wake_reader])
+            if self._stopped.is_set():
+                return
+            for handle in ready:
+                if handle is self._wake_reader:
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+                    continue
+                stage = sentinels[handle]
+                with self._lock:
+                    current_sentinel = stage.process.sentinel
+                if current_sentinel == handle:
+                    self._recover(stage)
+
+    def _recover(self, stage: _Stage):
+        stage.process.join(timeout=1.0)
+        exitcode = stage.process.exitcode
+        failed: list[Future] = []
+        with self._lock:
+            culprit = stage.current
+            if culprit is not None and culprit in stage.in_flight:
+                stage.attempts[culprit] = stage.attempts.get(culprit, 0) + 1
+                if stage.attempts[culprit] >= self.max_attempts:
+                    failed.append(stage.in_flight.pop(culprit)[1])
+                    stage.attempts.pop(culprit, None)
+            open_jobs = len(stage.in_flight)
+        metrics.inc("kickertool_stage_restarts_total", stage=stage.name)
+        self._on_warning(f"Prozess '{stage.name}' beendet (Exit-Code {exitcode}) – starte neu, "
+                         f"{open_jobs} offene Aufträge werden erneut gesendet.")
+        for future in failed:
+            if not future.done():
+                future.set_exception(StageError(f"Stufe '{stage.name}' stürzt bei diesem Auftrag wiederholt ab"))
+        if time.monotonic() - stage.started_at < RESTART_BACKOFF and self._stopped.wait(RESTART_BACKOFF):
+            return
+        with self._lock:
+            if not self._stopped.is_set():
+                self._spawn(stage)
+
+
+# ==== Schnittstelle für announcement_tts ====
+class StageAudioJob:
+    """Wiedergabe-Job wie aus ``prepare_tts_playback``; gespielt wird in einem Player-Prozess."""
+
+    def __init__(self, pipeline: "ProcessPipeline", wav_path: str):
+        self._pipeline = pipeline
+        self._lock = threading.Lock()
+        self._claimed = False
+        self.wav_path = wav_path
+
+    def _claim(self) -> str | None:
+        """Audio genau einmal übergeben: an den Player oder zum Freigeben."""
+        with self._lock:
+            if self._claimed:
+                return None
+            self._claimed = True
+        return self.wav_path
+
+    def __call__(self, device: str = "", player: str = ""):
+        from text_to_speech import tts_muted
+        if tts_muted():
+            self.release()
+            return
+        path = self._claim()
+        if path is None:
+            return
+        future = self._pipeline.supervisor.submit_least_busy(self._pipeline.player_stages, {
+            "path": path, "device": device, "player": player,
+        })
+        try:
+            future.result()
+        except StageError as exc:
+            self._pipeline.warn(f"Wiedergabe fehlgeschlagen: {exc}")
+
+    def release(self):
+        from text_to_speech import release_audio
+        release_audio(self._claim())
+
+
+class ProcessPipeline:
+    def __init__(self, audio_cache_dir: Path | None = None, on_warning: Callable[[str], None] | None = None,
+                 synthesis_nice: int = 0, synthesis_processes: int = 1, players: int = 1):
+        self.warn = on_warning or (lambda message: print(f"[WARN] {message}"))
+        self._last_courts = None
+        # ein Player pro Zone: jede Zone spielt höchstens eine Durchsage gleichzeitig, also ist immer einer frei
+        self.synth_stages = tuple(f"{SYNTH_STAGE}-{idx + 1}" for idx in range(max(1, int(synthesis_processes))))
+        self.player_stages = tuple(f"{PLAYER_STAGE}-{idx + 1}" for idx in range(max(1, int(players))))
+        cache_dir = str(audio_cache_dir) if audio_cache_dir else ""
+        stages = {POLL_STAGE: {}}
+        stages.update((name, {"kind": SYNTH_STAGE, "nice": synthesis_nice, "audio_cache_dir": cache_dir})
+                      for name in self.synth_stages)
+        stages.update((name, {"kind": PLAYER_STAGE, "audio_cache_dir": cache_dir}) for name in self.player_stages)
+        self.supervisor = StageSupervisor(stages, on_warning=self.warn, on_orphan=self._on_orphan)
+
+    def start(self):
+        self.supervisor.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.supervisor.stop(timeout)
+
+    def poll(self, api_token: str, timeout: float = 60.0) -> tuple | None:
+        """Tische als ``CourtInfo``-Snapshot wie ``fetch_court_infos``; ``None`` bei Fehlern."""
+        future = self.supervisor.submit(POLL_STAGE, (api_token, self._last_courts is not None))
+        try:
+            courts = future.result(timeout=timeout)
+        except Exception as exc:
+            self.supervisor.abandon(POLL_STAGE, future)
+            self._last_courts = None  # beim nächsten Mal wieder vollständig schicken lassen
+            self.warn(f"Abruf der Tische fehlgeschlagen: {exc}")
+            return None
+        if courts == UNCHANGED:
+            return self._last_courts
+        self._last_courts = courts
+        return courts
+
+    def prepare(self, text: str, cancel=None, voice: str = "") -> StageAudioJob:
+        """Synthese im Synthese-Prozess; ``cancel`` (``CancelToken``) gibt das Ergebnis sofort auf."""
+        from text_to_speech import SynthesisCancelled
+        future = self.supervisor.submit_least_busy(self.synth_stages, (text, voice))
+        if cancel is not None:
+            cancel.add_callback(lambda: self.supervisor.abandon(future.stage, future))
+        try:
+            result = future.result()
+        except Exception:
+            if future.cancelled():
+                raise SynthesisCancelled() from None
+            raise
+        return StageAudioJob(self, result["wav_path"])
+
+    def file_job(self, wav_path: str | None) -> StageAudioJob | None:
+        """Job für eine vorhandene WAV (z. B. aus der gesicherten Warteschlange)."""
+        if not wav_path or not Path(wav_path).is_file():
+            return None
+        return StageAudioJob(self, wav_path)
+
+    def restart_synthesis(self):
+        for name in self.synth_stages:
+            self.supervisor.restart(name)
+
+    def _on_orphan(self, stage: str, value):
+        if stage in self.synth_stages and isinstance(value, dict):
+            from text_to_speech import release_audio
+            release_audio(value.get("wav_path"))
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiling im laufenden Betrieb.
+
+``SamplingProfiler`` tastet in einem eigenen Daemon-Thread die Stacks aller
+Threads ab (``sys._current_frames``) – anders als cProfile erfasst er damit
+auch Poll-Schleife, Wiedergabe-Worker und Preload-Threads, ohne sie
+anzuhalten. ``take_memory_snapshot`` schreibt tracemalloc-Auswertungen
+(Top-Allokationen und Differenz zum vorherigen Snapshot).
+"""
+
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+TRACEMALLOC_FRAMES = 1
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = max(0.001, float(interval))
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: float | None = None
+        self._stopped_at: float | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stacks.clear()
+        self._samples = 0
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="sampling-profiler")
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+        self._stopped_at = time.monotonic()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        thread_names: dict[int, str] = {}
+        names_refreshed = 0.0
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            if now - names_refreshed > 1.0:
+                thread_names = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+                names_refreshed = now
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                depth = 0
+                while frame is not None and depth < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                    depth += 1
+                stack.reverse()
+                self._stacks[(thread_names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+            self._samples += 1
+
+    def status(self) -> str:
+        if self._started_at is None:
+            return "Profiler nicht gestartet."
+        end = time.monotonic() if self.running else (self._stopped_at or time.monotonic())
+        state = "läuft" if self.running else "gestoppt"
+        return f"Profiler {state}: {self._samples} Samples in {end - self._started_at:.1f}s."
+
+    def report(self, top: int = 30) -> str:
+        inclusive: Counter = Counter()
+        own: Counter = Counter()
+        per_thread: Counter = Counter()
+        for (thread_name, stack), count in self._stacks.items():
+            per_thread[thread_name] += count
+            if stack:
+                own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        total = sum(self._stacks.values()) or 1
+        lines = [self.status(), "", "Samples pro Thread:"]
+        for name, count in per_thread.most_common():
+            lines.append(f"  {count:>8}  {count * 100.0 / total:5.1f}%  {name}")
+        lines += ["", f"Top {top} Funktionen (eigene Zeit):"]
+        for label, count in own.most_common(top):
+            lines.append(f"  {count:>8}  {count * 100.0 / total:5.1f}%  {label}")
+        lines += ["", f"Top {top} Funktionen (inklusive Aufrufe):"]
+        for label, count in inclusive.most_common(top):
+            lines.append(f"  {count:>8}  {count * 100.0 / total:5.1f}%  {label}")
+        return "\n".join(lines) + "\n"
+
+    def collapsed_stacks(self) -> str:
+        """Format für flamegraph.pl / speedscope: ``thread;frame;frame count``."""
+        lines = []
+        for (thread_name, stack), count in sorted(self._stacks.items(), key=lambda item: -item[1]):
+            frames = ";".join(label.replace(";", ",") for label in stack)
+            lines.append(f"{thread_name};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory: Path) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        report_path = directory / f"profile-{stamp}.txt"
+        report_path.write_text(self.report(), encoding="utf-8")
+        (directory / f"profile-{stamp}.collapsed").write_text(self.collapsed_stacks(), encoding="utf-8")
+        return report_path
+
+
+_previous_snapshot: tracemalloc.Snapshot | None = None
+_memory_lock = threading.Lock()
+
+
+def start_memory_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+def stop_memory_tracing():
+    global _previous_snapshot
+    _previous_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def take_memory_snapshot(directory: Path, top: int = 30) -> Path | None:
+    """Schreibt Top-Allokationen (und Diff zum letzten Snapshot). None, wenn Tracing gerade erst startet."""
+    with _memory_lock:
+        return _take_memory_snapshot(directory, top)
+
+
+def _take_memory_snapshot(directory: Path, top: int) -> Path | None:
+    global _previous_snapshot
+    if not tracemalloc.is_tracing():
+        start_memory_tracing()
+        _previous_snapshot = tracemalloc.take_snapshot()
+        return None
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [
+        f"tracemalloc: aktuell {current / 1024 / 1024:.1f} MiB, Spitze {peak / 1024 / 1024:.1f} MiB",
+        "",
+        f"Top {top} Allokationen nach Zeile:",
+    ]
+    lines += [f"  {stat}" for stat in snapshot.statistics("lineno")[:top]]
+    if _previous_snapshot is not None:
+        lines += ["", f"Top {top} Änderungen seit letztem Snapshot:"]
+        lines += [f"  {stat}" for stat in snapshot.compare_to(_previous_snapshot, "lineno")[:top]]
+    _previous_snapshot = snapshot
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"mem-{datetime.now():%Y%m%d-%H%M%S}.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
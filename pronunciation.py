@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Aussprache-Lexikon für Spielernamen.
+
+Das Lexikon ordnet Namen eine Lautschrift-Umschreibung (z. B. ``Nguyen =
+Nwien``) oder Piper-Phoneme (``Nguyen = [[ ŋwˈiən ]]``) zu. Alle Einträge
+werden zu einem einzigen, als Trie aufgebauten Regex kompiliert; die
+Umschreibung wird pro gefundenem Namen nachgeschlagen und gecacht – der Text
+der Durchsage selbst ist fast immer neu und wird nicht gecacht.
+
+Dateiformat: eine Zeile pro Eintrag ``Name = Aussprache`` (Kommentare mit
+``#``) oder eine YAML-Datei (``.yaml``/``.yml``) mit einem Mapping.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+PHONEME_PATTERN = re.compile(r"\[\[.*?\]\]")
+RESPELL_CACHE_SIZE = 4096
+
+
+def _is_phoneme_entry(value: str) -> bool:
+    return bool(PHONEME_PATTERN.search(value))
+
+
+def load_lexicon_file(path: Path) -> dict[str, str]:
+    path = Path(path)
+    if path.suffix.lower() in (".yaml", ".yml"):
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        if not isinstance(data, dict):
+            raise ValueError("Lexikon-YAML muss ein Mapping Name -> Aussprache sein")
+        items = data.items()
+    else:
+        items = []
+        for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "=" not in line:
+                raise ValueError(f"Zeile {lineno}: erwartet 'Name = Aussprache'")
+            name, spoken = line.split("=", 1)
+            items.append((name, spoken))
+    entries = {}
+    for name, spoken in items:
+        name = " ".join(str(name or "").split())
+        spoken = str(spoken or "").strip()
+        if name and spoken:
+            entries[name] = spoken
+    return entries
+
+
+def _trie_to_pattern(node: dict) -> str:
+    optional = "" in node
+    branches = [re.escape(ch) + _trie_to_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if optional else group
+
+
+def build_trie_pattern(words) -> re.Pattern | None:
+    """Kompiliert alle Wörter zu einem Regex mit gemeinsamer Präfix-Struktur."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not trie:
+        return None
+    return re.compile(r"(?<!\w)" + _trie_to_pattern(trie) + r"(?!\w)", re.IGNORECASE)
+
+
+class PronunciationLexicon:
+    def __init__(self, entries: dict[str, str] | None = None):
+        self._entries = {name.lower(): spoken for name, spoken in (entries or {}).items()}
+        self._pattern = build_trie_pattern(self._entries)
+        self._respell = lru_cache(maxsize=RESPELL_CACHE_SIZE)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, name: str, allow_phonemes: bool) -> str:
+        spoken = self._entries.get(name.lower())
+        if spoken is None or (not allow_phonemes and _is_phoneme_entry(spoken)):
+            return name
+        return spoken
+
+    def apply(self, text: str, allow_phonemes: bool = True) -> str:
+        if self._pattern is None or not text:
+            return text
+        respell = self._respell
+        return self._pattern.sub(lambda match: respell(match.group(0), allow_phonemes), text)
+
+
+EMPTY_LEXICON = PronunciationLexicon()
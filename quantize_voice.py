@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quantisierte Varianten der Piper-Stimme erzeugen und mit dem Original vergleichen.
+
+Legt neben ``tts.model_path`` (bzw. ``--model``) ``<stimme>.int8.onnx`` und
+``<stimme>.fp16.onnx`` samt ``.json`` an und misst für jede Fassung auf einem
+festen Satz Durchsagen (gerendert mit den Vorlagen aus ``config.yaml``):
+
+- Ladezeit und Modellgröße,
+- Latenz bis zum ersten Audio-Block (Median/p95),
+- Real-Time-Factor (Synthesezeit / Audiodauer, < 1 = schneller als Echtzeit),
+- Abweichung der Audiodauer gegenüber dem Original als grobes Qualitätsmaß.
+
+Mit ``--wav-dir`` werden alle Sätze zusätzlich als WAV geschrieben – ob eine
+Variante gut genug klingt, entscheidet am Ende das Ohr. Aktiviert wird eine
+Variante mit ``tts.precision: int8`` bzw. ``fp16``.
+
+- int8: dynamische Quantisierung der MatMul/Gemm-Gewichte. Faltungen bleiben
+  float32 – ``ConvInteger`` hat in onnxruntime keinen optimierten CPU-Kernel
+  und ist mehrfach langsamer als das Original.
+- fp16: alle Gewichte in halber Genauigkeit, Ein- und Ausgänge bleiben float32.
+  Halbiert Platte und Speicher; ob es schneller ist, hängt von der CPU ab.
+
+Benötigt ``onnx``, ``onnxruntime`` und ``piper-tts`` sowie eine gültige
+``config.yaml`` im Arbeitsverzeichnis.
+"""
+
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import platform
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+PRECISIONS = ("int8", "fp16")
+RESULTS_DIR = Path("data") / "benchmarks"
+
+SAMPLE_MATCHES = [
+    ("3", "Hans Müller", "Anna Schmidt"),
+    ("12", "Müller, Hans", "Schmidt, Anna"),
+    ("7", "Jürgen Schäfer / Özlem Öztürk", "Björn Krüger & Lea Nguyen"),
+    ("21", "Marie Wagner", "Kai Weiß"),
+    ("Finale", "Peter Meier / Eva Braun", "Lukas Krüger / Sophie Braun"),
+]
+
+
+def quantized_model_path(model_path: str | Path, precision: str) -> Path:
+    """``voices/x.onnx`` -> ``voices/x.int8.onnx``."""
+    model_path = Path(model_path)
+    stem = model_path.name[:-len(".onnx")] if model_path.name.endswith(".onnx") else model_path.name
+    return model_path.with_name(f"{stem}.{precision}.onnx")
+
+
+def quantize_model(model_path: str | Path, precision: str, force: bool = False) -> Path:
+    """Erzeugt die Variante (falls nicht vorhanden oder älter als das Original) samt Stimm-Config."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unbekannte Genauigkeit: {precision} (erlaubt: {', '.join(PRECISIONS)})")
+    model_path = Path(model_path)
+    target = quantized_model_path(model_path, precision)
+    if not force and target.exists() and target.stat().st_mtime >= model_path.stat().st_mtime:
+        return target
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        if precision == "int8":
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(model_path), str(tmp), weight_type=QuantType.QInt8,
+                             op_types_to_quantize=["MatMul", "Gemm"])
+        else:
+            import onnx
+            from onnxruntime.transformers.float16 import convert_float_to_float16
+            model = convert_float_to_float16(onnx.load(str(model_path)), keep_io_types=True)
+            onnx.save(model, str(tmp))
+        tmp.replace(target)
+    finally:
+        tmp.unlink(missing_ok=True)
+    shutil.copyfile(str(model_path) + ".json", str(target) + ".json")
+    return target
+
+
+def template_sentences() -> list[str]:
+    """Durchsagen und erneute Aufrufe, wie sie das Tool mit der aktuellen Config spricht."""
+    from announcement_tts import format_recall_text, format_spoken_text
+    sentences = [format_spoken_text(*match) for match in SAMPLE_MATCHES]
+    sentences.append(format_recall_text(*SAMPLE_MATCHES[0]))
+    return sentences
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def bench_voice(model_path: Path, sentences: list[str], repeat: int = 3,
+                wav_dir: Path | None = None) -> dict:
+    """Ladezeit, Latenz bis zum ersten Block und RTF einer Modellfassung."""
+    from piper import SynthesisConfig
+    import text_to_speech as tts
+    from voice_registry import load_piper_voice
+
+    started = time.perf_counter()
+    voice = load_piper_voice(model_path, Path(str(model_path) + ".json"))
+    load_seconds = time.perf_counter() - started
+    syn_config = SynthesisConfig(speaker_id=tts.piper_speaker, length_scale=tts.piper_length_scale,
+                                 noise_scale=tts.piper_noise_scale, noise_w_scale=tts.piper_noise_w)
+    rate = voice.config.sample_rate
+    texts = [tts._normalize_text_for_tts(sentence) for sentence in sentences]
+    for chunk in voice.synthesize(texts[0], syn_config=syn_config):  # Aufwärmen
+        pass
+
+    first_chunk, rtf, durations = [], [], []
+    for idx, text in enumerate(texts):
+        for run in range(repeat):
+            audio = []
+            started = time.perf_counter()
+            first = None
+            for chunk in voice.synthesize(text, syn_config=syn_config):
+                if first is None:
+                    first = time.perf_counter() - started
+                audio.append(chunk.audio_int16_bytes)
+            elapsed = time.perf_counter() - started
+            seconds = sum(len(data) for data in audio) / 2 / rate
+            first_chunk.append(first or elapsed)
+            rtf.append(elapsed / seconds if seconds else float("inf"))
+            if run == 0:
+                durations.append(seconds)
+                if wav_dir is not None:
+                    with wave.open(str(wav_dir / f"{model_path.stem}-{idx + 1}.wav"), "wb") as wav:
+                        wav.setnchannels(1)
+                        wav.setsampwidth(2)
+                        wav.setframerate(rate)
+                        wav.writeframes(b"".join(audio))
+    return {
+        "model": str(model_path),
+        "size_mb": model_path.stat().st_size / 1e6,
+        "load_ms": load_seconds * 1000,
+        "first_chunk_ms_median": statistics.median(first_chunk) * 1000,
+        "first_chunk_ms_p95": _percentile(first_chunk, 0.95) * 1000,
+        "rtf_median": statistics.median(rtf),
+        "audio_seconds": durations,
+    }
+
+
+def _duration_deviation(result: dict, baseline: dict) -> float:
+    """Mittlere relative Abweichung der Audiodauer gegenüber dem Original."""
+    pairs = list(zip(result["audio_seconds"], baseline["audio_seconds"]))
+    return statistics.mean(abs(a - b) / b for a, b in pairs if b) if pairs else 0.0
+
+
+def _print_results(results: dict):
+    print(f"{'Fassung':<8} {'Größe':>9} {'Laden':>9} {'1. Block':>10} {'p95':>9} {'RTF':>6} {'Dauer±':>7}")
+    for name, res in results.items():
+        if "error" in res:
+            print(f"{name:<8} FEHLER: {res['error']}")
+            continue
+        deviation = res.get("duration_deviation")
+        print(f"{name:<8} {res['size_mb']:>7.1f}MB {res['load_ms']:>7.0f}ms {res['first_chunk_ms_median']:>8.0f}ms "
+              f"{res['first_chunk_ms_p95']:>7.0f}ms {res['rtf_median']:>6.2f} "
+              f"{'' if deviation is None else f'{deviation * 100:.1f}%':>7}")
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Quantisierte Piper-Stimmen erzeugen und mit dem Original vergleichen.")
+    p.add_argument("-m", "--model", help="Piper-Modell (Standard: tts.model_path aus config.yaml)")
+    p.add_argument("-p", "--precision", action="append", choices=PRECISIONS,
+                   help="Nur diese Genauigkeit (mehrfach möglich, Standard: alle)")
+    p.add_argument("--no-convert", action="store_true", help="Nur vorhandene Varianten messen")
+    p.add_argument("--force", action="store_true", help="Varianten neu erzeugen, auch wenn sie aktuell sind")
+    p.add_argument("--repeat", type=int, default=3, help="Durchläufe pro Satz (Standard: 3)")
+    p.add_argument("--wav-dir", help="Alle Sätze pro Fassung als WAV hier ablegen (zum Anhören)")
+    p.add_argument("-o", "--output", help=f"Ergebnisdatei (Standard: {RESULTS_DIR}/voice-<zeit>.json)")
+    return p
+
+
+if __name__ == "__main__":
+    args = _build_arg_parser().parse_args()
+    import text_to_speech as tts
+
+    model = Path(args.model or tts.piper_model_path)
+    if not model.exists() or not Path(str(model) + ".json").exists():
+        print(f"[ERROR] Piper-Modell oder Config fehlt: {model}")
+        sys.exit(2)
+    wav_dir = Path(args.wav_dir) if args.wav_dir else None
+    if wav_dir is not None:
+        wav_dir.mkdir(parents=True, exist_ok=True)
+
+    variants = {"full": model}
+    for precision in args.precision or PRECISIONS:
+        if args.no_convert:
+            path = quantized_model_path(model, precision)
+            if not path.exists():
+                print(f"[WARN] {path} fehlt – übersprungen.")
+                continue
+        else:
+            print(f"[INFO] Erzeuge {precision}-Fassung ...", flush=True)
+            try:
+                path = quantize_model(model, precision, force=args.force)
+            except Exception as exc:
+                print(f"[WARN] {precision}-Fassung nicht erzeugt: {exc}")
+                continue
+        variants[precision] = path
+
+    sentences = template_sentences()
+    results = {}
+    for name, path in variants.items():
+        print(f"[BENCH] {name}: {path} ...", flush=True)
+        try:
+            results[name] = bench_voice(path, sentences, repeat=max(1, args.repeat), wav_dir=wav_dir)
+        except Exception as exc:
+            print(f"[WARN] {name} fehlgeschlagen: {exc}")
+            results[name] = {"error": str(exc)}
+    baseline = results.get("full")
+    for name, res in results.items():
+        if name != "full" and "error" not in res and baseline and "error" not in baseline:
+            res["duration_deviation"] = _duration_deviation(res, baseline)
+
+    data = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "sentences": sentences,
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"voice-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    print()
+    _print_results(results)
+    print(f"\nErgebnisse gespeichert: {output}")
+    if wav_dir is not None:
+        print(f"Hörproben: {wav_dir}")
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Erneuter Aufruf für Tische, an denen noch nicht gespielt wird.
+
+Nach einer Durchsage plant ``RecallScheduler`` für den Tisch weitere Aufrufe
+(``recall.intervals``, jeweils ab dem vorherigen Aufruf). Alle Fristen liegen
+in einem gemeinsamen Heap; ein einzelner Thread (``recall-scheduler``) schläft
+bis zur frühesten Frist – auch bei hunderten offenen Tischen gibt es keine
+Timer-Threads und kein Durchsuchen aller Einträge.
+
+Abbrechen (neues Match, Tisch leer, Spiel begonnen) entfernt nur den Eintrag
+aus dem Tisch-Dict; die Heap-Einträge werden beim Erreichen verworfen bzw. bei
+Überhand nehmenden Leichen in einem Rutsch aussortiert.
+
+Kurz vor jeder Frist kommt ``on_prepare`` (Audio vorab synthetisieren), zur
+Frist ``on_fire`` (einreihen); ``on_cancel`` gibt Vorbereitetes wieder frei.
+"""
+
+import heapq
+import threading
+import time
+from typing import Callable
+
+import metrics
+
+PREPARE_LEAD = 20.0   # Sekunden vor der Frist vorbereiten (höchstens die halbe Wartezeit)
+_COMPACT_MIN = 64     # darunter lohnt das Aufräumen des Heaps nicht
+_PREPARE, _FIRE = 0, 1
+
+metrics.define_counter("kickertool_recalls_total",
+                       "Erneute Aufrufe nach Ergebnis (queued, skipped, cancelled).")
+
+
+class _Recall:
+    __slots__ = ("table", "payload", "step", "active")
+
+    def __init__(self, table: str, payload: object):
+        self.table = table
+        self.payload = payload
+        self.step = 0
+        self.active = True
+
+
+class RecallScheduler:
+    def __init__(self, intervals: tuple[float, ...],
+                 on_fire: Callable[[str, object, int], bool],
+                 on_prepare: Callable[[str, object, int], None] | None = None,
+                 on_cancel: Callable[[str, object, int], None] | None = None,
+                 on_error: Callable[[str], None] | None = None,
+                 prepare_lead: float = PREPARE_LEAD, clock: Callable[[], float] = time.monotonic):
+        self.intervals = tuple(float(i) for i in intervals if float(i) > 0)
+        self._on_fire = on_fire
+        self._on_prepare = on_prepare
+        self._on_cancel = on_cancel
+        self._on_error = on_error or (lambda message: print(f"[WARN] {message}"))
+        self._prepare_lead = max(0.0, float(prepare_lead))
+        self._clock = clock
+        self._heap: list[tuple[float, int, int, _Recall, int]] = []
+        self._seq = 0
+        self._recalls: dict[str, _Recall] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+        metrics.define_gauge("kickertool_recalls_pending", "Tische mit geplantem erneutem Aufruf.", self.__len__)
+
+    def __len__(self) -> int:
+        return len(self._recalls)
+
+    def set_intervals(self, intervals: tuple[float, ...]):
+        """Neue Abstände gelten ab dem nächsten geplanten Aufruf."""
+        with self._cond:
+            self.intervals = tuple(float(i) for i in intervals if float(i) > 0)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, daemon=True, name="recall-scheduler")
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def schedule(self, table: str, payload: object) -> bool:
+        """Plant die Aufrufe für ``table`` neu (ersetzt einen bestehenden Plan). ``False`` ohne Intervalle."""
+        with self._cond:
+            replaced = self._drop(table)
+            planned = bool(self.intervals)
+            if planned:
+                recall = _Recall(table, payload)
+                self._recalls[table] = recall
+                self._push_step(recall, self._clock())
+        self._cancelled(replaced)
+        return planned
+
+    def cancel(self, table: str) -> bool:
+        with self._cond:
+            recall = self._drop(table)
+        self._cancelled(recall)
+        return recall is not None
+
+    def cancel_all(self) -> int:
+        with self._cond:
+            recalls = list(self._recalls.values())
+            for recall in recalls:
+                recall.active = False
+            self._recalls.clear()
+            self._heap.clear()
+        for recall in recalls:
+            self._cancelled(recall)
+        return len(recalls)
+
+    def retain(self, tables: set[str]) -> int:
+        """Bricht die Aufrufe aller Tische ab, die nicht (mehr) in ``tables`` stehen."""
+        with self._cond:
+            gone = [table for table in self._recalls if table not in tables]
+        return sum(self.cancel(table) for table in gone)
+
+    def _cancelled(self, recall: "_Recall | None"):
+        if recall is None:
+            return
+        metrics.inc("kickertool_recalls_total", result="cancelled")
+        if self._on_cancel is not None:
+            try:
+                self._on_cancel(recall.table, recall.payload, recall.step)
+            except Exception as exc:
+                self._on_error(f"Erneuten Aufruf Tisch {recall.table} nicht sauber abgebrochen: {exc}")
+
+    # --- intern (mit self._cond) ---
+    def _drop(self, table: str) -> "_Recall | None":
+        recall = self._recalls.pop(table, None)
+        if recall is None:
+            return None
+        recall.active = False
+        # je Tisch liegen höchstens zwei gültige Einträge im Heap, der Rest sind Leichen
+        if len(self._heap) > max(_COMPACT_MIN, 4 * len(self._recalls)):
+            self._heap = [entry for entry in self._heap if self._valid(entry)]
+            heapq.heapify(self._heap)
+        return recall
+
+    @staticmethod
+    def _valid(entry) -> bool:
+        recall, step = entry[3], entry[4]
+        return recall.active and recall.step == step
+
+    def _push_step(self, recall: _Recall, since: float):
+        delay = self.intervals[recall.step]
+        due = since + delay
+        if self._on_prepare is not None:
+            self._push(due - min(self._prepare_lead, delay / 2), _PREPARE, recall)
+        self._push(due, _FIRE, recall)
+
+    def _push(self, when: float, phase: int, recall: _Recall):
+        self._seq += 1
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (when, self._seq, phase, recall, recall.step))
+        if earliest is None or when < earliest:
+            self._cond.notify()
+
+    def _next_due(self):
+        """Nächster fälliger gültiger Eintrag oder Wartezeit bis dahin (``None`` = unbestimmt)."""
+        while self._heap:
+            entry = self._heap[0]
+            if not self._valid(entry):
+                heapq.heappop(self._heap)
+                continue
+            wait = entry[0] - self._clock()
+            if wait > 0:
+                return None, wait
+            heapq.heappop(self._heap)
+            return entry, 0.0
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    entry, wait = self._next_due()
+                    if entry is not None:
+                        break
+                    self._cond.wait(wait)
+            _, _, phase, recall, step = entry
+            if phase == _PREPARE:
+                try:
+                    self._on_prepare(recall.table, recall.payload, step)
+                except Exception as exc:
+                    self._on_error(f"Erneuten Aufruf Tisch {recall.table} nicht vorbereitet: {exc}")
+                continue
+            try:
+                queued = self._on_fire(recall.table, recall.payload, step)
+            except Exception as exc:
+                self._on_error(f"Erneuter Aufruf Tisch {recall.table} fehlgeschlagen: {exc}")
+                queued = False
+            metrics.inc("kickertool_recalls_total", result="queued" if queued else "skipped")
+            with self._cond:
+                if not recall.active or recall.step != step:
+                    continue  # während des Callbacks abgebrochen oder neu geplant
+                recall.step += 1
+                if recall.step < len(self.intervals):
+                    self._push_step(recall, self._clock())
+                else:
+                    recall.active = False
+                    self._recalls.pop(recall.table, None)
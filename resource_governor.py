@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Vorrang für die Wiedergabe.
+
+Zum Rundenstart laufen Vorab-Synthesen, Polling und Neuzeichnen gleichzeitig
+mit der Wiedergabe – auf schwachen Laptops stottert dann das Audio. Hier liegt
+alles, was die Wiedergabe bevorzugt:
+
+- Prioritäten: Synthese (Vorab-Threads bzw. Synthese-Prozesse samt Piper) und
+  Oberfläche laufen mit höherem Nice-Wert, der Player wird – falls das System
+  es erlaubt (``CAP_SYS_NICE``/``RLIMIT_NICE``, unter Windows immer) –
+  angehoben. Unter Linux gilt der Nice-Wert pro Thread, neue Threads (auch die
+  von onnxruntime und Piper-Kindprozesse) erben ihn; unter macOS lassen sich
+  nur ganze Prozesse absenken.
+- onnxruntime: begrenzte Thread-Zahl pro Stimme und kein Busy-Waiting der
+  Worker (``allow_spinning``), damit die Synthese nicht alle Kerne belegt.
+- ``PlaybackGate``: Solange irgendwo Audio läuft, starten höchstens ``limit``
+  Vorab-Synthesen gleichzeitig; wartet eine Zone auf genau diese Durchsage,
+  darf sie sofort starten.
+- ``UnderrunDetector``: zählt Aussetzer, die der Player meldet (``aplay``:
+  ``underrun!!!``), und Wiedergaben, die deutlich länger dauern als das Audio.
+"""
+
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import metrics
+
+UI_NICE = 5
+PLAYBACK_NICE = -5
+MAX_SYNTHESIS_THREADS = 4
+UNDERRUN_SLACK = 0.25   # Sekunden über dem schnellsten bisherigen Player-Overhead
+_UNDERRUN_PATTERN = re.compile(r"underrun|xrun", re.IGNORECASE)
+
+metrics.define_counter("kickertool_playback_underruns_total",
+                       "Erkannte Aussetzer bei der Wiedergabe nach Quelle (player, timing).")
+metrics.define_counter("kickertool_preload_throttled_total",
+                       "Vorab-Synthesen, die wegen laufender Wiedergabe warten mussten.")
+
+_boost_denied = False
+
+
+# ==== Prioritäten ====
+def _windows_priority(nice: int, thread: bool) -> int:
+    if thread:
+        # THREAD_PRIORITY_LOWEST / BELOW_NORMAL / NORMAL / ABOVE_NORMAL
+        return -2 if nice >= 10 else -1 if nice > 0 else 1 if nice < 0 else 0
+    # IDLE / BELOW_NORMAL / NORMAL / ABOVE_NORMAL_PRIORITY_CLASS
+    return 0x40 if nice >= 19 else 0x4000 if nice > 0 else 0x8000 if nice < 0 else 0x20
+
+
+def set_thread_priority(native_id: int | None, nice: int) -> bool:
+    """Nice-Wert eines Threads (``None`` = aufrufender Thread). ``False``, wenn das System es nicht kann/erlaubt."""
+    native_id = threading.get_native_id() if native_id is None else native_id
+    try:
+        if sys.platform.startswith("linux"):
+            os.setpriority(os.PRIO_PROCESS, native_id, nice)
+            return True
+        if os.name == "nt":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenThread(0x0020, False, native_id)  # THREAD_SET_INFORMATION
+            if not handle:
+                return False
+            try:
+                return bool(kernel32.SetThreadPriority(handle, _windows_priority(nice, thread=True)))
+            finally:
+                kernel32.CloseHandle(handle)
+    except (OSError, AttributeError):
+        pass
+    return False
+
+
+def set_process_priority(pid: int | None, nice: int) -> bool:
+    """Nice-Wert eines Prozesses (``None`` = eigener Prozess; gilt dann auch für später gestartete Threads)."""
+    try:
+        if os.name == "nt":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x0200, False, os.getpid() if pid is None else pid)  # PROCESS_SET_INFORMATION
+            if not handle:
+                return False
+            try:
+                return bool(kernel32.SetPriorityClass(handle, _windows_priority(nice, thread=False)))
+            finally:
+                kernel32.CloseHandle(handle)
+        if pid is None:
+            os.nice(nice - os.getpriority(os.PRIO_PROCESS, 0))
+        else:
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def boost_player(pid: int) -> bool:
+    """Hebt einen frisch gestarteten Player an; ohne Rechte wird es nach dem ersten Versuch gelassen."""
+    global _boost_denied
+    if _boost_denied:
+        return False
+    if set_process_priority(pid, PLAYBACK_NICE):
+        return True
+    _boost_denied = True
+    return False
+
+
+# ==== onnxruntime ====
+def synthesis_threads(configured: int = 0) -> int:
+    """Threads pro Synthese: ``configured`` oder alle Kerne bis auf einen (höchstens ``MAX_SYNTHESIS_THREADS``)."""
+    if configured > 0:
+        return int(configured)
+    return max(1, min(MAX_SYNTHESIS_THREADS, (os.cpu_count() or 2) - 1))
+
+
+def session_options(threads: int):
+    import onnxruntime
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    # wartende Worker schlafen statt zu spinnen – sonst halten sie die Kerne auch zwischen den Sätzen belegt
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    options.add_session_config_entry("session.inter_op.allow_spinning", "0")
+    return options
+
+
+# ==== Vorab-Synthese drosseln ====
+class PlaybackGate:
+    def __init__(self, limit: int = 1, enabled: bool = True):
+        self.limit = max(1, int(limit))
+        self.enabled = enabled
+        self._cond = threading.Condition()
+        self._playing = 0
+        self._running = 0
+        self._urgent: set[str] = set()
+
+    @property
+    def playing(self) -> bool:
+        return self._playing > 0
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    @contextmanager
+    def playback(self) -> Iterator[None]:
+        """Klammert eine Wiedergabe (Hinweiston + Durchsage) einer Zone."""
+        with self._cond:
+            self._playing += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._playing -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def preload(self, key: str, cancel=None) -> Iterator[None]:
+        """Platz für eine Vorab-Synthese; wartet, solange Audio läuft und alle Plätze belegt sind."""
+        if cancel is not None:
+            cancel.add_callback(self._wake)
+        with self._cond:
+            def blocked() -> bool:
+                return (self.enabled and self._playing > 0 and self._running >= self.limit
+                        and key not in self._urgent and not (cancel is not None and cancel.cancelled))
+
+            if blocked():
+                metrics.inc("kickertool_preload_throttled_total")
+                while blocked():
+                    self._cond.wait()
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def expedite(self, key: str) -> Iterator[None]:
+        """Eine Zone wartet auf ``key``: dessen Synthese nicht länger zurückhalten."""
+        with self._cond:
+            self._urgent.add(key)
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._urgent.discard(key)
+
+
+# ==== Aussetzer ====
+class UnderrunDetector:
+    def __init__(self, slack: float = UNDERRUN_SLACK):
+        self.slack = float(slack)
+        self._lock = threading.Lock()
+        self._overhead: dict[str, float] = {}  # schnellster Start+Ende-Overhead pro Player
+
+    def scan_output(self, player: str, output: str) -> int:
+        """Aussetzer, die der Player selbst meldet (z. B. ``aplay``: ``underrun!!!``)."""
+        count = len(_UNDERRUN_PATTERN.findall(output or ""))
+        if count:
+            metrics.inc("kickertool_playback_underruns_total", count, source="player")
+        return count
+
+    def check_timing(self, player: str, audio_seconds: float, elapsed: float) -> float:
+        """
+        Verzögerung gegenüber der schnellsten bisherigen Wiedergabe mit diesem
+        Player. Liegt sie über ``slack``, hing die Ausgabe (oder der Start) – als
+        Aussetzer gezählt. ``0.0``, wenn alles im Rahmen lag.
+        """
+        overhead = elapsed - audio_seconds
+        with self._lock:
+            baseline = self._overhead.get(player)
+            if baseline is None or overhead < baseline:
+                self._overhead[player] = overhead
+                return 0.0
+        late = overhead - baseline
+        if late <= self.slack:
+            return 0.0
+        metrics.inc("kickertool_playback_underruns_total", source="timing")
+        return late
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Vorkompilierte Sprachvorlagen.
+
+Eine Vorlage wird einmal (beim Start bzw. nach Config-Änderung) in eine Liste
+aus festen Textstücken und Getter-Funktionen zerlegt. Beim Rendern werden nur
+die Platzhalter aufgelöst, die in der Vorlage tatsächlich vorkommen. Die
+Namensaufteilung der Teams passiert lazy und wird pro Team-Name gecacht –
+Spieler tauchen im Turnier dutzendfach auf.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable
+
+TEMPLATE_PATTERN = re.compile(r"{([^{}]+)}")
+TEAM_DELIMITER_PATTERN = re.compile(r"\s*(?:/|&|\+|\bund\b)\s*", re.IGNORECASE)
+_PLACEHOLDER_CLEANUP = re.compile(r"[^A-Za-z0-9]+")
+
+# Platzhalter, deren Wert nur von der Config abhängt (werden beim Kompilieren eingesetzt)
+CONSTANT_PLACEHOLDERS = ("NOTIFY_SOUND", "NOTIFY_SOUND_NAME", "NOTIFY_SOUND_PATH")
+NAME_CACHE_SIZE = 8192
+
+
+def normalize_placeholder_key(raw: str) -> str:
+    cleaned = _PLACEHOLDER_CLEANUP.sub("_", raw.strip())
+    return cleaned.upper().strip("_")
+
+
+def split_player_name(name: str) -> dict:
+    name = (name or "").strip()
+    if not name:
+        return {"full": "", "first": "", "last": ""}
+
+    if "," in name:
+        last, first = [part.strip() for part in name.split(",", 1)]
+    else:
+        parts = name.split()
+        if len(parts) == 1:
+            first, last = parts[0], parts[0]
+        else:
+            first = parts[0]
+            last = parts[-1]
+
+    first = first or name
+    last = last or name
+    return {"full": name, "first": first, "last": last}
+
+
+def split_team_members(name: str) -> list:
+    if not (name or "").strip():
+        return []
+    raw = name.strip()
+    if TEAM_DELIMITER_PATTERN.search(raw):
+        return [part.strip() for part in TEAM_DELIMITER_PATTERN.split(raw) if part.strip()]
+    return [raw]
+
+
+_EMPTY_PLAYER = {"full": "", "first": "", "last": ""}
+
+
+class TeamNames:
+    """Analysierter Team-Name (unveränderlich, wird gecacht und geteilt)."""
+
+    __slots__ = ("raw", "members", "primary", "slots")
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.members = tuple(split_team_members(raw))
+        self.primary = split_player_name(self.members[0] if self.members else raw)
+        self.slots = tuple(
+            split_player_name(self.members[idx]) if idx < len(self.members) else _EMPTY_PLAYER
+            for idx in range(2)
+        )
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def analyze_team(name: str) -> TeamNames:
+    return TeamNames(name or "")
+
+
+class MatchContext:
+    """Eingaben eines Matches; Team-/Namensaufteilung erst bei Bedarf."""
+
+    __slots__ = ("table", "teams", "_names")
+
+    def __init__(self, table: str | None, team_a: str | None, team_b: str | None):
+        self.table = table or ""
+        self.teams = (team_a or "", team_b or "")
+        self._names: list = [None, None]
+
+    def team(self, team: int) -> TeamNames:
+        names = self._names[team]
+        if names is None:
+            names = self._names[team] = analyze_team(self.teams[team])
+        return names
+
+    def members(self, team: int) -> tuple:
+        return self.team(team).members
+
+    def primary(self, team: int) -> dict:
+        """Erster Spieler eines Teams ({PLAYER1_*}/{PLAYER2_*})."""
+        return self.team(team).primary
+
+    def member(self, team: int, slot: int) -> dict:
+        """Spieler ``slot`` (0/1) innerhalb eines Teams ({TEAM_A_PLAYER1_*} …)."""
+        return self.team(team).slots[slot]
+
+    @property
+    def is_doubles(self) -> bool:
+        return max(len(self.team(0).members), len(self.team(1).members)) > 1
+
+
+Getter = Callable[[MatchContext], str]
+
+_NAME_FIELDS = {
+    "FULL": "full",
+    "FULLNAME": "full",
+    "FIRST": "first",
+    "FIRSTNAME": "first",
+    "NAME": "first",
+    "SURNAME": "last",
+    "LASTNAME": "last",
+}
+
+
+def _build_getters() -> dict[str, Getter]:
+    getters: dict[str, Getter] = {
+        "TABLE": lambda ctx: ctx.table,
+        "TABLE_NAME": lambda ctx: ctx.table,
+        "TEAM_A": lambda ctx: ctx.teams[0],
+        "TEAM_B": lambda ctx: ctx.teams[1],
+        "TEAM_A_MEMBER_COUNT": lambda ctx: str(len(ctx.members(0))),
+        "TEAM_B_MEMBER_COUNT": lambda ctx: str(len(ctx.members(1))),
+        "IS_DOUBLES": lambda ctx: str(ctx.is_doubles),
+        "IS_SINGLES": lambda ctx: str(not ctx.is_doubles),
+    }
+    for suffix, field in _NAME_FIELDS.items():
+        for team, player in ((0, "PLAYER1"), (1, "PLAYER2")):
+            getters[f"{player}_{suffix}"] = lambda ctx, t=team, f=field: ctx.primary(t)[f]
+        for team, prefix in ((0, "TEAM_A"), (1, "TEAM_B")):
+            for slot in (0, 1):
+                getters[f"{prefix}_PLAYER{slot + 1}_{suffix}"] = (
+                    lambda ctx, t=team, s=slot, f=field: ctx.member(t, s)[f]
+                )
+    return getters
+
+
+PLACEHOLDER_GETTERS: dict[str, Getter] = _build_getters()
+KNOWN_PLACEHOLDERS = frozenset(PLACEHOLDER_GETTERS) | frozenset(CONSTANT_PLACEHOLDERS)
+
+
+class CompiledTemplate:
+    __slots__ = ("source", "fragments", "placeholders", "unknown")
+
+    def __init__(self, source: str, fragments: tuple, placeholders: frozenset, unknown: tuple):
+        self.source = source
+        self.fragments = fragments
+        self.placeholders = placeholders
+        self.unknown = unknown
+
+    def render(self, ctx: MatchContext) -> str:
+        return "".join([part if part.__class__ is str else part(ctx) for part in self.fragments])
+
+
+def compile_template(source: str, constants: dict | None = None) -> CompiledTemplate:
+    """
+    Zerlegt ``source`` in Textstücke und Getter. Unbekannte Platzhalter bleiben
+    unverändert im Text stehen und werden in ``unknown`` gemeldet.
+    """
+    constants = {normalize_placeholder_key(k): str(v) for k, v in (constants or {}).items()}
+    fragments: list = []
+    used = set()
+    unknown = []
+    pos = 0
+
+    def add_literal(text: str):
+        if not text:
+            return
+        if fragments and fragments[-1].__class__ is str:
+            fragments[-1] += text
+        else:
+            fragments.append(text)
+
+    for match in TEMPLATE_PATTERN.finditer(source):
+        add_literal(source[pos:match.start()])
+        pos = match.end()
+        key = normalize_placeholder_key(match.group(1))
+        if key in constants:
+            used.add(key)
+            add_literal(constants[key])
+        elif key in PLACEHOLDER_GETTERS:
+            used.add(key)
+            fragments.append(PLACEHOLDER_GETTERS[key])
+        else:
+            if key and match.group(0) not in unknown:
+                unknown.append(match.group(0))
+            add_literal(match.group(0))
+    add_literal(source[pos:])
+    return CompiledTemplate(source, tuple(fragments), frozenset(used), tuple(unknown))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Journal-basierter State-Speicher für ``seen_matches.json``.
+
+Änderungen werden nicht mehr als komplette Datei umgeschrieben, sondern als
+JSON-Zeilen an ``seen_matches.journal`` angehängt – gesammelt und per fsync
+gesichert in einem Hintergrund-Thread, nicht im Polling-Loop. Ab einer
+bestimmten Journal-Länge (und beim Beenden) wird ``seen_matches.json``
+atomar (temporäre Datei + ``os.replace``) neu geschrieben und das Journal
+geleert. Beim Start: Snapshot laden, Journal darüber abspielen.
+
+Das Journal enthält nur bereits geschriebene Stände; sein Abspielen über
+einen neueren Snapshot ist daher idempotent – ein Absturz zwischen Snapshot
+und Journal-Kürzung verliert nichts.
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+_MISSING = object()
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8"):
+    """Schreibt ``text`` atomar: Temp-Datei im selben Ordner, fsync, ``os.replace``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+    if os.name != "nt":
+        try:
+            fd = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+class JournaledStateStore:
+    def __init__(self, snapshot_path: Path, journal_path: Path | None = None,
+                 flush_interval: float = 0.5, compact_after: int = 500):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else self.snapshot_path.with_suffix(".journal")
+        self.flush_interval = float(flush_interval)
+        self.compact_after = int(compact_after)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._known: dict = {}      # zuletzt gemeldeter Stand (Poll-Thread)
+        self._durable: dict = {}    # Stand in Snapshot + Journal
+        self._pending: dict = {}    # Tisch -> Key, noch nicht im Journal
+        self._journal_entries = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_error: Exception | None = None
+
+    # ---- Laden / Recovery ----
+    def load(self) -> dict:
+        state: dict = {}
+        if self.snapshot_path.exists():
+            try:
+                data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    state = data
+            except Exception as exc:
+                print(f"[WARN] State-Snapshot unlesbar, starte mit Journal: {exc}")
+        replayed = 0
+        if self.journal_path.exists():
+            try:
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # abgeschnittene letzte Zeile nach Absturz
+                            continue
+                        if isinstance(entry, dict) and "t" in entry:
+                            state[entry["t"]] = entry.get("k")
+                            replayed += 1
+            except OSError as exc:
+                print(f"[WARN] State-Journal unlesbar: {exc}")
+        with self._lock:
+            self._known = dict(state)
+            self._durable = dict(state)
+            self._pending.clear()
+            self._journal_entries = replayed
+        if replayed:
+            self.compact()
+        return dict(state)
+
+    # ---- Schreiben ----
+    def save(self, state: dict):
+        """Übernimmt Änderungen gegenüber dem letzten Stand (nicht blockierend)."""
+        changed = False
+        with self._lock:
+            for table, key in state.items():
+                if self._known.get(table, _MISSING) != key:
+                    self._known[table] = key
+                    self._pending[table] = key
+                    changed = True
+        if changed:
+            self._ensure_thread()
+            self._wakeup.set()
+
+    def flush(self):
+        """Schreibt ausstehende Änderungen ins Journal (fsync) und kompaktiert bei Bedarf."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+            if batch:
+                try:
+                    self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                    lines = "".join(
+                        json.dumps({"t": table, "k": key}, ensure_ascii=False) + "\n"
+                        for table, key in batch.items()
+                    )
+                    with open(self.journal_path, "a", encoding="utf-8") as f:
+                        f.write(lines)
+                        f.flush()
+                        os.fsync(f.fileno())
+                except Exception as exc:
+                    self.last_error = exc
+                    with self._lock:
+                        # beim nächsten Versuch erneut schreiben, neuere Werte behalten Vorrang
+                        for table, key in batch.items():
+                            self._pending.setdefault(table, key)
+                    print(f"[WARN] Konnte State nicht speichern: {exc}")
+                    return
+                self._durable.update(batch)
+                self._journal_entries += len(batch)
+            if self._journal_entries >= self.compact_after:
+                self._compact_locked()
+
+    def compact(self):
+        with self._flush_lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        try:
+            atomic_write_text(
+                self.snapshot_path,
+                json.dumps(self._durable, ensure_ascii=False, indent=2),
+            )
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+            self._journal_entries = 0
+        except Exception as exc:
+            self.last_error = exc
+            print(f"[WARN] Konnte State nicht kompaktieren: {exc}")
+
+    def close(self):
+        """Beendet den Flush-Thread und schreibt einen kompakten Snapshot."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.flush()
+        if self._journal_entries:
+            self.compact()
+
+    # ---- Hintergrund-Thread ----
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="state-flusher")
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            # Änderungen eines Polls sammeln, dann in einem Rutsch schreiben
+            self._stopped.wait(self.flush_interval)
+            self.flush()
@@ -2,52 +2,86 @@ import os
 import re
 import sys
 import shutil
-import yaml
 import argparse
 import subprocess
+import time
+import threading
 import tempfile
+import hashlib
+import json
 import unicodedata
+import wave
 from pathlib import Path
 from typing import Callable, Optional
+import metrics
+from config import AppConfig, get_config
+from pronunciation import EMPTY_LEXICON, PronunciationLexicon, load_lexicon_file
+from quantize_voice import quantized_model_path
+from resource_governor import UnderrunDetector, boost_player, session_options, synthesis_threads
+from voice_registry import VoiceRegistry, load_piper_voice
 
-# Optional: pyttsx3 Fallback
-try:
-    import pyttsx3
-except ImportError:
-    pyttsx3 = None
+# pyttsx3 wird erst bei Bedarf importiert (siehe _pyttsx3_say)
 
 # =========================
-# Config laden (config.yaml)
+# Config (config.yaml, optional)
 # =========================
-CONFIG_PATH = Path("config.yaml")
-if not CONFIG_PATH.exists():
-    DEFAULT_CONFIG = {}
-else:
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        DEFAULT_CONFIG = yaml.safe_load(f) or {}
-
-TTS_CFG = (DEFAULT_CONFIG.get("tts") or {})
-FILES_CFG = (DEFAULT_CONFIG.get("files") or {})
+CONFIG = get_config()
+TTS_CFG = CONFIG.tts
 
 # ---- Defaults aus YAML (mit Fallbacks) ----
-provider = (TTS_CFG.get("provider") or "piper").lower()          # "piper" | "pyttsx3"
+provider = TTS_CFG.provider.lower()          # "piper" | "pyttsx3"
 use_piper = provider == "piper"
 
 # Piper-Optionen
-piper_model_path = str(TTS_CFG.get("model_path", "voices/de_DE-thorsten-medium.onnx"))
-piper_speaker = TTS_CFG.get("speaker")          # z.B. 0 oder None
-piper_length_scale = float(TTS_CFG.get("length_scale", 0.95))
-piper_noise_scale  = float(TTS_CFG.get("noise_scale", 0.5))
-piper_noise_w      = float(TTS_CFG.get("noise_w", 0.8))
+piper_model_path = TTS_CFG.model_path
+piper_speaker = TTS_CFG.speaker          # z.B. 0 oder None
+piper_length_scale = TTS_CFG.length_scale
+piper_noise_scale  = TTS_CFG.noise_scale
+piper_noise_w      = TTS_CFG.noise_w
+piper_engine = TTS_CFG.engine.lower()    # "auto" | "library" | "cli"
+piper_precision = TTS_CFG.precision.lower()  # "full" | "int8" | "fp16"
+_voice_configs = {voice.name: voice for voice in CONFIG.voices}  # weitere Stimmen (config.yaml: voices)
 
 # pyttsx3-Optionen
-tts_rate = int(TTS_CFG.get("rate", 170))
-tts_volume = float(TTS_CFG.get("volume", 1.0))
-tts_voice_index = TTS_CFG.get("voice_index")    # int oder None
+tts_rate = TTS_CFG.rate
+tts_volume = TTS_CFG.volume
+tts_voice_index = TTS_CFG.voice_index    # int oder None
+
+# Aussprache-Lexikon (Name -> Umschreibung/Phoneme)
+lexicon_path_raw = TTS_CFG.lexicon_path
 
 # Dateien
-save_audio = bool(FILES_CFG.get("save_audio", False))
+save_audio = CONFIG.files.save_audio
+audio_cache_enabled = CONFIG.files.audio_cache
+audio_cache_max_mb = CONFIG.files.audio_cache_max_mb
 _tts_muted = False
+_pronunciation_lexicon: PronunciationLexicon = EMPTY_LEXICON
+_audio_cache_dir: Path | None = None
+_audio_cache_lock = threading.Lock()
+_audio_cache_stores = 0
+AUDIO_CACHE_PRUNE_EVERY = 50
+_voice_lock = threading.Lock()  # Stimmparameter werden beim Hot-Reload gemeinsam getauscht
+TEMP_AUDIO_PREFIX = "kickertts-"  # erkennt verwaiste Temp-WAVs (siehe preload_cache)
+_library_available: bool | None = None  # piper-tts + onnxruntime im Prozess nutzbar?
+_precision_variants: dict[str, str] = {}  # quantisierte Variante -> Original
+_precision_fallbacks: set[str] = set()    # Originale, deren Variante fehlt oder versagt hat
+playback_first = CONFIG.runtime.playback_first
+_underruns = UnderrunDetector()
+
+
+def _load_voice(model_path: Path, config_path: Path):
+    """Stimme mit begrenzter onnxruntime-Thread-Zahl, damit die Wiedergabe CPU übrig behält."""
+    if not playback_first:
+        return load_piper_voice(model_path, config_path)
+    return load_piper_voice(model_path, config_path,
+                            session_options(synthesis_threads(CONFIG.runtime.synthesis_threads)))
+
+
+_voice_registry = VoiceRegistry(
+    budget_bytes=int(TTS_CFG.voice_memory_mb * 1024 * 1024),
+    idle_seconds=TTS_CFG.voice_idle_seconds,
+    loader=_load_voice,
+)
 
 # Pfad zu piper-Executable
 if os.name == "nt":
@@ -56,28 +90,318 @@ else:
     piper_executable = "piper"
 
 
-def _play_wav(path: str):
-    """Spielt eine WAV-Datei möglichst portabel ab (blocking)."""
+class SynthesisCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Bricht eine laufende Synthese ab; ein laufender Piper-Prozess wird beendet."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            proc = self._proc
+            callbacks, self._callbacks = self._callbacks, []
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Ruft ``callback`` beim Abbruch auf (sofort, falls schon abgebrochen)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self):
+        if self._event.is_set():
+            raise SynthesisCancelled()
+
+    def _attach(self, proc: subprocess.Popen | None):
+        with self._lock:
+            self._proc = proc
+            cancelled = self._event.is_set()
+        if cancelled and proc is not None:
+            proc.kill()
+
+
+# Player, die ein bestimmtes Ausgabegerät ansteuern können (Zonen)
+DEVICE_PLAYERS = {
+    "paplay": lambda device, path: ["paplay", f"--device={device}", path],
+    "pw-play": lambda device, path: ["pw-play", "--target", device, path],
+    "aplay": lambda device, path: ["aplay", "-q", "-D", device, path],
+}
+_device_warned: set[str] = set()
+
+
+def device_play_command(path: str, device: str, player: str = "") -> list[str] | None:
+    """Kommando, das ``path`` auf ``device`` abspielt; ``None``, wenn kein passender Player da ist."""
+    if os.name == "nt":
+        return None
+    names = [player] if player else list(DEVICE_PLAYERS)
+    for name in names:
+        build = DEVICE_PLAYERS.get(name)
+        if build is not None and shutil.which(name):
+            return build(device, path)
+    return None
+
+
+def _warn_device_once(device: str, reason: str = "paplay/pw-play/aplay fehlen"):
+    if device not in _device_warned:
+        _device_warned.add(device)
+        print(f"[WARN] Ausgabegerät '{device}' nicht ansteuerbar ({reason}) – nutze Standardgerät.")
+
+
+def _wav_seconds(path: str) -> float | None:
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return None
+
+
+def _run_player(cmd: list[str], wav_path: str, check: bool = False):
+    """Startet den Player (möglichst angehoben), wartet auf das Ende und wertet Aussetzer aus."""
+    started = time.monotonic()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if playback_first:
+        boost_player(proc.pid)
+    _, err = proc.communicate()
+    elapsed = time.monotonic() - started
+    name = Path(cmd[0]).stem
+    output = err.decode("utf-8", errors="replace") if err else ""
+    underruns = _underruns.scan_output(name, output)
+    audio_seconds = _wav_seconds(wav_path)
+    late = _underruns.check_timing(name, audio_seconds, elapsed) if audio_seconds is not None else 0.0
+    if underruns:
+        print(f"[WARN] Aussetzer bei der Wiedergabe ({name} meldet {underruns}× underrun).")
+    elif late:
+        print(f"[WARN] Wiedergabe hing {late * 1000:.0f} ms ({name}) – Aussetzer oder verzögerter Start.")
+    if proc.returncode:
+        lines = output.strip().splitlines()
+        if lines:
+            print(f"[WARN] {name}: {lines[-1]}")
+        if check:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def _play_wav(path: str, device: str = "", player: str = ""):
+    """Spielt eine WAV-Datei möglichst portabel ab (blocking), optional auf einem bestimmten Gerät."""
     abs_path = os.path.abspath(path)
+    if device:
+        cmd = device_play_command(abs_path, device, player)
+        if cmd is not None:
+            _run_player(cmd, abs_path)
+            return
+        _warn_device_once(device)
     if os.name == "nt":
         try:
-            subprocess.run([
+            _run_player([
                 "powershell", "-NoProfile", "-Command",
                 f"[System.Media.SoundPlayer]::new('{abs_path}').PlaySync()"
-            ], check=True)
+            ], abs_path, check=True)
             return
         except Exception as e:
             print(f"[WARN] PowerShell SoundPlayer fehlgeschlagen: {e}")
     else:
         for player in ["afplay", "ffplay", "aplay"]:
             if shutil.which(player):
-                subprocess.run([player, abs_path], check=False)
+                _run_player([player, abs_path], abs_path)
                 return
     print("[WARN] Konnte WAV nicht automatisch abspielen.")
 
 
-def _normalize_text_for_tts(text: str) -> str:
+def load_pronunciation_lexicon(path: str | Path | None) -> int:
+    """Lädt das Aussprache-Lexikon (relativ zu config.yaml) und gibt die Anzahl Einträge zurück."""
+    global _pronunciation_lexicon
+    if not path:
+        _pronunciation_lexicon = EMPTY_LEXICON
+        return 0
+    p = CONFIG.resolve_path(path)
+    _pronunciation_lexicon = PronunciationLexicon(load_lexicon_file(p))
+    return len(_pronunciation_lexicon)
+
+
+def pronunciation_lexicon_size() -> int:
+    return len(_pronunciation_lexicon)
+
+
+if lexicon_path_raw:
+    try:
+        load_pronunciation_lexicon(lexicon_path_raw)
+    except Exception as e:
+        print(f"[WARN] Aussprache-Lexikon konnte nicht geladen werden: {e}")
+
+
+def _precision_model(model_path: str) -> str:
+    """
+    ``model_path`` in der Genauigkeit aus ``tts.precision``. Fehlt die Variante
+    (``python quantize_voice.py``), bleibt es beim Original.
+    """
+    if piper_precision == "full" or model_path in _precision_fallbacks:
+        return model_path
+    variant = quantized_model_path(model_path, piper_precision)
+    if variant.exists() and Path(str(variant) + ".json").exists():
+        _precision_variants[str(variant)] = model_path
+        return str(variant)
+    _precision_fallbacks.add(model_path)
+    print(f"[WARN] {variant} fehlt (python quantize_voice.py) – nutze volle Genauigkeit.")
+    return model_path
+
+
+def _fall_back_to_full_precision(voice: tuple) -> bool:
+    """Nach einem Fehler der Variante künftig das Original nutzen; ``True``, wenn ``voice`` eine Variante war."""
+    with _voice_lock:
+        original = _precision_variants.get(voice[0])
+        if original is None:
+            return False
+        _precision_fallbacks.add(original)
+    print(f"[WARN] {voice[0]} liefert kein Audio – nutze volle Genauigkeit.")
+    return True
+
+
+def _piper_voice(name: str = "") -> tuple:
+    """Modell und Stimmparameter als zusammenpassender Satz (``name`` aus ``voices``, sonst Standardstimme)."""
+    with _voice_lock:
+        voice = _voice_configs.get(name) if name else None
+        if voice is None:
+            return _precision_model(piper_model_path), piper_speaker, piper_length_scale, piper_noise_scale, piper_noise_w
+        return (
+            _precision_model(voice.model_path),
+            voice.speaker,
+            piper_length_scale if voice.length_scale is None else voice.length_scale,
+            piper_noise_scale if voice.noise_scale is None else voice.noise_scale,
+            piper_noise_w if voice.noise_w is None else voice.noise_w,
+        )
+
+
+def apply_tts_config(cfg: AppConfig) -> bool:
+    """
+    Übernimmt TTS-Einstellungen einer neu geladenen Config im laufenden Betrieb.
+    ``True``, wenn sich der gesprochene Klang ändert (Provider, Stimme, Lexikon) –
+    bereits vorbereitete Audios passen dann nicht mehr. Der Audio-Cache muss
+    nicht geleert werden: Einträge sind nach Stimmparametern adressiert.
+    """
+    global CONFIG, TTS_CFG, provider, use_piper, lexicon_path_raw, save_audio, audio_cache_max_mb
+    global piper_model_path, piper_speaker, piper_length_scale, piper_noise_scale, piper_noise_w
+    global tts_rate, tts_volume, tts_voice_index, piper_engine, _library_available, piper_precision
+    new = cfg.tts
+    before = (provider, _piper_voice(), tts_rate, tts_volume, tts_voice_index)
+    lexicon_changed = new.lexicon_path != lexicon_path_raw
+    if lexicon_changed:
+        try:
+            load_pronunciation_lexicon(new.lexicon_path)
+        except Exception as e:
+            print(f"[WARN] Aussprache-Lexikon konnte nicht geladen werden, behalte das alte: {e}")
+            lexicon_changed = False
+        else:
+            lexicon_path_raw = new.lexicon_path
+    with _voice_lock:
+        CONFIG, TTS_CFG = cfg, new
+        provider = new.provider.lower()
+        use_piper = provider == "piper"
+        piper_model_path = new.model_path
+        piper_speaker = new.speaker
+        piper_length_scale = new.length_scale
+        piper_noise_scale = new.noise_scale
+        piper_noise_w = new.noise_w
+        tts_rate = new.rate
+        tts_volume = new.volume
+        tts_voice_index = new.voice_index
+        if new.engine.lower() != piper_engine:
+            piper_engine, _library_available = new.engine.lower(), None
+        if new.precision.lower() != piper_precision:
+            piper_precision = new.precision.lower()
+            _precision_fallbacks.clear()
+        save_audio = cfg.files.save_audio
+        audio_cache_max_mb = cfg.files.audio_cache_max_mb
+    _voice_registry.budget_bytes = int(new.voice_memory_mb * 1024 * 1024)
+    _voice_registry.idle_seconds = new.voice_idle_seconds
+    after = (provider, _piper_voice(), tts_rate, tts_volume, tts_voice_index)
+    return lexicon_changed or before != after
+
+
+def set_audio_cache_dir(path: str | Path | None):
+    """Aktiviert den Audio-Cache (WAV pro Text + Stimmparameter) in ``path``; ``None`` schaltet ihn ab."""
+    global _audio_cache_dir
+    if path is None:
+        _audio_cache_dir = None
+        return
+    cache_dir = Path(path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _audio_cache_dir = cache_dir
+    _prune_audio_cache()
+
+
+def _audio_cache_path(text: str, voice: tuple | None = None) -> Path | None:
+    if _audio_cache_dir is None:
+        return None
+    ident = json.dumps(
+        [*(voice or _piper_voice()), _normalize_text_for_tts(text)],
+        ensure_ascii=False,
+    )
+    return _audio_cache_dir / (hashlib.sha1(ident.encode("utf-8")).hexdigest() + ".wav")
+
+
+def _audio_cache_store(cache_path: Path, wav_path: str) -> str:
+    """Verschiebt eine frisch synthetisierte WAV in den Cache; bei Fehlern bleibt die Temp-Datei."""
+    global _audio_cache_stores
+    try:
+        tmp = cache_path.with_name(f".{cache_path.name}.{threading.get_ident()}.tmp")
+        shutil.move(wav_path, tmp)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"[WARN] Audio-Cache nicht beschreibbar: {e}")
+        return wav_path
+    with _audio_cache_lock:
+        _audio_cache_stores += 1
+        prune = _audio_cache_stores % AUDIO_CACHE_PRUNE_EVERY == 0
+    if prune:
+        _prune_audio_cache()
+    return str(cache_path)
+
+
+def _prune_audio_cache():
+    """Löscht die am längsten nicht genutzten WAVs, bis der Cache unter ``audio_cache_max_mb`` liegt."""
+    cache_dir = _audio_cache_dir
+    if cache_dir is None or audio_cache_max_mb <= 0:
+        return
+    with _audio_cache_lock:
+        files = []
+        total = 0
+        for path in cache_dir.glob("*.wav"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        limit = audio_cache_max_mb * 1024 * 1024
+        for _, size, path in sorted(files):
+            if total <= limit:
+                break
+            _safe_delete(str(path))
+            total -= size
+
+
+def _normalize_text_for_tts(text: str, allow_phonemes: bool = True) -> str:
     text = unicodedata.normalize("NFC", text)
+    text = _pronunciation_lexicon.apply(text, allow_phonemes)
     text = re.sub(r"(Tisch\s+\S+):", r"\1.", text)
     text = text.replace(" gegen ", ", gegen ")
     return text
@@ -99,7 +423,8 @@ def _piper_generate_audio(text: str,
                           length_scale=0.95,
                           noise_scale=0.5,
                           noise_w=0.8,
-                          persist=False) -> Optional[str]:
+                          persist=False,
+                          cancel: CancelToken | None = None) -> Optional[str]:
     exe_path = exe
     if os.name == "nt" and not Path(exe_path).exists():
         exe_path = "piper"
@@ -114,8 +439,9 @@ def _piper_generate_audio(text: str,
         print("[WARN] Piper-Model oder Config fehlt.")
         return None
 
+    wav_path = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        with tempfile.NamedTemporaryFile(prefix=TEMP_AUDIO_PREFIX, suffix=".wav", delete=False) as tmp:
             wav_path = tmp.name.replace("\\", "/")
 
         cmd = [
@@ -129,20 +455,124 @@ def _piper_generate_audio(text: str,
             cmd += ["--speaker", str(speaker)]
 
         encoding = "ansi" if os.name == "nt" else "utf-8"
-        subprocess.run(cmd, input=_normalize_text_for_tts(text).encode(encoding), check=True)
+        data = _normalize_text_for_tts(text).encode(encoding)
+        if cancel is None:
+            subprocess.run(cmd, input=data, check=True)
+        else:
+            cancel.check()
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            cancel._attach(proc)
+            try:
+                proc.communicate(data)
+            finally:
+                cancel._attach(None)
+            cancel.check()
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
         if persist:
             print(f"[INFO] Audio gespeichert: {wav_path}")
         return wav_path
     except Exception as e:
+        if wav_path:
+            _safe_delete(wav_path)
+        if isinstance(e, SynthesisCancelled):
+            raise
         print(f"[WARN] Piper Fehler: {e}")
+        return None
+
+
+def _use_library() -> bool:
+    """Synthese im Prozess mit geteilten Stimmen (piper-tts); sonst pro Durchsage das ``piper``-Programm."""
+    global _library_available
+    if piper_engine == "cli":
+        return False
+    if _library_available is None:
         try:
-            if wav_path:
-                os.remove(wav_path)
-        except Exception:
-            pass
+            import onnxruntime  # noqa: F401
+            from piper import PiperVoice, SynthesisConfig  # noqa: F401
+            _library_available = True
+        except Exception as e:
+            _library_available = False
+            if piper_engine == "library":
+                print(f"[WARN] piper-tts/onnxruntime nicht nutzbar ({e}) – nutze das piper-Programm.")
+    return _library_available
+
+
+def _piper_library_audio(text: str,
+                         model_path="voices/de_DE-thorsten-medium.onnx",
+                         speaker=None,
+                         length_scale=0.95,
+                         noise_scale=0.5,
+                         noise_w=0.8,
+                         persist=False,
+                         cancel: CancelToken | None = None) -> Optional[str]:
+    model_path = Path(model_path)
+    if not model_path.exists() or not Path(str(model_path) + ".json").exists():
+        print("[WARN] Piper-Model oder Config fehlt.")
+        return None
+
+    from piper import SynthesisConfig
+    syn_config = SynthesisConfig(speaker_id=speaker, length_scale=length_scale,
+                                 noise_scale=noise_scale, noise_w_scale=noise_w)
+    wav_path = None
+    try:
+        if cancel is not None:
+            cancel.check()
+        with tempfile.NamedTemporaryFile(prefix=TEMP_AUDIO_PREFIX, suffix=".wav", delete=False) as tmp:
+            wav_path = tmp.name.replace("\\", "/")
+        frames = 0
+        with _voice_registry.use(model_path, pinned=str(model_path) == _piper_voice()[0]) as voice:
+            with wave.open(wav_path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(voice.config.sample_rate)
+                # satzweise, damit ein Abbruch nicht bis zum Ende der Synthese wartet
+                for chunk in voice.synthesize(_normalize_text_for_tts(text), syn_config=syn_config):
+                    if cancel is not None:
+                        cancel.check()
+                    data = chunk.audio_int16_bytes
+                    wav.writeframes(data)
+                    frames += len(data)
+        if not frames:
+            raise ValueError("keine Audiodaten erzeugt")
+        if persist:
+            print(f"[INFO] Audio gespeichert: {wav_path}")
+        return wav_path
+    except Exception as e:
+        if wav_path:
+            _safe_delete(wav_path)
+        if isinstance(e, SynthesisCancelled):
+            raise
+        print(f"[WARN] Piper Fehler: {e}")
         return None
 
 
+def _piper_synthesize(text: str, voice: tuple, cancel: CancelToken | None = None) -> Optional[str]:
+    model_path, speaker, length_scale, noise_scale, noise_w = voice
+    if _use_library():
+        return _piper_library_audio(
+            text=text,
+            model_path=model_path,
+            speaker=speaker,
+            length_scale=length_scale,
+            noise_scale=noise_scale,
+            noise_w=noise_w,
+            persist=save_audio,
+            cancel=cancel,
+        )
+    return _piper_generate_audio(
+        text=text,
+        exe=piper_executable,
+        model_path=model_path,
+        speaker=speaker,
+        length_scale=length_scale,
+        noise_scale=noise_scale,
+        noise_w=noise_w,
+        persist=save_audio,
+        cancel=cancel,
+    )
+
+
 def _piper_say_once(text: str,
                     exe="piper",
                     model_path="voices/de_DE-thorsten-medium.onnx",
@@ -183,6 +613,10 @@ def set_tts_muted(value: bool):
     _tts_muted = bool(value)
 
 
+def tts_muted() -> bool:
+    return _tts_muted
+
+
 def _pyttsx3_say(text: str, rate=170, volume=1.0, voice_index=None) -> bool:
     try:
         import pyttsx3  # sicherstellen, dass Importfehler sauber handled werden
@@ -196,7 +630,7 @@ def _pyttsx3_say(text: str, rate=170, volume=1.0, voice_index=None) -> bool:
             voices = engine.getProperty('voices') or []
             if 0 <= int(voice_index) < len(voices):
                 engine.setProperty('voice', voices[int(voice_index)].id)
-        engine.say(_normalize_text_for_tts(text))
+        engine.say(_normalize_text_for_tts(text, allow_phonemes=False))
         engine.runAndWait()
         engine.stop()
         del engine
@@ -206,59 +640,107 @@ def _pyttsx3_say(text: str, rate=170, volume=1.0, voice_index=None) -> bool:
         return False
 
 
-def _build_piper_job(text: str) -> Optional[Callable[[], None]]:
-    wav_path = _piper_generate_audio(
-        text=text,
-        exe=piper_executable,
-        model_path=piper_model_path,
-        speaker=piper_speaker,
-        length_scale=piper_length_scale,
-        noise_scale=piper_noise_scale,
-        noise_w=piper_noise_w,
-        persist=save_audio,
-    )
+def _piper_synthesize_with_fallback(text: str, voice: tuple, cancel: CancelToken | None = None) -> Optional[str]:
+    wav_path = _piper_synthesize(text, voice, cancel)
     if not wav_path:
         text2 = _umlaut_fallback(text)
         if text2 != text:
-            wav_path = _piper_generate_audio(
-                text=text2,
-                exe=piper_executable,
-                model_path=piper_model_path,
-                speaker=piper_speaker,
-                length_scale=piper_length_scale,
-                noise_scale=piper_noise_scale,
-                noise_w=piper_noise_w,
-                persist=save_audio,
-            )
+            wav_path = _piper_synthesize(text2, voice, cancel)
+    return wav_path
+
+
+def _build_piper_job(text: str, cancel: CancelToken | None = None, voice_name: str = "") -> Optional[Callable[[], None]]:
+    voice = _piper_voice(voice_name)
+    cache_path = _audio_cache_path(text, voice)
+    if cache_path is not None and cache_path.exists():
+        metrics.inc("kickertool_audio_cache_total", result="hit")
+        try:
+            os.utime(cache_path)  # für die LRU-Bereinigung
+        except OSError:
+            pass
+        return _make_wav_player(str(cache_path), keep_file=True)
+
+    started = time.perf_counter()
+    wav_path = _piper_synthesize_with_fallback(text, voice, cancel)
+    if not wav_path and _fall_back_to_full_precision(voice):
+        voice = _piper_voice(voice_name)
+        cache_path = _audio_cache_path(text, voice)
+        wav_path = _piper_synthesize_with_fallback(text, voice, cancel)
     if not wav_path:
         return None
+    metrics.observe("kickertool_synthesis_duration_seconds", time.perf_counter() - started, provider="piper")
+    keep_file = save_audio
+    if cache_path is not None:
+        metrics.inc("kickertool_audio_cache_total", result="miss")
+        wav_path = _audio_cache_store(cache_path, wav_path)
+        keep_file = keep_file or wav_path == str(cache_path)
+    return _make_wav_player(wav_path, keep_file)
 
-    def _player():
+
+def _make_wav_player(wav_path: str, keep_file: bool) -> Callable[..., None]:
+    def _player(device: str = "", player: str = ""):
         if _tts_muted:
-            if not save_audio:
+            if not keep_file:
                 _safe_delete(wav_path)
             return
-        _play_wav(wav_path)
-        if not save_audio:
+        play_started = time.perf_counter()
+        _play_wav(wav_path, device, player)
+        metrics.observe("kickertool_playback_duration_seconds", time.perf_counter() - play_started, provider="piper")
+        if not keep_file:
             _safe_delete(wav_path)
 
+    _player.wav_path = wav_path  # für die gesicherte Warteschlange
     return _player
 
 
-def _build_pyttsx_job(text: str) -> Callable[[], None]:
-    def _player():
+def _is_disposable_audio(path: Path) -> bool:
+    """Temp-WAV, die nach dem Abspielen gelöscht wird (nicht im Cache, ``save_audio`` aus)."""
+    return not save_audio and not (_audio_cache_dir is not None and path.parent == _audio_cache_dir)
+
+
+def prepared_audio_job(wav_path: str | None) -> Optional[Callable[[], None]]:
+    """Wiedergabe-Job für eine bereits synthetisierte WAV (z. B. nach einem Neustart)."""
+    if not wav_path or not Path(wav_path).is_file():
+        return None
+    return _make_wav_player(wav_path, keep_file=not _is_disposable_audio(Path(wav_path)))
+
+
+def temp_audio_locations() -> list[tuple[Path, str]]:
+    """Ordner und Muster, unter denen unfertige bzw. temporäre Audios liegen können."""
+    locations = [(Path(tempfile.gettempdir()), f"{TEMP_AUDIO_PREFIX}*.wav")]
+    if _audio_cache_dir is not None:
+        locations.append((_audio_cache_dir, ".*.tmp"))
+    return locations
+
+
+def release_audio(wav_path: str | None):
+    """Gibt eine nicht mehr benötigte WAV frei; Cache-Einträge und gespeicherte Audios bleiben."""
+    if wav_path and _is_disposable_audio(Path(wav_path)):
+        _safe_delete(wav_path)
+
+
+def _build_pyttsx_job(text: str) -> Callable[..., None]:
+    def _player(device: str = "", player: str = ""):
         if _tts_muted:
             return
+        if device:
+            _warn_device_once(device, "pyttsx3 nutzt immer das Standardgerät")
+        # pyttsx3 synthetisiert während der Ausgabe – gemessen wird beides zusammen
+        play_started = time.perf_counter()
         _pyttsx3_say(text, rate=tts_rate, volume=tts_volume, voice_index=tts_voice_index)
+        metrics.observe("kickertool_playback_duration_seconds", time.perf_counter() - play_started, provider="pyttsx3")
 
     return _player
 
 
-def prepare_tts_playback(text: str) -> Optional[Callable[[], None]]:
-    provider = (TTS_CFG.get("provider") or "piper").lower()
+def prepare_tts_playback(text: str, cancel: CancelToken | None = None, voice: str = "") -> Optional[Callable[[], None]]:
+    """
+    Synthetisiert vorab; ``cancel`` bricht eine laufende Synthese ab (``SynthesisCancelled``).
+    ``voice`` wählt eine Stimme aus ``voices`` (nur Piper), sonst die Standardstimme.
+    """
     job = None
     if provider == "piper":
-        job = _build_piper_job(text)
+        job = _build_piper_job(text, cancel, voice)
         if job:
             return job
         return _build_pyttsx_job(text)
@@ -266,7 +748,7 @@ def prepare_tts_playback(text: str) -> Optional[Callable[[], None]]:
         job = _build_pyttsx_job(text)
         if job:
             return job
-        return _build_piper_job(text)
+        return _build_piper_job(text, cancel, voice)
 
 
 def speak_text(text: str):
@@ -297,6 +779,7 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--length-scale", type=float, help="Piper: length_scale")
     p.add_argument("--noise-scale", type=float, help="Piper: noise_scale")
     p.add_argument("--noise-w", type=float, help="Piper: noise_w")
+    p.add_argument("--precision", choices=["full", "int8", "fp16"], help="Piper: Modell-Genauigkeit (siehe quantize_voice.py)")
 
     p.add_argument("--rate", type=int, help="pyttsx3: Sprechgeschwindigkeit")
     p.add_argument("--volume", type=float, help="pyttsx3: Lautstärke 0.0–1.0")
@@ -308,12 +791,13 @@ def _build_arg_parser() -> argparse.ArgumentParser:
 
 
 def _apply_overrides_from_args(args):
-    global TTS_CFG, save_audio
+    global provider, use_piper, save_audio
     # Provider-Override
     if args.piper:
-        TTS_CFG["provider"] = "piper"
+        provider = "piper"
     if args.pyttsx3:
-        TTS_CFG["provider"] = "pyttsx3"
+        provider = "pyttsx3"
+    use_piper = provider == "piper"
 
     # Piper
     if args.model_path is not None:
@@ -326,6 +810,8 @@ def _apply_overrides_from_args(args):
         globals()["piper_noise_scale"] = args.noise_scale
     if args.noise_w is not None:
         globals()["piper_noise_w"] = args.noise_w
+    if args.precision is not None:
+        globals()["piper_precision"] = args.precision
 
     # pyttsx3
     if args.rate is not None:
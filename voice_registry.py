@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Geladene Piper-Stimmen, geteilt von allen Synthese-Workern.
+
+Statt für jede Durchsage den ``piper``-Prozess zu starten (der jedes Mal das
+komplette ONNX-Modell liest), hält ``VoiceRegistry`` pro Modell genau eine
+onnxruntime-Session, die sich alle Synthese-Threads teilen.
+
+- Memory-Mapping: Beim ersten Laden wird aus ``<stimme>.onnx`` einmalig
+  ``<stimme>.mmap.onnx`` + ``.data`` mit seitenweise ausgerichteten Gewichten
+  erzeugt (braucht das Paket ``onnx``). onnxruntime blendet die Gewichte dann
+  per mmap nur lesend ein – mehrere Prozesse (z. B. der Synthese-Prozess im
+  Mehrprozess-Betrieb und ein zweites Tool) teilen sich dieselben Seiten im
+  Page-Cache, statt je eine eigene Kopie zu halten. Ohne ``onnx`` wird das
+  Original geladen.
+- Lazy: eine Stimme wird erst bei der ersten Synthese geladen.
+- Budget: übersteigen die geladenen Modelle ``budget_bytes``, werden die am
+  längsten unbenutzten entladen; Stimmen, die ``idle_seconds`` nicht gebraucht
+  wurden, ebenso. Angeheftete Stimmen (die Standardstimme) bleiben geladen,
+  gerade benutzte werden nie entladen.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import metrics
+
+MAPPED_SUFFIX = ".mmap.onnx"
+DATA_ALIGNMENT = 64 * 1024     # Allokations-Granularität unter Windows, Vielfaches der Seitengröße
+MIN_EXTERNAL_BYTES = 4096      # kleinere Tensoren bleiben im Modell
+
+metrics.define_counter("kickertool_voice_loads_total", "Geladene Piper-Stimmen nach Ergebnis (mapped, plain, failed).")
+metrics.define_counter("kickertool_voice_unloads_total", "Entladene Piper-Stimmen nach Grund (idle, budget).")
+
+
+def mapped_model_path(model_path: Path) -> Path:
+    stem = model_path.name[:-len(".onnx")] if model_path.name.endswith(".onnx") else model_path.name
+    return model_path.with_name(stem + MAPPED_SUFFIX)
+
+
+def prepare_mapped_model(model_path: str | Path) -> Path | None:
+    """
+    Legt (einmalig bzw. nach Änderung des Originals) die mmap-taugliche Fassung
+    des Modells an. ``None``, wenn ``onnx`` fehlt.
+    """
+    model_path = Path(model_path)
+    target = mapped_model_path(model_path)
+    data_path = target.with_name(target.name + ".data")
+    try:
+        if target.exists() and data_path.exists() and target.stat().st_mtime >= model_path.stat().st_mtime:
+            return target
+    except OSError:
+        pass
+    try:
+        import onnx
+    except ImportError:
+        return None
+    from onnx import TensorProto
+
+    model = onnx.load(str(model_path))
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_model = target.with_name(target.name + suffix)
+    tmp_data = data_path.with_name(data_path.name + suffix)
+    try:
+        with open(tmp_data, "wb") as f:
+            for tensor in model.graph.initializer:
+                if len(tensor.raw_data) < MIN_EXTERNAL_BYTES:
+                    continue
+                offset = f.tell()
+                padding = -offset % DATA_ALIGNMENT
+                if padding:
+                    f.write(b"\0" * padding)
+                    offset += padding
+                f.write(tensor.raw_data)
+                tensor.ClearField("raw_data")
+                tensor.data_location = TensorProto.EXTERNAL
+                del tensor.external_data[:]
+                for key, value in (("location", data_path.name), ("offset", offset), ("length", f.tell() - offset)):
+                    entry = tensor.external_data.add()
+                    entry.key, entry.value = key, str(value)
+        onnx.save(model, str(tmp_model))
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_model, target)
+    finally:
+        for path in (tmp_model, tmp_data):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return target
+
+
+def _model_bytes(path: Path) -> int:
+    size = 0
+    for candidate in (path, path.with_name(path.name + ".data")):
+        try:
+            size += candidate.stat().st_size
+        except OSError:
+            pass
+    return size
+
+
+def load_piper_voice(model_path: Path, config_path: Path, session_options=None):
+    """Lädt eine Stimme für die Synthese im Prozess (piper-tts ≥ 1.3)."""
+    import onnxruntime
+    from piper import PiperVoice
+    from piper.config import PiperConfig
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = PiperConfig.from_dict(json.load(f))
+    session = onnxruntime.InferenceSession(
+        str(model_path),
+        sess_options=session_options if session_options is not None else onnxruntime.SessionOptions(),
+        providers=["CPUExecutionProvider"],
+    )
+    return PiperVoice(config=config, session=session)
+
+
+class _LoadedVoice:
+    __slots__ = ("key", "voice", "size", "users", "last_used", "pinned", "lock")
+
+    def __init__(self, key: str, pinned: bool):
+        self.key = key
+        self.voice = None
+        self.size = 0
+        self.users = 0
+        self.last_used = time.monotonic()
+        self.pinned = pinned
+        self.lock = threading.Lock()  # nur ein Thread lädt dieselbe Stimme
+
+
+class VoiceRegistry:
+    def __init__(self, budget_bytes: int = 0, idle_seconds: float = 900.0,
+                 loader: Callable[[Path, Path], object] = load_piper_voice, mmap: bool = True,
+                 on_warning: Callable[[str], None] | None = None):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.idle_seconds = float(idle_seconds)
+        self._loader = loader
+        self._mmap = mmap
+        self._on_warning = on_warning or (lambda message: print(f"[WARN] {message}"))
+        self._lock = threading.Lock()
+        self._voices: dict[str, _LoadedVoice] = {}
+        self._mmap_warned = False
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        metrics.define_gauge("kickertool_voice_loaded_bytes", "Modellgröße der geladenen Piper-Stimmen.",
+                             self.loaded_bytes)
+
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._voices.values() if entry.voice is not None)
+
+    @contextmanager
+    def use(self, model_path: str | Path, pinned: bool = False) -> Iterator[object]:
+        """Geladene Stimme für die Dauer einer Synthese (lädt bei Bedarf)."""
+        key = str(model_path)
+        with self._lock:
+            entry = self._voices.get(key)
+            if entry is None:
+                entry = self._voices[key] = _LoadedVoice(key, pinned)
+            entry.pinned = entry.pinned or pinned
+            entry.users += 1
+        try:
+            with entry.lock:
+                if entry.voice is None:
+                    self._load(entry)
+            yield entry.voice
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def _load(self, entry: _LoadedVoice):
+        model_path = Path(entry.key)
+        config_path = Path(entry.key + ".json")
+        path, result = model_path, "plain"
+        if self._mmap:
+            try:
+                mapped = prepare_mapped_model(model_path)
+            except Exception as exc:
+                mapped = model_path
+                self._on_warning(f"Stimme {model_path.name}: mmap-Fassung nicht erstellt ({exc}) – lade das Original.")
+            if mapped is None:
+                if not self._mmap_warned:
+                    self._mmap_warned = True
+                    self._on_warning("Paket 'onnx' fehlt – Stimmen werden ohne Memory-Mapping geladen (pip install onnx).")
+            elif mapped != model_path:
+                path, result = mapped, "mapped"
+        size = _model_bytes(path)
+        self._make_room(size, keep=entry)
+        try:
+            voice = self._loader(path, config_path)
+        except Exception:
+            metrics.inc("kickertool_voice_loads_total", result="failed")
+            raise
+        with self._lock:
+            entry.voice, entry.size = voice, size
+        metrics.inc("kickertool_voice_loads_total", result=result)
+        self._start_sweeper()
+
+    def _make_room(self, size: int, keep: _LoadedVoice):
+        if not self.budget_bytes:
+            return
+        with self._lock:
+            total = sum(e.size for e in self._voices.values() if e.voice is not None)
+            idle = sorted((e for e in self._voices.values()
+                           if e is not keep and e.voice is not None and not e.users and not e.pinned),
+                          key=lambda e: e.last_used)
+            victims = []
+            for candidate in idle:
+                if total + size <= self.budget_bytes:
+                    break
+                victims.append(candidate)
+                total -= candidate.size
+            for victim in victims:
+                self._unload(victim, "budget")
+        if total + size > self.budget_bytes:
+            self._on_warning(f"Stimmen-Budget überschritten ({(total + size) / 1e6:.0f} MB) – alle Stimmen in Gebrauch.")
+
+    def _unload(self, entry: _LoadedVoice, reason: str):
+        """Mit ``self._lock``; die Session wird mit der letzten Referenz freigegeben."""
+        entry.voice = None
+        entry.size = 0
+        if not entry.users:
+            self._voices.pop(entry.key, None)
+        metrics.inc("kickertool_voice_unloads_total", reason=reason)
+
+    def sweep(self) -> int:
+        """Entlädt Stimmen, die länger als ``idle_seconds`` nicht gebraucht wurden."""
+        if self.idle_seconds <= 0:
+            return 0
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [e for e in self._voices.values()
+                    if e.voice is not None and not e.users and not e.pinned and e.last_used < cutoff]
+            for entry in idle:
+                self._unload(entry, "idle")
+        return len(idle)
+
+    def _start_sweeper(self):
+        with self._lock:
+            if self._thread is not None or self.idle_seconds <= 0:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True, name="voice-sweeper")
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(max(5.0, min(60.0, self.idle_seconds / 4))):
+            self.sweep()
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            for entry in list(self._voices.values()):
+                if entry.voice is not None and not entry.users:
+                    entry.voice = None
+            self._voices = {key: e for key, e in self._voices.items() if e.voice is not None}
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Ausgabezonen für große Hallen.
+
+Eine Zone fasst Tische (Name, Bereich ``1-12`` oder Muster ``A*``) zusammen
+und spielt auf ein eigenes Ausgabegerät. Jede Zone hat ihre eigene
+Warteschlange und ihren eigenen Player-Thread – eine Durchsage für Halle B
+wartet nicht mehr hinter Halle A. Synthese-Pool und Audio-Cache teilen sich
+alle Zonen. Tische ohne passende Zone landen in der Standardzone.
+"""
+
+import re
+import fnmatch
+import threading
+from queue import Queue
+from typing import Callable, Iterator
+
+from config import ZoneConfig
+from history_store import normalize_table
+from text_to_speech import DEVICE_PLAYERS
+
+DEFAULT_ZONE_NAME = "Standard"
+_RANGE = re.compile(r"^(\d+)\s*-\s*(\d+)$")
+
+
+def _compile_pattern(pattern: str) -> Callable[[str, str], bool]:
+    """Matcher auf (Rohname, normalisierter Name), beides casefold."""
+    match = _RANGE.match(pattern)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        return lambda raw, norm: norm.isdigit() and low <= int(norm) <= high
+    pat = pattern.casefold()
+    norm_pat = normalize_table(pattern)
+    return lambda raw, norm: fnmatch.fnmatchcase(raw, pat) or fnmatch.fnmatchcase(norm, norm_pat)
+
+
+def table_matcher(patterns: tuple[str, ...]) -> Callable[[str], bool]:
+    """Prüft Tischnamen gegen Namen, Bereiche (``1-12``) und Muster (``A*``)."""
+    matchers = [_compile_pattern(p) for p in patterns]
+
+    def matches(table: str) -> bool:
+        raw = (table or "").strip().casefold()
+        norm = normalize_table(table)
+        return any(matcher(raw, norm) for matcher in matchers)
+
+    return matches
+
+
+class Zone:
+    def __init__(self, name: str, patterns: tuple[str, ...] = (), device: str = "", player: str = ""):
+        if player and player not in DEVICE_PLAYERS:
+            raise ValueError(f"Zone '{name}': unbekannter Player '{player}' (erlaubt: {', '.join(DEVICE_PLAYERS)})")
+        self.name = name
+        self.patterns = patterns
+        self.device = device
+        self.player = player
+        self.matches = table_matcher(patterns)
+        self.queue: "Queue[object]" = Queue()
+        self.paused = False
+        self.muted = False
+        self.current_key: str | None = None
+        self.last_speech_finished = 0.0
+        self.notify_skip_logged = False
+        self.thread: threading.Thread | None = None
+
+    def label(self) -> str:
+        flags = [flag for flag, on in (("pausiert", self.paused), ("stumm", self.muted)) if on]
+        return f"{self.name} ({', '.join(flags)})" if flags else self.name
+
+
+class ZoneRouter:
+    def __init__(self, zones: list[Zone]):
+        self.zones = list(zones)
+        self.default = next((zone for zone in self.zones if not zone.patterns), None)
+        if self.default is None:
+            self.default = Zone(DEFAULT_ZONE_NAME)
+            self.zones.append(self.default)
+        self._cache: dict[str, Zone] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, zones: tuple[ZoneConfig, ...]) -> "ZoneRouter":
+        return cls([Zone(z.name, z.tables, z.device, z.player) for z in zones])
+
+    def __iter__(self) -> Iterator[Zone]:
+        return iter(self.zones)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def zone_for(self, table: str | None) -> Zone:
+        """Erste Zone, deren Muster passt; sonst die Standardzone (Ergebnis pro Tischname gecacht)."""
+        if not table:
+            return self.default
+        with self._lock:
+            zone = self._cache.get(table)
+            if zone is None:
+                zone = next((z for z in self.zones if z.patterns and z.matches(table)), self.default)
+                self._cache[table] = zone
+            return zone
+
+    def find(self, query: str) -> Zone | None:
+        """Zone per Nummer (1-basiert), Name oder eindeutigem Namensanfang."""
+        query = (query or "").strip()
+        if query.isdigit():
+            idx = int(query)
+            return self.zones[idx - 1] if 1 <= idx <= len(self.zones) else None
+        folded = query.casefold()
+        exact = [zone for zone in self.zones if zone.name.casefold() == folded]
+        if exact:
+            return exact[0]
+        prefixed = [zone for zone in self.zones if zone.name.casefold().startswith(folded)]
+        return prefixed[0] if len(prefixed) == 1 else None